@@ -2,12 +2,63 @@
 Configuration de l'admin pour l'application accounts.
 """
 
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from eduplatform.db.pagination import EstimatedCountPaginator
 from .models import UserSession
 
 
+class AutocompleteFilter(admin.FieldListFilter):
+    """
+    Filtre de la barre latérale sur une clé étrangère, avec recherche
+    (select2 de l'admin) au lieu d'un lien par objet lié.
+    
+    Usage : list_filter = [('user', AutocompleteFilter)]. Le modèle lié doit
+    avoir des `search_fields` dans son admin ; l'admin qui utilise le filtre
+    doit ajouter `autocomplete_media(...)` à son `media`.
+    """
+    template = 'admin/autocomplete_filter.html'
+    
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f'{field_path}__{field.target_field.name}__exact'
+        self.lookup_val = params.get(self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+        )
+        self.widget_id = f'autocomplete-filter-{field_path}'
+        self.widget_html = form_field.widget.render(
+            self.lookup_kwarg, self.lookup_val,
+            attrs={'id': self.widget_id, 'style': 'width: 100%'},
+        )
+    
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+    
+    def has_output(self):
+        return True
+    
+    def choices(self, changelist):
+        yield {
+            'selected': self.lookup_val is None,
+            'query_string': changelist.get_query_string(remove=[self.lookup_kwarg]),
+            'display': 'Tous',
+        }
+
+
+def autocomplete_media(model, field_name, admin_site):
+    """Fichiers JS/CSS du widget select2 utilisé par AutocompleteFilter."""
+    return AutocompleteSelect(model._meta.get_field(field_name), admin_site).media
+
+
 class UserSessionInline(admin.TabularInline):
     """
     Affiche les sessions actives dans la page de détail d'un utilisateur.
@@ -34,11 +85,24 @@ class CustomUserAdmin(BaseUserAdmin):
     list_filter = ('is_active', 'is_staff', 'is_superuser', 'date_joined')
     search_fields = ('username', 'email', 'first_name', 'last_name')
     ordering = ('-date_joined',)
+    # Pas de second COUNT(*) sur toute la table ; total estimé sur les grandes tables
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
+    def get_queryset(self, request):
+        # Sous-requête corrélée : calculée pour les seules lignes de la page
+        session_count = UserSession.objects.filter(user=OuterRef('pk')).order_by().values('user').annotate(
+            count=Count('pk')
+        ).values('count')
+        return super().get_queryset(request).annotate(
+            active_sessions=Coalesce(Subquery(session_count, output_field=IntegerField()), 0)
+        )
     
     def active_sessions_count(self, obj):
         """Nombre de sessions actives pour cet utilisateur."""
-        return obj.sessions.count()
+        return obj.active_sessions
     active_sessions_count.short_description = 'Sessions actives'
+    active_sessions_count.admin_order_field = 'active_sessions'
     
     actions = ['invalidate_all_sessions']
     
@@ -67,10 +131,17 @@ class UserSessionAdmin(admin.ModelAdmin):
     Administration des sessions utilisateurs.
     """
     list_display = ('user', 'created_at', 'ip_address', 'short_user_agent')
-    list_filter = ('created_at', 'user')
+    list_filter = ('created_at', ('user', AutocompleteFilter))
+    list_select_related = ('user',)
     search_fields = ('user__username', 'ip_address')
     readonly_fields = ('user', 'session', 'created_at', 'ip_address', 'user_agent')
     ordering = ('-created_at',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
+    @property
+    def media(self):
+        return super().media + autocomplete_media(UserSession, 'user', self.admin_site)
     
     def short_user_agent(self, obj):
         """Affiche une version courte du User-Agent."""
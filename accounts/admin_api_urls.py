@@ -6,16 +6,28 @@ from django.urls import path
 from .admin_api_views import (
     # Users
     AdminUserListAPIView,
+    AdminUserBulkAPIView,
     AdminUserDetailAPIView,
     AdminInvalidateUserSessionsAPIView,
     # Categories
     AdminCategoryListAPIView,
+    AdminCategoryReorderAPIView,
     AdminCategoryDetailAPIView,
     # Videos
     AdminVideoListAPIView,
+    AdminVideoBulkAPIView,
+    AdminVideoReorderAPIView,
     AdminVideoDetailAPIView,
     # Dashboard
     AdminDashboardAPIView,
+    AdminAnalyticsAPIView,
+    # Exports
+    AdminExportAPIView,
+    # Profilage
+    AdminProfileListAPIView,
+    AdminProfileTokenAPIView,
+    AdminProfilingSamplingAPIView,
+    AdminProfileDetailAPIView,
 )
 
 app_name = 'admin_api'
@@ -23,17 +35,31 @@ app_name = 'admin_api'
 urlpatterns = [
     # Dashboard
     path('dashboard/', AdminDashboardAPIView.as_view(), name='dashboard'),
+    path('analytics/', AdminAnalyticsAPIView.as_view(), name='analytics'),
     
     # Users
     path('users/', AdminUserListAPIView.as_view(), name='user_list'),
+    path('users/bulk/', AdminUserBulkAPIView.as_view(), name='user_bulk'),
     path('users/<int:user_id>/', AdminUserDetailAPIView.as_view(), name='user_detail'),
     path('users/<int:user_id>/invalidate-sessions/', AdminInvalidateUserSessionsAPIView.as_view(), name='invalidate_sessions'),
     
     # Categories
     path('categories/', AdminCategoryListAPIView.as_view(), name='category_list'),
+    path('categories/reorder/', AdminCategoryReorderAPIView.as_view(), name='category_reorder'),
     path('categories/<int:category_id>/', AdminCategoryDetailAPIView.as_view(), name='category_detail'),
     
     # Videos
     path('videos/', AdminVideoListAPIView.as_view(), name='video_list'),
+    path('videos/bulk/', AdminVideoBulkAPIView.as_view(), name='video_bulk'),
+    path('videos/reorder/', AdminVideoReorderAPIView.as_view(), name='video_reorder'),
     path('videos/<int:video_id>/', AdminVideoDetailAPIView.as_view(), name='video_detail'),
+    
+    # Exports
+    path('export/<slug:resource>.<slug:export_format>', AdminExportAPIView.as_view(), name='export'),
+    
+    # Profilage
+    path('profiles/', AdminProfileListAPIView.as_view(), name='profile_list'),
+    path('profiles/token/', AdminProfileTokenAPIView.as_view(), name='profile_token'),
+    path('profiles/sampling/', AdminProfilingSamplingAPIView.as_view(), name='profile_sampling'),
+    path('profiles/<str:name>/', AdminProfileDetailAPIView.as_view(), name='profile_detail'),
 ]
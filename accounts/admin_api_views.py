@@ -7,14 +7,36 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError
+from django.db.models import Exists, OuterRef
+from django.http import FileResponse, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from monitoring import profiling
+from monitoring.invalidation import bump_on_commit
+from monitoring.models import PROFILING_STAMP, ProfilingSwitch
 from videos.models import Video, Category
 from videos.serializers import VideoSerializer, CategorySerializer
+from videos.bulk_import import VideoBulkImporter, iter_csv_rows
+from videos.analytics import top_videos, category_trends
+from videos.ordering import (
+    apply_sequence, move_after, video_siblings, category_siblings
+)
 from .serializers import UserSerializer
-from .models import UserSession
+from .models import UserSession, ActiveToken
+from .tokens import blacklist_user_tokens
+from .events import publish_session_revoked
+from .provisioning import UserProvisioner
+from .exports import EXPORTS, FORMATS as EXPORT_FORMATS, export_response
+from . import stats
+import csv
 import logging
+from datetime import timedelta
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +46,35 @@ class IsAdminPermission(IsAdminUser):
     message = "Accès réservé aux administrateurs."
 
 
+def _reorder(model, siblings, data):
+    """
+    Applique un réordonnancement à une liste ordonnée d'éléments.
+    
+    `data` contient soit `ids` (nouvelle séquence complète), soit `id` et
+    `after` (déplacement d'un seul élément après un autre, `null` = en tête).
+    Retourne (nombre de lignes modifiées, message d'erreur).
+    """
+    by_id = {obj.pk: obj for obj in siblings}
+    
+    if 'ids' in data:
+        ids = data['ids']
+        if (not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids)
+                or len(ids) != len(set(ids)) or set(ids) != set(by_id)):
+            return None, 'La séquence doit contenir exactement une fois chaque élément'
+        return apply_sequence(model, [by_id[pk] for pk in ids]), None
+    
+    obj_id, after_id = data.get('id'), data.get('after')
+    obj = by_id.get(obj_id) if isinstance(obj_id, int) else None
+    if obj is None:
+        return None, 'Élément introuvable'
+    after = None
+    if after_id is not None:
+        after = by_id.get(after_id) if isinstance(after_id, int) else None
+        if after is None or after.pk == obj.pk:
+            return None, 'Élément de référence invalide'
+    return move_after(model, obj, siblings, after), None
+
+
 # =============================================================================
 # GESTION DES UTILISATEURS
 # =============================================================================
@@ -36,17 +87,19 @@ class AdminUserListAPIView(APIView):
     POST /api/admin/users/ - Crée un nouvel utilisateur
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 3, 'post': 5}
     
     def get(self, request):
-        from .models import ActiveToken
-        users = User.objects.all().order_by('-date_joined')
+        users = User.objects.annotate(
+            has_active_token=Exists(ActiveToken.objects.filter(user=OuterRef('pk')))
+        ).order_by('-date_joined')
         data = []
         for user in users:
             user_data = UserSerializer(user).data
             user_data['is_staff'] = user.is_staff
             user_data['is_superuser'] = user.is_superuser
             # Compter les sessions actives (1 si token actif existe, 0 sinon)
-            user_data['active_sessions'] = 1 if ActiveToken.objects.filter(user=user).exists() else 0
+            user_data['active_sessions'] = 1 if user.has_active_token else 0
             data.append(user_data)
         return Response({
             'users': data,
@@ -80,7 +133,7 @@ class AdminUserListAPIView(APIView):
             password=make_password(password)
         )
         
-        logger.info(f"Utilisateur créé: {username} par {request.user.username}")
+        logger.info("Utilisateur créé: %s par %s", username, request.user.username)
         
         return Response({
             'message': 'Utilisateur créé avec succès',
@@ -88,6 +141,64 @@ class AdminUserListAPIView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class AdminUserBulkAPIView(APIView):
+    """
+    Création en masse des utilisateurs.
+    
+    POST /api/admin/users/bulk/
+    POST /api/admin/users/bulk/?generate_passwords=1
+    Body: tableau JSON d'objets, ou CSV (Content-Type: text/csv) avec les colonnes
+    username, password, email, first_name, last_name et is_staff.
+    
+    Les mots de passe sont hachés dans la requête (environ 0,3 s par compte) :
+    au plus USER_BULK_API_MAX_ROWS lignes, sinon 400 sans rien créer (commande
+    `provision_users` pour les gros fichiers). Avec `generate_passwords`, un mot
+    de passe temporaire est généré pour les lignes qui n'en ont pas et renvoyé
+    une seule fois dans le rapport.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 5
+    
+    def post(self, request):
+        generate = request.query_params.get('generate_passwords', '').lower() in ('1', 'true', 'oui')
+        provisioner = UserProvisioner(generate_passwords=generate)
+        max_rows = settings.USER_BULK_API_MAX_ROWS
+        
+        if request.content_type.startswith('text/csv'):
+            try:
+                # Lecture complète avant toute écriture (au plus max_rows + 1 lignes)
+                rows = list(islice(iter_csv_rows(request.stream or []), max_rows + 1))
+            except (UnicodeDecodeError, csv.Error) as e:
+                return Response({
+                    'error': f'CSV invalide : {e}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                return Response({
+                    'error': 'Un tableau JSON ou un fichier CSV est attendu'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if len(rows) > max_rows:
+            return Response({
+                'error': f'Au plus {max_rows} comptes par requête : utiliser la commande '
+                         '`python manage.py provision_users` pour ce fichier'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            report = provisioner.run(rows)
+        finally:
+            # bulk_create ne déclenche pas les signaux des statistiques
+            stats.invalidate()
+        
+        logger.info(
+            "Création de comptes en masse par %s: %s créé(s), %s erreur(s)",
+            request.user.username, report['created'], report['failed'],
+        )
+        
+        return Response(report, status=status.HTTP_200_OK)
+
+
 class AdminUserDetailAPIView(APIView):
     """
     Détail, modification et suppression d'un utilisateur.
@@ -97,6 +208,7 @@ class AdminUserDetailAPIView(APIView):
     DELETE /api/admin/users/<id>/ - Supprime un utilisateur
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 4, 'put': 5, 'delete': 14}
     
     def get(self, request, user_id):
         user = get_object_or_404(User, id=user_id)
@@ -131,7 +243,7 @@ class AdminUserDetailAPIView(APIView):
         
         user.save()
         
-        logger.info(f"Utilisateur modifié: {user.username} par {request.user.username}")
+        logger.info("Utilisateur modifié: %s par %s", user.username, request.user.username)
         
         return Response({
             'message': 'Utilisateur modifié avec succès',
@@ -150,7 +262,7 @@ class AdminUserDetailAPIView(APIView):
         username = user.username
         user.delete()
         
-        logger.info(f"Utilisateur supprimé: {username} par {request.user.username}")
+        logger.info("Utilisateur supprimé: %s par %s", username, request.user.username)
         
         return Response({
             'message': f'Utilisateur {username} supprimé avec succès'
@@ -164,11 +276,9 @@ class AdminInvalidateUserSessionsAPIView(APIView):
     POST /api/admin/users/<id>/invalidate-sessions/
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 10
     
     def post(self, request, user_id):
-        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
-        from .models import ActiveToken
-        
         user = get_object_or_404(User, id=user_id)
         
         # 1. Invalider les sessions Django
@@ -176,22 +286,19 @@ class AdminInvalidateUserSessionsAPIView(APIView):
         
         # 2. Supprimer le token actif (déconnexion immédiate)
         ActiveToken.invalidate_token(user)
+        publish_session_revoked(user.pk, None, 'admin_invalidated')
         
         # 3. Blacklister tous les tokens JWT de l'utilisateur
         token_count = 0
         try:
-            tokens = OutstandingToken.objects.filter(user=user)
-            for token in tokens:
-                try:
-                    _, created = BlacklistedToken.objects.get_or_create(token=token)
-                    if created:
-                        token_count += 1
-                except Exception:
-                    pass
-        except Exception as e:
-            logger.warning(f"Erreur lors du blacklisting des tokens: {e}")
-        
-        logger.info(f"Sessions invalidées pour {user.username}: {session_count} sessions, {token_count} tokens par {request.user.username}")
+            token_count = blacklist_user_tokens(user)
+        except DatabaseError as e:
+            logger.warning("Erreur lors du blacklisting des tokens: %s", e)
+        
+        logger.info(
+            "Sessions invalidées pour %s: %s sessions, %s tokens par %s",
+            user.username, session_count, token_count, request.user.username,
+        )
         
         return Response({
             'message': f'Session invalidée pour {user.username}',
@@ -212,9 +319,10 @@ class AdminCategoryListAPIView(APIView):
     POST /api/admin/categories/ - Crée une nouvelle catégorie
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 3, 'post': 5}
     
     def get(self, request):
-        categories = Category.objects.all().order_by('order', 'name')
+        categories = Category.objects.with_published_video_count().order_by('order', 'name')
         return Response({
             'categories': CategorySerializer(categories, many=True).data,
             'count': categories.count()
@@ -236,7 +344,7 @@ class AdminCategoryListAPIView(APIView):
             order=order
         )
         
-        logger.info(f"Catégorie créée: {name} par {request.user.username}")
+        logger.info("Catégorie créée: %s par %s", name, request.user.username)
         
         return Response({
             'message': 'Catégorie créée avec succès',
@@ -244,11 +352,37 @@ class AdminCategoryListAPIView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class AdminCategoryReorderAPIView(APIView):
+    """
+    Réordonne les catégories.
+    
+    POST /api/admin/categories/reorder/
+    Body: { "ids": [3, 1, 2] } - nouvelle séquence complète
+       ou { "id": 3, "after": 1 } - déplace une catégorie (after: null = en tête)
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 3
+    
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Un objet JSON est attendu'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        updated, error = _reorder(Category, category_siblings(), request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Ordre des catégories mis à jour',
+            'updated': updated
+        }, status=status.HTTP_200_OK)
+
+
 class AdminCategoryDetailAPIView(APIView):
     """
     Détail, modification et suppression d'une catégorie.
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 4, 'put': 6, 'delete': 8}
     
     def get(self, request, category_id):
         category = get_object_or_404(Category, id=category_id)
@@ -295,9 +429,10 @@ class AdminVideoListAPIView(APIView):
     POST /api/admin/videos/ - Crée une nouvelle vidéo
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 3, 'post': 5}
     
     def get(self, request):
-        videos = Video.objects.all().order_by('-created_at')
+        videos = Video.objects.select_related('category').order_by('-created_at')
         return Response({
             'videos': VideoSerializer(videos, many=True).data,
             'count': videos.count()
@@ -329,7 +464,7 @@ class AdminVideoListAPIView(APIView):
             is_published=is_published
         )
         
-        logger.info(f"Vidéo créée: {title} par {request.user.username}")
+        logger.info("Vidéo créée: %s par %s", title, request.user.username)
         
         return Response({
             'message': 'Vidéo créée avec succès',
@@ -337,11 +472,104 @@ class AdminVideoListAPIView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
+class AdminVideoBulkAPIView(APIView):
+    """
+    Import en masse des vidéos (création ou mise à jour).
+    
+    POST /api/admin/videos/bulk/
+    Body: tableau JSON d'objets, ou CSV (Content-Type: text/csv) avec les colonnes
+    title, youtube_url, description, category, order, is_published et id (optionnel).
+    
+    Une ligne avec `id` met à jour cette vidéo ; sinon la vidéo ayant la même
+    URL YouTube est mise à jour, ou une nouvelle vidéo est créée. Les catégories
+    sont désignées par leur nom et créées si besoin. Le CSV est lu en flux.
+    
+    Les lignes sont écrites par lots de 500, chacun dans sa transaction : un
+    CSV illisible en cours de lecture donne une réponse 400 avec le rapport
+    des lots déjà écrits et `error`. Le budget de requêtes SQL couvre un lot.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 10
+    
+    def post(self, request):
+        importer = VideoBulkImporter()
+        
+        if request.content_type.startswith('text/csv'):
+            rows = iter_csv_rows(request.stream or [])
+        else:
+            rows = request.data
+            if not isinstance(rows, list):
+                return Response({
+                    'error': 'Un tableau JSON ou un fichier CSV est attendu'
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            report = importer.run(rows)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Les lots précédents sont déjà écrits : rapport partiel
+            report = importer.report()
+            report['error'] = f'CSV invalide : {e} (lignes suivantes non importées)'
+            logger.warning(
+                "Import de vidéos interrompu par %s: %s créée(s), %s modifiée(s) avant l'erreur",
+                request.user.username, report['created'], report['updated'],
+            )
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            # bulk_create/bulk_update ne déclenchent pas les signaux des statistiques
+            stats.invalidate()
+        
+        logger.info(
+            "Import de vidéos par %s: %s créée(s), %s modifiée(s), %s erreur(s)",
+            request.user.username, report['created'], report['updated'], report['failed'],
+        )
+        
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class AdminVideoReorderAPIView(APIView):
+    """
+    Réordonne les vidéos d'une catégorie.
+    
+    POST /api/admin/videos/reorder/
+    Body: { "category": 2, "ids": [7, 5, 6] } - nouvelle séquence complète
+       ou { "id": 7, "after": 5 } - déplace une vidéo dans sa catégorie (after: null = en tête)
+    
+    `category` vaut null pour les vidéos sans catégorie.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 4
+    
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response({'error': 'Un objet JSON est attendu'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if 'ids' in request.data:
+            category_id = request.data.get('category')
+            if category_id is not None and not isinstance(category_id, int):
+                return Response({'error': 'Catégorie invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            video_id = request.data.get('id')
+            if not isinstance(video_id, int):
+                return Response({'error': 'Élément introuvable'}, status=status.HTTP_400_BAD_REQUEST)
+            video = get_object_or_404(Video, id=video_id)
+            category_id = video.category_id
+        
+        updated, error = _reorder(Video, video_siblings(category_id), request.data)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': 'Ordre des vidéos mis à jour',
+            'updated': updated
+        }, status=status.HTTP_200_OK)
+
+
 class AdminVideoDetailAPIView(APIView):
     """
     Détail, modification et suppression d'une vidéo.
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 4, 'put': 5, 'delete': 7}
     
     def get(self, request, video_id):
         video = get_object_or_404(Video, id=video_id)
@@ -394,44 +622,211 @@ class AdminDashboardAPIView(APIView):
     Statistiques pour le dashboard admin.
     
     GET /api/admin/dashboard/
+    
+    `active_sessions` compte les sessions JWT actives (ActiveToken).
     """
     permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 5
     
     def get(self, request):
-        total_users = User.objects.count()
-        total_videos = Video.objects.count()
-        published_videos = Video.objects.filter(is_published=True).count()
-        total_categories = Category.objects.count()
-        active_sessions = UserSession.objects.count()
-        
-        # Derniers utilisateurs
-        recent_users = User.objects.order_by('-date_joined')[:5]
+        # Instantané en cache, calculé en une requête et tenu à jour par signaux
+        return Response(stats.get_snapshot(), status=status.HTTP_200_OK)
+
+
+class AdminAnalyticsAPIView(APIView):
+    """
+    Statistiques de vues à partir des cumuls pré-agrégés.
+    
+    GET /api/admin/analytics/
+    GET /api/admin/analytics/?period=hour&count=48&limit=20
+    
+    - top_videos_week / top_videos_today : vidéos les plus vues
+    - category_trends : vues par catégorie sur les `count` dernières périodes
+      (`period` = hour, day ou week)
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 5
+    
+    def get(self, request):
+        period = request.query_params.get('period', 'day')
+        if period not in ('hour', 'day', 'week'):
+            return Response({
+                'error': 'Période invalide (hour, day ou week)'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Dernières vidéos
-        recent_videos = Video.objects.order_by('-created_at')[:5]
+        try:
+            count = min(max(int(request.query_params.get('count', 30)), 1), 366)
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            return Response({
+                'error': 'Paramètres invalides'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({
-            'stats': {
-                'total_users': total_users,
-                'total_videos': total_videos,
-                'published_videos': published_videos,
-                'total_categories': total_categories,
-                'active_sessions': active_sessions,
-            },
-            'recent_users': [
-                {
-                    'id': u.id,
-                    'username': u.username,
-                    'email': u.email,
-                    'date_joined': u.date_joined
-                } for u in recent_users
-            ],
-            'recent_videos': [
-                {
-                    'id': v.id,
-                    'title': v.title,
-                    'is_published': v.is_published,
-                    'created_at': v.created_at
-                } for v in recent_videos
-            ]
+            'top_videos_week': top_videos('week', limit),
+            'top_videos_today': top_videos('day', limit),
+            'category_trends': category_trends(period, count),
+            'period': period,
         }, status=status.HTTP_200_OK)
+
+
+# =============================================================================
+# EXPORTS
+# =============================================================================
+
+class AdminExportAPIView(APIView):
+    """
+    Export en flux d'une table complète.
+    
+    GET /api/admin/export/users.csv
+    GET /api/admin/export/sessions.ndjson
+    GET /api/admin/export/videos.csv
+    
+    Les lignes sont lues par lots et envoyées au fil de l'eau (voir
+    accounts/exports.py), sous WSGI comme sous ASGI : la mémoire utilisée ne
+    dépend pas du nombre de lignes.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 3
+    
+    def get(self, request, resource, export_format):
+        if resource not in EXPORTS or export_format not in EXPORT_FORMATS:
+            return Response({
+                'error': f"Export inconnu (ressources : {', '.join(EXPORTS)} ; "
+                         f"formats : {', '.join(EXPORT_FORMATS)})"
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        logger.info("Export %s.%s par %s", resource, export_format, request.user.username)
+        return export_response(
+            resource, export_format, asynchronous=isinstance(request._request, ASGIRequest)
+        )
+
+
+# =============================================================================
+# PROFILAGE À LA DEMANDE
+# =============================================================================
+
+def _sampling_data(switch):
+    return {
+        'sample_rate': switch.sample_rate if switch else 0.0,
+        'view_name': switch.view_name if switch else '',
+        'expires_at': switch.expires_at.isoformat() if switch and switch.expires_at else None,
+        'active': bool(switch and switch.is_active()),
+    }
+
+
+class AdminProfileListAPIView(APIView):
+    """
+    Profils de requêtes enregistrés (les plus récents d'abord).
+    
+    GET /api/admin/profiles/?limit=50
+    
+    Voir monitoring/profiling.py pour les déclencheurs.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 2
+    
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+        except ValueError:
+            return Response({'error': 'limit doit être un entier'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        profiles = profiling.list_profiles(limit)
+        return Response({'profiles': profiles, 'count': len(profiles)})
+
+
+class AdminProfileDetailAPIView(APIView):
+    """
+    Téléchargement d'un profil.
+    
+    GET /api/admin/profiles/<name>/ - Fichier .prof (pstats, snakeviz)
+    GET /api/admin/profiles/<name>/?output=text - Résumé trié par temps cumulé
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 2
+    
+    def get(self, request, name):
+        path = profiling.profile_path(name)
+        if path is None:
+            return Response({'error': 'Profil non trouvé'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.query_params.get('output') == 'text':
+            return HttpResponse(profiling.render_text(path), content_type='text/plain; charset=utf-8')
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=path.name,
+            content_type='application/octet-stream',
+        )
+
+
+class AdminProfileTokenAPIView(APIView):
+    """
+    Jeton de l'en-tête X-Profile : chaque requête qui le porte est profilée.
+    
+    POST /api/admin/profiles/token/
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = 2
+    
+    def post(self, request):
+        logger.info("Jeton de profilage délivré à %s", request.user.username)
+        return Response({
+            'header': profiling.HEADER,
+            'token': profiling.issue_token(request.user),
+            'expires_in': profiling.token_max_age(),
+        })
+
+
+class AdminProfilingSamplingAPIView(APIView):
+    """
+    Échantillonnage des requêtes profilées.
+    
+    GET /api/admin/profiles/sampling/
+    PUT /api/admin/profiles/sampling/ - {"sample_rate": 0.01, "view_name": "videos_api:video_list",
+                                         "duration": 3600}
+    
+    `duration` (secondes, 3600 par défaut, null = sans limite) fixe l'expiration.
+    Pris en compte par tous les workers en INVALIDATION_POLL_INTERVAL secondes.
+    """
+    permission_classes = [IsAuthenticated, IsAdminPermission]
+    query_budget = {'get': 3, 'put': 5}
+    
+    def get(self, request):
+        switch = ProfilingSwitch.objects.filter(pk=ProfilingSwitch.SINGLETON_ID).first()
+        return Response(_sampling_data(switch))
+    
+    def put(self, request):
+        data = request.data
+        try:
+            sample_rate = float(data.get('sample_rate', 0))
+            duration = data.get('duration', 3600)
+            duration = None if duration is None else int(duration)
+        except (TypeError, ValueError):
+            return Response({'error': 'sample_rate et duration doivent être des nombres'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        view_name = data.get('view_name') or ''
+        if not 0 <= sample_rate <= 1:
+            return Response({'error': 'sample_rate doit être compris entre 0 et 1'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if duration is not None and duration <= 0:
+            return Response({'error': 'duration doit être positive'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(view_name, str) or len(view_name) > 200:
+            return Response({'error': 'view_name invalide'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        switch = ProfilingSwitch(
+            pk=ProfilingSwitch.SINGLETON_ID,
+            sample_rate=sample_rate,
+            view_name=view_name,
+            expires_at=timezone.now() + timedelta(seconds=duration) if duration else None,
+            updated_by=request.user,
+        )
+        # Une requête UPDATE (INSERT la première fois : le signal post_save incrémente la version)
+        if ProfilingSwitch.objects.filter(pk=switch.pk).update(
+            sample_rate=switch.sample_rate, view_name=switch.view_name,
+            expires_at=switch.expires_at, updated_by=switch.updated_by, updated_at=timezone.now(),
+        ):
+            bump_on_commit(PROFILING_STAMP)
+        else:
+            switch.save(force_insert=True)
+        logger.info("Échantillonnage du profilage: %s par %s", switch, request.user.username)
+        return Response(_sampling_data(switch))
@@ -9,6 +9,8 @@ from .api_views import (
     CurrentUserAPIView,
     UserSessionsAPIView,
     RefreshTokenAPIView,
+    SessionEventsTicketAPIView,
+    session_events_view,
 )
 
 app_name = 'accounts_api'
@@ -19,4 +21,6 @@ urlpatterns = [
     path('refresh/', RefreshTokenAPIView.as_view(), name='refresh'),
     path('me/', CurrentUserAPIView.as_view(), name='me'),
     path('sessions/', UserSessionsAPIView.as_view(), name='sessions'),
+    path('events/ticket/', SessionEventsTicketAPIView.as_view(), name='events_ticket'),
+    path('events/', session_events_view, name='events'),
 ]
@@ -6,17 +6,32 @@ Endpoints:
 - POST /api/auth/logout/ : Déconnexion
 - GET /api/auth/me/ : Informations utilisateur courant
 - GET /api/auth/sessions/ : Sessions actives de l'utilisateur
+- POST /api/auth/events/ticket/ : Ticket d'ouverture du flux SSE
+- GET /api/auth/events/ : Flux SSE des révocations de session
 """
 
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from asgiref.sync import sync_to_async
 from django.contrib.auth import login
-from .models import UserSession
+from django.db import DatabaseError, connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from monitoring import metrics
+from .authentication import SingleSessionJWTAuthentication
+from .events import (
+    aiter_session_events, iter_session_events, publish_session_revoked,
+    issue_ticket, read_ticket, ticket_lifetime,
+)
+from .models import UserSession, ActiveToken
 from .serializers import LoginSerializer, UserSerializer, UserSessionSerializer
+from .throttling import LoginRateThrottle, RefreshRateThrottle
+from .tokens import issue_session_tokens, get_session_id, blacklist_user_tokens
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +47,8 @@ class LoginAPIView(APIView):
     Retourne les tokens JWT et invalide les anciennes sessions.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
+    query_budget = 11
     
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -48,35 +65,33 @@ class LoginAPIView(APIView):
             
             if invalidated_count > 0:
                 logger.info(
-                    f"API Login: {invalidated_count} ancienne(s) session(s) invalidée(s) pour {user.username}"
+                    "API Login: %s ancienne(s) session(s) invalidée(s) pour %s",
+                    invalidated_count, user.username,
                 )
             
             # 2. Blacklister tous les anciens tokens JWT de l'utilisateur
             try:
-                tokens = OutstandingToken.objects.filter(user=user)
-                for token in tokens:
-                    try:
-                        BlacklistedToken.objects.get_or_create(token=token)
-                    except Exception:
-                        pass
-            except Exception as e:
-                logger.warning(f"Erreur lors du blacklisting des tokens: {e}")
+                blacklist_user_tokens(user)
+            except DatabaseError as e:
+                logger.warning("Erreur lors du blacklisting des tokens: %s", e)
             
-            # 3. Générer de nouveaux tokens JWT
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
+            # 3. Générer de nouveaux tokens JWT (nouvelle famille de session)
+            refresh, access, sid = issue_session_tokens(user)
+            access_token = str(access)
             refresh_token = str(refresh)
             
-            # 4. Stocker le JTI comme token actif (SESSION UNIQUE)
-            from .models import ActiveToken
+            # 4. Stocker le sid comme session active (SESSION UNIQUE)
             ip_address = self._get_client_ip(request)
             user_agent = request.META.get('HTTP_USER_AGENT', '')[:500]
             
-            # Le JTI du access token est utilisé pour identifier la session
-            jti = refresh.access_token.get('jti')
-            ActiveToken.set_active_token(user, jti, ip_address, user_agent)
+            # Le sid est partagé par le refresh token et tous les access tokens dérivés
+            ActiveToken.set_active_token(user, sid, ip_address, user_agent)
+            
+            # 5. Prévenir immédiatement l'ancien appareil (flux /api/auth/events/)
+            publish_session_revoked(user.pk, sid, 'login_elsewhere')
             
-            logger.info(f"API Login réussi pour {user.username} depuis {ip_address}")
+            logger.info("API Login réussi pour %s depuis %s", user.username, ip_address)
+            metrics.record_login(True)
             
             return Response({
                 'access': access_token,
@@ -86,6 +101,7 @@ class LoginAPIView(APIView):
                 'sessions_invalidated': invalidated_count,
             }, status=status.HTTP_200_OK)
         
+        metrics.record_login(False)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     def _get_client_ip(self, request):
@@ -104,23 +120,29 @@ class LogoutAPIView(APIView):
     Body: { "refresh": "..." } (optionnel, pour blacklister le token)
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 4
     
     def post(self, request):
         try:
+            # Fermer la session active si ce token en fait partie
+            sid = get_session_id(request.auth)
+            if sid:
+                ActiveToken.invalidate_token(request.user, sid)
+            
             # Blacklister le refresh token si fourni
             refresh_token = request.data.get('refresh')
             if refresh_token:
                 token = RefreshToken(refresh_token)
                 token.blacklist()
             
-            logger.info(f"API Logout pour {request.user.username}")
+            logger.info("API Logout pour %s", request.user.username)
             
             return Response({
                 'message': 'Déconnexion réussie'
             }, status=status.HTTP_200_OK)
         
         except Exception as e:
-            logger.error(f"Erreur lors du logout: {e}")
+            logger.error("Erreur lors du logout: %s", e)
             return Response({
                 'message': 'Déconnexion effectuée'
             }, status=status.HTTP_200_OK)
@@ -133,6 +155,7 @@ class CurrentUserAPIView(APIView):
     GET /api/auth/me/
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 2
     
     def get(self, request):
         return Response({
@@ -147,6 +170,7 @@ class UserSessionsAPIView(APIView):
     GET /api/auth/sessions/
     """
     permission_classes = [IsAuthenticated]
+    query_budget = 3
     
     def get(self, request):
         sessions = UserSession.objects.filter(user=request.user)
@@ -162,8 +186,13 @@ class RefreshTokenAPIView(APIView):
     
     POST /api/auth/refresh/
     Body: { "refresh": "..." }
+    
+    Le nouvel access token hérite du `sid` du refresh token : aucune
+    écriture en base, la session unique reste vérifiée à l'utilisation.
     """
     permission_classes = [AllowAny]
+    throttle_classes = [RefreshRateThrottle]
+    query_budget = 1
     
     def post(self, request):
         refresh_token = request.data.get('refresh')
@@ -185,3 +214,98 @@ class RefreshTokenAPIView(APIView):
             return Response({
                 'error': 'Token invalide ou expiré'
             }, status=status.HTTP_401_UNAUTHORIZED)
+
+
+def _release_connection():
+    """Ferme la connexion à la base du thread (hors transaction) : le flux n'en a plus besoin."""
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+class SessionEventsTicketAPIView(APIView):
+    """
+    Ticket d'ouverture du flux SSE des révocations de session.
+    
+    POST /api/auth/events/ticket/
+    Réponse: { "ticket": "...", "expires_in": 30 }
+    
+    Le ticket est signé, valable SSE_TICKET_SECONDS et n'ouvre que le flux
+    GET /api/auth/events/?ticket=<ticket> de cette session : le JWT ne
+    figure jamais dans une URL (journaux, historique).
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 2
+    
+    def post(self, request):
+        sid = get_session_id(request.auth)
+        if not sid:
+            return Response({
+                'error': 'Session JWT requise'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'ticket': issue_ticket(request.user.pk, sid),
+            'expires_in': ticket_lifetime(),
+        }, status=status.HTTP_200_OK)
+
+
+@require_GET
+def session_events_view(request):
+    """
+    Flux Server-Sent Events des révocations de session (voir accounts/events.py).
+    
+    GET /api/auth/events/?ticket=<ticket>   (voir SessionEventsTicketAPIView)
+    ou en-tête Authorization: Bearer <access> (clients autres qu'EventSource)
+    
+    Servi par une coroutine sous ASGI, par le thread de la requête sous WSGI
+    multi-thread (gthread). Un worker WSGI mono-thread serait bloqué pendant
+    SSE_MAX_SECONDS : réponse 503, le client se rabat sur /api/auth/me/.
+    """
+    is_asgi = hasattr(request, 'scope')
+    if not is_asgi and not request.META.get('wsgi.multithread'):
+        return JsonResponse({
+            'detail': 'Flux indisponible sur ce serveur (worker mono-thread)',
+            'code': 'events_unavailable'
+        }, status=503)
+    
+    ticket = request.GET.get('ticket')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    session = None
+    if ticket:
+        session = read_ticket(ticket)
+    elif header.startswith('Bearer '):
+        try:
+            validated_token = SingleSessionJWTAuthentication().get_validated_token(
+                header[len('Bearer '):].encode()
+            )
+            session = (validated_token[jwt_settings.USER_ID_CLAIM], get_session_id(validated_token))
+        except (InvalidToken, KeyError):
+            session = None
+    if session is None:
+        return JsonResponse({
+            'detail': 'Ticket ou token invalide ou expiré',
+            'code': 'token_not_valid'
+        }, status=401)
+    
+    user_id, sid = session
+    
+    def is_active():
+        try:
+            return ActiveToken.is_token_active(user_id, sid)
+        finally:
+            _release_connection()
+    
+    # Connexion de la requête (authentification) rendue avant l'attente
+    _release_connection()
+    
+    if is_asgi:
+        # ASGI : aucune ressource bloquée pendant l'attente
+        events = aiter_session_events(user_id, sid, sync_to_async(is_active))
+    else:
+        events = iter_session_events(user_id, sid, is_active)
+    
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un proxy (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
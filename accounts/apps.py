@@ -5,3 +5,14 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
     verbose_name = 'Gestion des Comptes'
+
+    def ready(self):
+        # Maintien de l'instantané des statistiques admin
+        from . import signals  # noqa: F401
+
+        # Préchauffage des workers (voir monitoring.warmup)
+        from monitoring import warmup
+        from . import warmers
+        warmup.register('jwt_backend', warmers.warm_jwt_backend)
+        warmup.register('accounts_serializers', warmers.warm_serializers)
+        warmup.register('admin_stats', warmers.warm_admin_stats, phase=warmup.WORKER)
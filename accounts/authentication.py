@@ -1,11 +1,20 @@
 """
 Authentification JWT personnalisée pour la session unique.
-Vérifie que le token utilisé est le token actif de l'utilisateur.
+Vérifie que le token appartient à la session active de l'utilisateur.
 """
 
+from django.db import DatabaseError
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from monitoring import metrics
+from monitoring.instrumentation import timed
+from .caching import get_user as get_cached_user
 from .models import ActiveToken
+from .tokens import get_session_id
+from .token_cache import verified_token_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,42 +22,85 @@ logger = logging.getLogger(__name__)
 
 class SingleSessionJWTAuthentication(JWTAuthentication):
     """
-    Authentification JWT qui vérifie que le token est le token actif de l'utilisateur.
+    Authentification JWT qui vérifie que le token appartient à la session active.
     Si l'utilisateur s'est connecté ailleurs, ce token devient invalide.
+
+    La vérification porte sur le claim `sid` (famille de session) et non sur le
+    JTI : les access tokens obtenus par rafraîchissement restent valides sans
+    écriture en base tant que la session n'a pas été remplacée.
     """
-    
+
+    def authenticate(self, request):
+        # Mesuré dans l'en-tête Server-Timing (`auth`)
+        with timed('auth'):
+            return super().authenticate(request)
+
     def get_validated_token(self, raw_token):
-        """Valide le token et vérifie qu'il est le token actif."""
+        """
+        Valide la signature et l'expiration du token.
+
+        Un token déjà vérifié par ce worker est servi depuis le cache jusqu'à
+        son expiration, sans nouvelle vérification HMAC ni décodage.
+        """
+        validated_token = verified_token_cache.get(raw_token)
+        metrics.record_cache('jwt_verified_tokens', validated_token is not None)
+        if validated_token is not None:
+            return validated_token
+
         validated_token = super().get_validated_token(raw_token)
+        verified_token_cache.set(raw_token, validated_token)
         return validated_token
-    
+
     def get_user(self, validated_token):
-        """Récupère l'utilisateur et vérifie que le token est actif."""
-        user = super().get_user(validated_token)
-        
-        # Récupérer le JTI du token
-        jti = validated_token.get('jti')
-        
-        if jti and user:
-            try:
-                # Vérifier si un token actif existe pour cet utilisateur
-                active_token = ActiveToken.objects.filter(user=user).first()
-                
-                if active_token:
-                    # Si un token actif existe, vérifier que c'est le bon
-                    if active_token.jti != jti:
-                        logger.warning(
-                            f"Token invalide pour {user.username}: n'est pas le token actif "
-                            "(connexion depuis un autre appareil)"
-                        )
-                        raise AuthenticationFailed(
-                            'Votre session a été interrompue car vous vous êtes connecté '
-                            'depuis un autre appareil.',
-                            code='token_not_active'
-                        )
-                # Si aucun token actif n'existe, on laisse passer (première connexion après migration)
-            except Exception as e:
-                # En cas d'erreur, logger et laisser passer
-                logger.error(f"Erreur lors de la vérification du token actif: {e}")
-        
+        """Récupère l'utilisateur et vérifie que sa session est active."""
+        user = self.get_account(validated_token)
+
+        # Récupérer l'identifiant de session du token
+        sid = get_session_id(validated_token)
+
+        try:
+            is_active = ActiveToken.is_token_active(user, sid)
+        except DatabaseError as e:
+            # En cas d'erreur de base de données, logger et laisser passer
+            logger.error("Erreur lors de la vérification du token actif: %s", e)
+            return user
+
+        if not is_active:
+            logger.warning(
+                "Token invalide pour %s: n'appartient pas à la session active "
+                "(connexion depuis un autre appareil)",
+                user.username,
+            )
+            metrics.record_session_eviction('jwt')
+            raise AuthenticationFailed(
+                'Votre session a été interrompue car vous vous êtes connecté '
+                'depuis un autre appareil.',
+                code='token_not_active'
+            )
+
+        return user
+
+    def get_account(self, validated_token):
+        """
+        Comme JWTAuthentication.get_user, avec le compte lu depuis le cache à
+        deux niveaux (accounts.caching) plutôt que depuis la base.
+        """
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if api_settings.USER_ID_FIELD != 'id' or not str(user_id).isdigit():
+            return super().get_user(validated_token)
+
+        user = get_cached_user(int(user_id))
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+
         return user
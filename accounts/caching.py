@@ -0,0 +1,110 @@
+"""
+Espace de noms `accounts` du cache à deux niveaux (eduplatform.caching).
+
+- `user` (id, génération) : champs du compte, lus à chaque requête
+  authentifiée par JWT (accounts.authentication) : plus de requête SQL sur
+  auth_user tant que le compte est en cache. Le hachage du mot de passe n'est
+  jamais mis en cache : il est chargé à la demande (champ différé).
+
+Invalidation par compte : chaque compte a une génération, gardée dans le L2
+(`accounts:generation:<id>`, jamais réutilisée) et recopiée dans le L1. Une
+modification d'un compte (hors last_login, voir accounts.signals) change sa
+génération après le commit, puis incrémente USERS_STAMP : les autres
+workers vident leur L1 `accounts:` (relu depuis le L2, sans requête SQL) et
+lisent la nouvelle génération au plus INVALIDATION_POLL_INTERVAL secondes
+après. Les entrées des autres comptes restent valides.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from eduplatform.caching import TwoTierCache, local_cache
+from monitoring import invalidation
+from .models import USERS_STAMP
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = 'accounts'
+
+accounts_cache = TwoTierCache(NAMESPACE, {'user': (int, int)})
+
+# Génération des comptes modifiés dans un autre worker : L1 relu depuis le L2
+invalidation.bus.watch(USERS_STAMP, lambda: local_cache.delete_prefix(f'{NAMESPACE}:'))
+
+# Champs mis en cache : tous sauf le hachage du mot de passe
+_USER_FIELDS = [field.attname for field in User._meta.concrete_fields if field.attname != 'password']
+
+
+def _generation_key(user_id):
+    return f'{NAMESPACE}:generation:{user_id}'
+
+
+def get_generation(user_id):
+    """Génération courante du compte (L1, puis L2 ; créée si absente), ou None."""
+    key = _generation_key(user_id)
+    generation = local_cache.get(key)
+    if isinstance(generation, int):
+        return generation
+    l2 = accounts_cache.l2
+    try:
+        generation = l2.get(key)
+        if generation is None:
+            # Absente (jamais lue ou évincée) : nouvelle valeur, relue car un
+            # autre worker a pu l'écrire entre-temps
+            l2.add(key, time.time_ns(), None)
+            generation = l2.get(key)
+    except Exception as e:
+        logger.warning("Cache accounts : génération du compte %s illisible: %s", user_id, e)
+        return None
+    if generation is None:
+        return None
+    local_cache.set(key, generation, getattr(settings, 'CACHE_L1_TIMEOUT', 30))
+    return generation
+
+
+def invalidate_user(user_id):
+    """Périme le compte en cache dans tous les workers, après le commit."""
+    def bump():
+        try:
+            accounts_cache.l2.set(_generation_key(user_id), time.time_ns(), None)
+        except Exception as e:
+            logger.warning("Cache accounts : génération du compte %s non modifiée: %s", user_id, e)
+        local_cache.delete(_generation_key(user_id))
+        invalidation.bus.bump(USERS_STAMP)
+
+    transaction.on_commit(bump)
+
+
+def _load_user_row(user_id):
+    user = User.objects.filter(pk=user_id).defer('password').first()
+    if user is None:
+        return None
+    return user._state.db, [getattr(user, field) for field in _USER_FIELDS]
+
+
+def get_user(user_id):
+    """
+    Utilisateur `user_id`, ou None s'il n'existe pas.
+
+    Une nouvelle instance à chaque appel : les attributs ajoutés pendant une
+    requête (ex. `_category_access`) ne sont pas partagés. `password` est un
+    champ différé (une requête s'il est lu).
+    """
+    generation = get_generation(user_id) if invalidation.is_enabled() else None
+    if generation is None:
+        row = _load_user_row(user_id)
+    else:
+        row = accounts_cache.get_or_set(
+            'user', user_id, generation, compute=lambda: _load_user_row(user_id)
+        )
+        if row is None:
+            # Compte absent : pas gardé en cache (il peut être créé sans signal)
+            accounts_cache.delete('user', user_id, generation)
+    if row is None:
+        return None
+    db, values = row
+    return User.from_db(db, _USER_FIELDS, values)
@@ -0,0 +1,308 @@
+"""
+Canal d'événements de session (Server-Sent Events).
+
+GET /api/auth/events/ garde une connexion ouverte par appareil connecté.
+Quand la session de l'utilisateur est remplacée (connexion ailleurs,
+LoginAPIView) ou révoquée par un administrateur
+(AdminInvalidateUserSessionsAPIView), l'événement `session_revoked` est
+poussé immédiatement à l'ancien appareil, qui n'a plus besoin d'interroger
+/api/auth/me/.
+
+Diffusion : SessionEventBroker, en mémoire, par utilisateur. Les abonnés
+sont soit des coroutines (serveur ASGI : une file asyncio par connexion,
+aucun thread bloqué), soit des threads (serveur WSGI gthread : une file
+bloquante, un thread occupé par connexion). Après le commit, la publication
+est remise aux connexions du processus courant et incrémente la version
+SESSIONS_STAMP du bus d'invalidation (monitoring.invalidation) : dans les
+autres workers, un thread du broker relit alors les sessions actives des
+utilisateurs abonnés (une requête) et prévient les connexions dont la
+session n'est plus active, au plus INVALIDATION_POLL_INTERVAL secondes après.
+Le motif y est déduit de l'état : `login_elsewhere` si une autre session est
+active, sinon `inactive`.
+
+Authentification : EventSource ne permet pas d'en-tête, et un JWT dans l'URL
+finirait dans les journaux. Le client obtient un ticket signé, valable
+SSE_TICKET_SECONDS et limité à ce flux (POST /api/auth/events/ticket/), puis
+ouvre GET /api/auth/events/?ticket=<ticket>.
+
+Format :
+    event: ready             (connexion établie)
+    : ping                   (toutes les SSE_HEARTBEAT_SECONDS)
+    event: session_revoked   (data : {"reason": "login_elsewhere" | "admin_invalidated" | "inactive"})
+
+Le flux est fermé après SSE_MAX_SECONDS : EventSource se reconnecte seul.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+
+from monitoring.invalidation import bus, bump_on_commit
+from .models import SESSIONS_STAMP, ActiveToken
+
+logger = logging.getLogger(__name__)
+
+SESSION_REVOKED = 'session_revoked'
+
+# Délai de reconnexion suggéré au navigateur (ms)
+RETRY_MS = 5000
+
+# Sel des tickets du flux : un ticket n'est valable que pour ce flux
+TICKET_SALT = 'accounts.events.ticket'
+
+
+def issue_ticket(user_id, sid):
+    """Ticket signé d'ouverture du flux pour la session `sid` de l'utilisateur."""
+    return signing.dumps({'u': str(user_id), 's': sid}, salt=TICKET_SALT, compress=True)
+
+
+def read_ticket(ticket):
+    """(user_id, sid) d'un ticket valide et non expiré, sinon None."""
+    try:
+        data = signing.loads(ticket, salt=TICKET_SALT, max_age=ticket_lifetime())
+    except signing.BadSignature:
+        return None
+    return data['u'], data['s']
+
+
+def ticket_lifetime():
+    return getattr(settings, 'SSE_TICKET_SECONDS', 30)
+
+
+class AsyncSubscription:
+    """Abonné servi par une coroutine (ASGI)."""
+    __slots__ = ('sid', '_loop', '_queue')
+
+    def __init__(self, sid):
+        self.sid = sid
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+    def deliver(self, event):
+        # Appelé depuis n'importe quel thread
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ThreadSubscription:
+    """Abonné servi par un thread (WSGI)."""
+    __slots__ = ('sid', '_queue')
+
+    def __init__(self, sid):
+        self.sid = sid
+        self._queue = queue.SimpleQueue()
+
+    def deliver(self, event):
+        self._queue.put(event)
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class SessionEventBroker:
+    """
+    Abonnés par utilisateur et diffusion des événements.
+
+    Les identifiants sont comparés sous forme de chaîne : la claim user_id
+    des tokens est une chaîne, la clé primaire un entier.
+
+    Un thread par processus (démarré au premier abonnement) suit la version
+    SESSIONS_STAMP et prévient les abonnés révoqués depuis un autre worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._thread = None
+        self._pid = None
+
+    def subscribe(self, user_id, subscription):
+        user_id = str(user_id)
+        self._ensure_watcher()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+
+    def unsubscribe(self, user_id, subscription):
+        user_id = str(user_id)
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event):
+        """Remet l'événement à chaque connexion de l'utilisateur ; retourne leur nombre."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(str(user_id), ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+        return len(subscriptions)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def revoke_inactive(self):
+        """
+        Prévient les abonnés dont la session n'est plus la session active
+        (une requête) ; retourne leur nombre.
+        """
+        with self._lock:
+            subscribers = {user_id: list(subs) for user_id, subs in self._subscribers.items()}
+        if not subscribers:
+            return 0
+        active = {
+            str(user_id): sid
+            for user_id, sid in ActiveToken.objects.filter(
+                user_id__in=list(subscribers)
+            ).values_list('user_id', 'sid')
+        }
+        revoked = 0
+        for user_id, subscriptions in subscribers.items():
+            active_sid = active.get(user_id)
+            event = {
+                'type': SESSION_REVOKED,
+                'active_sid': active_sid,
+                'reason': 'login_elsewhere' if active_sid else 'inactive',
+            }
+            for subscription in subscriptions:
+                if subscription.sid != active_sid:
+                    subscription.deliver(event)
+                    revoked += 1
+        return revoked
+
+    def _ensure_watcher(self):
+        # Un thread par processus : démarré au premier abonnement (après le fork)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._watch, name='session-events', daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        interval = getattr(settings, 'INVALIDATION_POLL_INTERVAL', 1.0)
+        seen = None
+        while True:
+            try:
+                bus.ensure_loaded(SESSIONS_STAMP)
+                version = bus.version(SESSIONS_STAMP)
+                if seen is not None and version != seen:
+                    self.revoke_inactive()
+                seen = version
+            except Exception as e:
+                logger.warning("Lecture des sessions actives impossible: %s", e)
+            finally:
+                # Le thread a sa propre connexion : ne pas la garder ouverte
+                connection.close()
+            time.sleep(interval)
+
+
+broker = SessionEventBroker()
+
+
+def publish_session_revoked(user_id, active_sid, reason):
+    """
+    Signale aux connexions de l'utilisateur que seule la session `active_sid`
+    reste valide (None : plus aucune), après le commit de la transaction :
+    immédiatement dans ce processus, via le bus d'invalidation ailleurs.
+    """
+    event = {'type': SESSION_REVOKED, 'active_sid': active_sid, 'reason': reason}
+    transaction.on_commit(lambda: broker.publish(user_id, event))
+    bump_on_commit(SESSIONS_STAMP)
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _opening():
+    return f"retry: {RETRY_MS}\n" + format_event('ready', {})
+
+
+def _revocation(event, sid):
+    """Message à envoyer si l'événement révoque la session `sid` (sinon None)."""
+    if event.get('type') == SESSION_REVOKED and event['active_sid'] != sid:
+        return format_event(SESSION_REVOKED, {'reason': event['reason']})
+    return None
+
+
+def _limits():
+    return (
+        getattr(settings, 'SSE_HEARTBEAT_SECONDS', 15),
+        getattr(settings, 'SSE_MAX_SECONDS', 300),
+    )
+
+
+async def aiter_session_events(user_id, sid, is_active):
+    """
+    Flux SSE d'une connexion servie en asynchrone (ASGI).
+
+    `is_active` : coroutine vérifiant que la session `sid` est toujours la
+    session active, appelée une fois l'abonnement pris (aucune révocation
+    ne peut être manquée entre la vérification et l'abonnement). Elle doit
+    rendre la connexion à la base : le flux n'en a plus besoin ensuite.
+    """
+    heartbeat, max_seconds = _limits()
+    subscription = AsyncSubscription(sid)
+    broker.subscribe(user_id, subscription)
+    try:
+        if not await is_active():
+            yield format_event(SESSION_REVOKED, {'reason': 'inactive'})
+            return
+        yield _opening()
+        deadline = time.monotonic() + max_seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await subscription.get(min(heartbeat, remaining))
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            message = _revocation(event, sid)
+            if message is not None:
+                yield message
+                return
+    finally:
+        broker.unsubscribe(user_id, subscription)
+
+
+def iter_session_events(user_id, sid, is_active):
+    """Flux SSE d'une connexion servie par un thread (WSGI), voir aiter_session_events."""
+    heartbeat, max_seconds = _limits()
+    subscription = ThreadSubscription(sid)
+    broker.subscribe(user_id, subscription)
+    try:
+        if not is_active():
+            yield format_event(SESSION_REVOKED, {'reason': 'inactive'})
+            return
+        yield _opening()
+        deadline = time.monotonic() + max_seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = subscription.get(min(heartbeat, remaining))
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            message = _revocation(event, sid)
+            if message is not None:
+                yield message
+                return
+    finally:
+        broker.unsubscribe(user_id, subscription)
@@ -0,0 +1,165 @@
+"""
+Exports en flux (CSV ou NDJSON) pour l'administration.
+
+Utilisé par l'API d'administration GET /api/admin/export/<ressource>.<format>.
+
+Les lignes sont lues par lots avec `.values_list().iterator()` (curseur côté
+serveur sur PostgreSQL) et écrites au fil de l'eau dans une
+StreamingHttpResponse : la mémoire utilisée ne dépend pas de la taille de la
+table. Les lignes sont regroupées par paquets de CHUNK_SIZE avant envoi pour
+limiter le nombre d'écritures sur la socket.
+
+Sous ASGI, Django lirait un itérateur synchrone en entier avant l'envoi : la
+réponse reçoit alors un itérateur asynchrone qui lit chaque paquet dans le
+thread de la requête (`sync_to_async(thread_sensitive=True)`, même connexion
+à la base).
+"""
+
+import csv
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from videos.models import Video
+from .models import ActiveToken, UserSession
+
+# Lignes lues par requête au curseur
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _users():
+    return User.objects.annotate(
+        has_active_token=Exists(ActiveToken.objects.filter(user=OuterRef('pk')))
+    ).order_by('pk')
+
+
+def _sessions():
+    return UserSession.objects.order_by('pk')
+
+
+def _videos():
+    return Video.objects.order_by('pk')
+
+
+# Ressource -> (queryset, colonnes exportées : nom -> champ pour values_list)
+EXPORTS = {
+    'users': (_users, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'is_active': 'is_active',
+        'is_staff': 'is_staff',
+        'is_superuser': 'is_superuser',
+        'date_joined': 'date_joined',
+        'last_login': 'last_login',
+        'active_session': 'has_active_token',
+    }),
+    'sessions': (_sessions, {
+        'id': 'id',
+        'user_id': 'user_id',
+        'username': 'user__username',
+        'created_at': 'created_at',
+        'ip_address': 'ip_address',
+        'user_agent': 'user_agent',
+    }),
+    'videos': (_videos, {
+        'id': 'id',
+        'title': 'title',
+        'description': 'description',
+        'youtube_url': 'youtube_url',
+        'category_id': 'category_id',
+        'category': 'category__name',
+        'order': 'order',
+        'is_published': 'is_published',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+}
+
+
+class _Echo:
+    """Pseudo-fichier pour csv.writer : retourne la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(resource, chunk_size=CHUNK_SIZE):
+    """En-têtes et itérateur des lignes (tuples) d'une ressource."""
+    queryset, columns = EXPORTS[resource]
+    rows = queryset().values_list(*columns.values()).iterator(chunk_size=chunk_size)
+    return list(columns), rows
+
+
+def iter_csv(headers, rows, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    # BOM : ouverture correcte des accents dans Excel
+    buffer = ['\ufeff' + writer.writerow(headers)]
+    for row in rows:
+        buffer.append(writer.writerow([_csv_value(value) for value in row]))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def iter_ndjson(headers, rows, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    buffer = []
+    for row in rows:
+        buffer.append(encoder.encode(dict(zip(headers, row))) + '\n')
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer = []
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+async def aiter_sync(iterator):
+    """Itérateur asynchrone sur un itérateur synchrone, un élément à la fois."""
+    next_part = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    try:
+        while (part := await next_part(iterator, done)) is not done:
+            yield part
+    finally:
+        await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+def export_response(resource, export_format, asynchronous=False):
+    """
+    StreamingHttpResponse de l'export (ressource et format supposés valides).
+
+    `asynchronous` : requête servie par ASGI (contenu en itérateur asynchrone).
+    """
+    headers, rows = iter_rows(resource)
+    content = iter_csv(headers, rows) if export_format == 'csv' else iter_ndjson(headers, rows)
+    if asynchronous:
+        content = aiter_sync(content)
+    response = StreamingHttpResponse(content, content_type=FORMATS[export_format])
+    filename = f"{resource}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Pas de mise en tampon par un proxy (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
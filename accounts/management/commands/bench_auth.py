@@ -0,0 +1,59 @@
+"""
+Microbenchmark du coût d'authentification JWT par requête.
+
+Compare la validation d'un access token avec et sans le cache des tokens
+vérifiés (accounts.token_cache). N'accède pas à la base de données.
+
+Usage:
+    python manage.py bench_auth --iterations 20000
+"""
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.authentication import SingleSessionJWTAuthentication
+from accounts.token_cache import VerifiedTokenCache
+from accounts import authentication
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût de validation d'un access token avec et sans cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Utilisateur non sauvegardé : AccessToken.for_user n'écrit rien en base
+        user = User(id=1, username='bench')
+        raw_token = str(AccessToken.for_user(user)).encode()
+        auth = SingleSessionJWTAuthentication()
+
+        original_cache = authentication.verified_token_cache
+        try:
+            results = {}
+            for label, maxsize in (('sans cache', 0), ('avec cache', 1024)):
+                cache = VerifiedTokenCache(maxsize=maxsize)
+                authentication.verified_token_cache = cache
+
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    auth.get_validated_token(raw_token)
+                elapsed = time.perf_counter() - start
+
+                results[label] = elapsed / iterations * 1e6
+                stats = cache.stats()
+                self.stdout.write(
+                    f"{label:>10}: {results[label]:8.2f} µs/requête "
+                    f"(hits={stats['hits']}, misses={stats['misses']}, "
+                    f"taux={stats['hit_rate']:.1%})"
+                )
+        finally:
+            authentication.verified_token_cache = original_cache
+
+        speedup = results['sans cache'] / results['avec cache']
+        self.stdout.write(self.style.SUCCESS(f"Accélération : x{speedup:.1f}"))
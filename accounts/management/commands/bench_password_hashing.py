@@ -0,0 +1,54 @@
+"""
+Benchmark du hachage parallèle des mots de passe (création de comptes en masse).
+
+Mesure le débit de `hash_passwords` pour 1, 2, 4, ... processus jusqu'au
+nombre de CPU. N'accède pas à la base de données.
+
+Usage:
+    python manage.py bench_password_hashing --count 64
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.provisioning import create_hashing_pool, hash_passwords, generate_password
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit du hachage des mots de passe selon le nombre de processus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=64, help='Mots de passe à hacher')
+        parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        passwords = [generate_password() for _ in range(options['count'])]
+
+        workers_list = [1]
+        while workers_list[-1] * 2 <= options['max_workers']:
+            workers_list.append(workers_list[-1] * 2)
+        if workers_list[-1] != options['max_workers']:
+            workers_list.append(options['max_workers'])
+
+        baseline = None
+        for workers in workers_list:
+            pool = create_hashing_pool(workers) if workers > 1 else None
+            try:
+                if pool is not None:
+                    # Démarrage des processus hors mesure
+                    hash_passwords(passwords[:workers * 2], pool, workers)
+                start = time.perf_counter()
+                hash_passwords(passwords, pool, workers)
+                elapsed = time.perf_counter() - start
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+
+            rate = len(passwords) / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f"{workers:>3} processus : {rate:8.1f} mots de passe/s "
+                f"(x{rate / baseline:.2f}, efficacité {rate / baseline / workers:.0%})"
+            )
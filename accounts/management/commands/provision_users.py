@@ -0,0 +1,55 @@
+"""
+Création en masse de comptes utilisateurs depuis un fichier CSV.
+
+Colonnes : username, password, email, first_name, last_name, is_staff.
+
+Usage:
+    python manage.py provision_users etudiants.csv --generate-passwords --output rapport.json
+"""
+
+import csv
+import json
+
+from django.core.management.base import BaseCommand
+
+from accounts.provisioning import UserProvisioner, default_workers
+from accounts import stats
+
+
+class Command(BaseCommand):
+    help = "Crée des comptes utilisateurs depuis un CSV (hachage parallèle des mots de passe)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Chemin du fichier CSV')
+        parser.add_argument(
+            '--generate-passwords', action='store_true',
+            help='Génère un mot de passe temporaire pour les lignes sans mot de passe'
+        )
+        parser.add_argument('--workers', type=int, default=None, help='Processus de hachage')
+        parser.add_argument('--output', help='Fichier JSON où écrire le rapport par ligne')
+
+    def handle(self, *args, **options):
+        provisioner = UserProvisioner(
+            generate_passwords=options['generate_passwords'],
+            workers=options['workers'] or default_workers(),
+        )
+
+        with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+            report = provisioner.run(csv.DictReader(f))
+        stats.invalidate()
+
+        for result in report['results']:
+            if result['status'] != 'created':
+                self.stderr.write(
+                    f"Ligne {result['row']} ({result['username'] or '-'}) : "
+                    f"{result['status']} - {'; '.join(result['errors'])}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} compte(s) créé(s), {report['failed']} erreur(s)"
+        ))
@@ -8,6 +8,7 @@ est toujours valide (n'a pas été invalidée par une connexion ailleurs).
 from django.contrib.auth import logout
 from django.contrib import messages
 from django.shortcuts import redirect
+from monitoring import metrics
 from .models import UserSession
 import logging
 
@@ -42,10 +43,13 @@ class SingleSessionMiddleware:
                     if not session_exists:
                         # La session a été invalidée (connexion depuis un autre appareil)
                         logger.info(
-                            f"Session invalidée détectée pour {request.user.username}. "
-                            "Connexion depuis un autre appareil."
+                            "Session invalidée détectée pour %s. "
+                            "Connexion depuis un autre appareil.",
+                            request.user.username,
                         )
                         
+                        metrics.record_session_eviction('session')
+                        
                         # Déconnecter l'utilisateur
                         logout(request)
                         
@@ -63,7 +67,7 @@ class SingleSessionMiddleware:
                         return redirect('accounts:login')
                 except Exception as e:
                     # En cas d'erreur de base de données, continuer normalement
-                    logger.warning(f"Erreur dans SingleSessionMiddleware: {e}")
+                    logger.warning("Erreur dans SingleSessionMiddleware: %s", e)
 
         response = self.get_response(request)
         return response
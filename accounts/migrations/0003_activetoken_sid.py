@@ -0,0 +1,23 @@
+# Generated by Django 4.2.27 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_activetoken'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='activetoken',
+            old_name='jti',
+            new_name='sid',
+        ),
+        migrations.AlterField(
+            model_name='activetoken',
+            name='sid',
+            field=models.CharField(max_length=255, verbose_name='Identifiant de session actif'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_activetoken_sid'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['created_at', 'id'], name='accounts_session_created_idx'),
+        ),
+    ]
@@ -14,11 +14,21 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Version (monitoring.invalidation) des comptes utilisateurs
+USERS_STAMP = 'users'
+
+# Version (monitoring.invalidation) incrémentée à chaque révocation de session
+# (flux SSE, voir accounts.events)
+SESSIONS_STAMP = 'sessions'
+
 
 class ActiveToken(models.Model):
     """
-    Stocke le JTI (JWT ID) du token actif pour chaque utilisateur.
-    Permet d'implémenter la session unique : un seul token valide à la fois.
+    Stocke l'identifiant de la session JWT active (claim `sid`) de chaque utilisateur.
+    Permet d'implémenter la session unique : une seule famille de tokens valide à la fois.
+
+    Le `sid` est créé à la connexion et partagé par le refresh token et tous
+    les access tokens qui en dérivent : ce modèle n'est écrit qu'au login/logout.
     """
     user = models.OneToOneField(
         User,
@@ -26,9 +36,9 @@ class ActiveToken(models.Model):
         related_name='active_token',
         verbose_name='Utilisateur'
     )
-    jti = models.CharField(
+    sid = models.CharField(
         max_length=255,
-        verbose_name='JWT ID actif'
+        verbose_name='Identifiant de session actif'
     )
     created_at = models.DateTimeField(
         auto_now=True,
@@ -54,35 +64,41 @@ class ActiveToken(models.Model):
         return f"{self.user.username} - {self.created_at.strftime('%d/%m/%Y %H:%M')}"
 
     @classmethod
-    def set_active_token(cls, user, jti, ip_address=None, user_agent=''):
-        """Définit le token actif pour un utilisateur (remplace l'ancien)."""
+    def set_active_token(cls, user, sid, ip_address=None, user_agent=''):
+        """Définit la session active pour un utilisateur (remplace l'ancienne)."""
         obj, created = cls.objects.update_or_create(
             user=user,
             defaults={
-                'jti': jti,
+                'sid': sid,
                 'ip_address': ip_address,
                 'user_agent': user_agent[:500]
             }
         )
         action = "créé" if created else "mis à jour"
-        logger.info(f"Token actif {action} pour {user.username}")
+        logger.info("Token actif %s pour %s", action, user.username)
         return obj
 
     @classmethod
-    def is_token_active(cls, user, jti):
-        """Vérifie si le JTI donné est le token actif de l'utilisateur."""
-        try:
-            active = cls.objects.get(user=user)
-            return active.jti == jti
-        except cls.DoesNotExist:
+    def is_token_active(cls, user, sid):
+        """Vérifie si le `sid` donné est la session active de l'utilisateur."""
+        if not sid:
             return False
+        return cls.objects.filter(user=user, sid=sid).exists()
 
     @classmethod
-    def invalidate_token(cls, user):
-        """Invalide le token actif d'un utilisateur."""
-        deleted, _ = cls.objects.filter(user=user).delete()
+    def invalidate_token(cls, user, sid=None):
+        """
+        Invalide la session active d'un utilisateur.
+
+        Si `sid` est fourni, n'invalide que cette session (logout depuis
+        l'appareil courant) ; sinon supprime la session active quelle qu'elle soit.
+        """
+        tokens = cls.objects.filter(user=user)
+        if sid:
+            tokens = tokens.filter(sid=sid)
+        deleted, _ = tokens.delete()
         if deleted:
-            logger.info(f"Token invalidé pour {user.username}")
+            logger.info("Token invalidé pour %s", user.username)
         return deleted
 
 
@@ -124,6 +140,10 @@ class UserSession(models.Model):
         verbose_name = 'Session Utilisateur'
         verbose_name_plural = 'Sessions Utilisateurs'
         ordering = ['-created_at']
+        indexes = [
+            # Liste admin triée par date (ordre déterministe : -created_at, -id)
+            models.Index(fields=['created_at', 'id'], name='accounts_session_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.created_at.strftime('%d/%m/%Y %H:%M')}"
@@ -145,21 +165,14 @@ class UserSession(models.Model):
         if exclude_session_key:
             user_sessions = user_sessions.exclude(session__session_key=exclude_session_key)
         
-        count = 0
-        for user_session in user_sessions:
-            try:
-                # Supprimer la session Django
-                user_session.session.delete()
-                count += 1
-            except Session.DoesNotExist:
-                # La session a déjà été supprimée
-                pass
-            # Le UserSession sera supprimé en cascade
+        # Supprimer les sessions Django en une fois (UserSession supprimé en cascade)
+        _, deleted = Session.objects.filter(
+            session_key__in=user_sessions.values('session_id')
+        ).delete()
+        count = deleted.get(Session._meta.label, 0)
         
         if count > 0:
-            logger.info(
-                f"Sessions invalidées pour {user.username}: {count} session(s) supprimée(s)"
-            )
+            logger.info("Sessions invalidées pour %s: %s session(s) supprimée(s)", user.username, count)
         
         return count
 
@@ -176,7 +189,7 @@ class UserSession(models.Model):
         try:
             session = Session.objects.get(session_key=session_key)
         except Session.DoesNotExist:
-            logger.warning(f"Session {session_key} non trouvée pour {user.username}")
+            logger.warning("Session %s non trouvée pour %s", session_key, user.username)
             return None
 
         # Extraire les informations de la requête
@@ -200,9 +213,7 @@ class UserSession(models.Model):
             user_agent=user_agent
         )
         
-        logger.info(
-            f"Nouvelle session créée pour {user.username} depuis {ip_address}"
-        )
+        logger.info("Nouvelle session créée pour %s depuis %s", user.username, ip_address)
         
         return user_session
 
@@ -219,6 +230,6 @@ class UserSession(models.Model):
         expired_sessions.delete()
         
         if count > 0:
-            logger.info(f"Nettoyage: {count} session(s) expirée(s) supprimée(s)")
+            logger.info("Nettoyage: %s session(s) expirée(s) supprimée(s)", count)
         
         return count
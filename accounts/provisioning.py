@@ -0,0 +1,243 @@
+"""
+Création en masse des comptes utilisateurs.
+
+Utilisé par l'API d'administration POST /api/admin/users/bulk/ et par la
+commande `python manage.py provision_users`.
+
+Le coût d'une création de compte est dominé par le hachage du mot de passe
+(PBKDF2, environ 0,3 s). La commande hache les mots de passe d'un lot en
+parallèle dans un `ProcessPoolExecutor` ; l'API hache dans le thread de la
+requête (pas de fork dans un worker gunicorn, dont les threads d'arrière-plan
+et les connexions ne survivraient pas) et limite le nombre de lignes
+(USER_BULK_API_MAX_ROWS). Les comptes sont insérés avec `bulk_create` dans
+une transaction par lot.
+"""
+
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+
+# Nombre de comptes hachés puis insérés par lot
+BATCH_SIZE = 1000
+
+TRUE_VALUES = {'1', 'true', 'vrai', 'oui', 'yes', 'y', 'o'}
+
+
+def generate_password():
+    """Génère un mot de passe temporaire aléatoire."""
+    return secrets.token_urlsafe(12)
+
+
+def default_workers():
+    """Nombre de processus de hachage (setting USER_PROVISIONING_WORKERS ou nb de CPU)."""
+    return getattr(settings, 'USER_PROVISIONING_WORKERS', 0) or os.cpu_count() or 1
+
+
+def _init_worker():
+    """Initialise Django dans un processus de hachage (démarrage en mode spawn)."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eduplatform.settings')
+    import django
+    django.setup()
+
+
+def create_hashing_pool(workers):
+    """Crée le pool de processus utilisé pour hacher les mots de passe."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """
+    Hache une liste de mots de passe, en parallèle si un pool est fourni.
+
+    L'ordre des résultats correspond à l'ordre des mots de passe.
+    """
+    if pool is None or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+class UserProvisioner:
+    """
+    Crée des comptes à partir de lignes (dictionnaires) et produit un rapport par ligne.
+
+    Colonnes reconnues : username, password, email, first_name, last_name, is_staff.
+    Si `generate_passwords` est vrai, un mot de passe temporaire est généré pour
+    les lignes sans mot de passe ; il n'apparaît qu'une fois, dans le rapport.
+    Avec `workers` > 1 (commande uniquement), les mots de passe sont hachés
+    dans un pool de processus.
+    """
+
+    def __init__(self, generate_passwords=False, workers=1, batch_size=BATCH_SIZE):
+        self.generate_passwords = generate_passwords
+        self.workers = workers
+        self.batch_size = batch_size
+        self.results = []
+        self.created = 0
+        self.failed = 0
+        # Noms d'utilisateur déjà vus dans ce fichier (détection des doublons)
+        self._seen_usernames = set()
+        # Pool de hachage, créé au premier lot qui en vaut la peine
+        self._pool = None
+        self._username_validator = User.username_validator
+
+    def run(self, rows):
+        """Traite un itérable de lignes et retourne le rapport."""
+        rows = enumerate(rows, start=1)
+        try:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                self._process_batch(batch)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'failed': self.failed,
+            'results': sorted(self.results, key=lambda r: r['row']),
+        }
+
+    def _validate(self, data):
+        """Valide une ligne et retourne (valeurs nettoyées, erreurs)."""
+        if not isinstance(data, dict):
+            return None, ['Ligne invalide : un objet est attendu']
+
+        errors = []
+        cleaned = {
+            field: str(data.get(field) or '').strip()
+            for field in ('username', 'email', 'first_name', 'last_name')
+        }
+        cleaned['password'] = str(data.get('password') or '')
+        cleaned['is_staff'] = _parse_bool(data.get('is_staff'))
+        cleaned['generated'] = False
+
+        username = cleaned['username']
+        if not username:
+            errors.append("Nom d'utilisateur requis")
+        else:
+            try:
+                self._username_validator(username)
+            except ValidationError as e:
+                errors.extend(e.messages)
+            if len(username) > User._meta.get_field('username').max_length:
+                errors.append("Nom d'utilisateur trop long")
+
+        if not cleaned['password']:
+            if self.generate_passwords:
+                cleaned['password'] = generate_password()
+                cleaned['generated'] = True
+            else:
+                errors.append('Mot de passe requis')
+
+        if not errors:
+            if username in self._seen_usernames:
+                errors.append("Nom d'utilisateur en double dans le fichier")
+            else:
+                self._seen_usernames.add(username)
+
+        return cleaned, errors
+
+    def _hash(self, passwords):
+        """Hache les mots de passe d'un lot, en parallèle s'il y en a plusieurs."""
+        if self._pool is None and self.workers > 1 and len(passwords) > 1:
+            self._pool = create_hashing_pool(self.workers)
+        return hash_passwords(passwords, self._pool, self.workers)
+
+    def _process_batch(self, batch):
+        valid = []
+        for row_number, data in batch:
+            cleaned, errors = self._validate(data)
+            if errors:
+                username = cleaned['username'] if cleaned else None
+                self._record(row_number, 'error', username=username, errors=errors)
+            else:
+                valid.append((row_number, cleaned))
+
+        if not valid:
+            return
+
+        # Comptes déjà existants (une requête par lot)
+        existing = set(
+            User.objects.filter(
+                username__in=[c['username'] for _, c in valid]
+            ).values_list('username', flat=True)
+        )
+        pending = []
+        for row_number, cleaned in valid:
+            if cleaned['username'] in existing:
+                self._record(
+                    row_number, 'duplicate',
+                    username=cleaned['username'],
+                    errors=["Ce nom d'utilisateur existe déjà"]
+                )
+            else:
+                pending.append((row_number, cleaned))
+
+        if not pending:
+            return
+
+        hashes = self._hash([c['password'] for _, c in pending])
+        users = [
+            User(
+                username=c['username'],
+                email=c['email'],
+                first_name=c['first_name'],
+                last_name=c['last_name'],
+                is_staff=c['is_staff'],
+                password=password_hash,
+            )
+            for (_, c), password_hash in zip(pending, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+        except IntegrityError as e:
+            # Conflit concurrent : aucun compte du lot n'a été créé
+            for row_number, cleaned in pending:
+                self._record(
+                    row_number, 'error',
+                    username=cleaned['username'],
+                    errors=[f"Erreur d'insertion : {e}"]
+                )
+            return
+
+        for (row_number, cleaned), user in zip(pending, users):
+            password = cleaned['password'] if cleaned['generated'] else None
+            self._record(row_number, 'created', user=user, username=cleaned['username'], password=password)
+
+    def _record(self, row_number, status, user=None, username=None, password=None, errors=None):
+        if status == 'created':
+            self.created += 1
+        else:
+            self.failed += 1
+        result = {
+            'row': row_number,
+            'status': status,
+            'id': user.id if user is not None else None,
+            'username': username,
+            'errors': errors or [],
+        }
+        if password is not None:
+            result['password'] = password
+        self.results.append(result)
@@ -5,10 +5,11 @@ Serializers pour l'API d'authentification.
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from monitoring.instrumentation import TimedSerializerMixin
 from .models import UserSession
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les informations utilisateur."""
     
     class Meta:
@@ -17,7 +18,7 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'username', 'is_active', 'is_staff', 'date_joined']
 
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer pour la connexion."""
     
     username = serializers.CharField(max_length=150, required=True)
@@ -43,7 +44,7 @@ class LoginSerializer(serializers.Serializer):
         return data
 
 
-class UserSessionSerializer(serializers.ModelSerializer):
+class UserSessionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les sessions utilisateur."""
     
     class Meta:
@@ -52,7 +53,7 @@ class UserSessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'ip_address', 'user_agent']
 
 
-class TokenResponseSerializer(serializers.Serializer):
+class TokenResponseSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer pour la réponse de connexion avec tokens."""
     
     access = serializers.CharField()
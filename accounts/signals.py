@@ -0,0 +1,89 @@
+"""
+Signaux maintenant l'instantané des statistiques admin (accounts.stats).
+
+Les créations et suppressions ajustent les compteurs en cache une fois la
+transaction validée ; les modifications qui changent un compteur sans
+création ni suppression (publication d'une vidéo) l'invalident.
+
+Les modifications et suppressions de comptes (hors last_login) périment
+aussi le compte en cache dans tous les workers (accounts.caching).
+"""
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from videos.models import Video, Category
+from .caching import invalidate_user
+from .models import ActiveToken
+from . import stats
+
+
+def _adjust_on_commit(counter, delta):
+    transaction.on_commit(lambda: stats.adjust(counter, delta))
+
+
+def _invalidate_on_commit(*names):
+    transaction.on_commit(lambda: stats.invalidate(*names))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        _adjust_on_commit('total_users', 1)
+        _invalidate_on_commit('recent_users')
+    elif not update_fields or set(update_fields) - {'last_login'}:
+        # La mise à jour de last_login à chaque connexion ne change ni le
+        # dashboard ni le compte mis en cache
+        _invalidate_on_commit('recent_users')
+        invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _adjust_on_commit('total_users', -1)
+    _invalidate_on_commit('recent_users')
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Video)
+def video_saved(sender, instance, created, **kwargs):
+    if created:
+        _adjust_on_commit('total_videos', 1)
+        if instance.is_published:
+            _adjust_on_commit('published_videos', 1)
+    else:
+        # L'ancien état de publication n'est pas connu : recalcul à la lecture
+        _invalidate_on_commit('published_videos')
+    _invalidate_on_commit('recent_videos')
+
+
+@receiver(post_delete, sender=Video)
+def video_deleted(sender, instance, **kwargs):
+    _adjust_on_commit('total_videos', -1)
+    if instance.is_published:
+        _adjust_on_commit('published_videos', -1)
+    _invalidate_on_commit('recent_videos')
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if created:
+        _adjust_on_commit('total_categories', 1)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    _adjust_on_commit('total_categories', -1)
+
+
+@receiver(post_save, sender=ActiveToken)
+def active_token_saved(sender, instance, created, **kwargs):
+    if created:
+        _adjust_on_commit('active_sessions', 1)
+
+
+@receiver(post_delete, sender=ActiveToken)
+def active_token_deleted(sender, instance, **kwargs):
+    _adjust_on_commit('active_sessions', -1)
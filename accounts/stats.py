@@ -0,0 +1,127 @@
+"""
+Instantané des statistiques du dashboard admin.
+
+Les compteurs (utilisateurs, vidéos, vidéos publiées, catégories, sessions
+JWT actives) sont calculés en UNE requête SQL (sous-requêtes COUNT), puis
+gardés dans le cache Django. Les signaux de création/suppression
+(voir accounts.signals) les ajustent ensuite par `cache.incr`/`cache.decr` :
+le dashboard ne recompte pas les tables à chaque affichage.
+
+Les opérations qui contournent les signaux (`QuerySet.update`, `bulk_create`,
+`bulk_update`) doivent appeler `invalidate()` ; l'instantané est alors
+recalculé à la lecture suivante. Une durée de vie (ADMIN_STATS_CACHE_TIMEOUT)
+borne de toute façon l'écart entre workers si le cache n'est pas partagé.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+
+from monitoring import metrics
+from videos.models import Video, Category
+from .models import ActiveToken
+
+CACHE_PREFIX = 'admin_stats'
+
+COUNTERS = (
+    'total_users',
+    'total_videos',
+    'published_videos',
+    'total_categories',
+    'active_sessions',
+)
+
+RECENT = ('recent_users', 'recent_videos')
+
+# Nombre d'éléments des listes « récents »
+RECENT_LIMIT = 5
+
+
+def _key(name):
+    return f'{CACHE_PREFIX}:{name}'
+
+
+def _timeout():
+    return getattr(settings, 'ADMIN_STATS_CACHE_TIMEOUT', 300)
+
+
+def compute_counters():
+    """Calcule tous les compteurs en une seule requête SQL."""
+    qn = connection.ops.quote_name
+    video_table = qn(Video._meta.db_table)
+    sql = (
+        f"SELECT "
+        f"(SELECT COUNT(*) FROM {qn(User._meta.db_table)}), "
+        f"(SELECT COUNT(*) FROM {video_table}), "
+        f"(SELECT COUNT(*) FROM {video_table} WHERE {qn('is_published')} = %s), "
+        f"(SELECT COUNT(*) FROM {qn(Category._meta.db_table)}), "
+        f"(SELECT COUNT(*) FROM {qn(ActiveToken._meta.db_table)})"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [True])
+        row = cursor.fetchone()
+    return dict(zip(COUNTERS, row))
+
+
+def compute_recent():
+    """Derniers utilisateurs et dernières vidéos."""
+    return {
+        'recent_users': [
+            {
+                'id': u.id,
+                'username': u.username,
+                'email': u.email,
+                'date_joined': u.date_joined
+            } for u in User.objects.order_by('-date_joined')[:RECENT_LIMIT]
+        ],
+        'recent_videos': [
+            {
+                'id': v.id,
+                'title': v.title,
+                'is_published': v.is_published,
+                'created_at': v.created_at
+            } for v in Video.objects.order_by('-created_at')[:RECENT_LIMIT]
+        ],
+    }
+
+
+def get_snapshot():
+    """
+    Retourne {'stats': {...}, 'recent_users': [...], 'recent_videos': [...]}.
+
+    Un seul accès au cache lorsque l'instantané est complet.
+    """
+    names = COUNTERS + RECENT
+    cached = cache.get_many([_key(name) for name in names])
+    values = {name: cached.get(_key(name)) for name in names}
+
+    missing = {}
+    metrics.record_cache('admin_stats', all(value is not None for value in values.values()))
+    if any(values[name] is None for name in COUNTERS):
+        missing.update(compute_counters())
+    if any(values[name] is None for name in RECENT):
+        missing.update(compute_recent())
+    if missing:
+        cache.set_many({_key(name): value for name, value in missing.items()}, _timeout())
+        values.update(missing)
+
+    return {
+        'stats': {name: values[name] for name in COUNTERS},
+        'recent_users': values['recent_users'],
+        'recent_videos': values['recent_videos'],
+    }
+
+
+def adjust(counter, delta):
+    """Ajuste un compteur en cache (sans effet s'il n'est pas en cache)."""
+    try:
+        cache.incr(_key(counter), delta)
+    except ValueError:
+        # Absent du cache : il sera recalculé à la prochaine lecture
+        pass
+
+
+def invalidate(*names):
+    """Supprime des valeurs de l'instantané (toutes si aucun nom n'est donné)."""
+    cache.delete_many([_key(name) for name in (names or COUNTERS + RECENT)])
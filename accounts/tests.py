@@ -0,0 +1,732 @@
+"""
+Tests de l'application accounts.
+
+    python manage.py test accounts
+"""
+
+from django.contrib.auth.models import User
+import asyncio
+import json
+import pickle
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.models import Session
+from django.core import signing
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from eduplatform.caching import local_cache
+from eduplatform.db.pagination import EstimatedCountPaginator
+from eduplatform.testing import PASSWORD, CacheIsolationMixin, auth_headers, youtube_url
+from videos.models import Category, Video
+from videos.ordering import ORDER_GAP
+from . import caching, events, throttling
+from .exports import export_response
+from .models import ActiveToken, UserSession
+from .token_cache import VerifiedTokenCache, verified_token_cache
+from .tokens import SESSION_ID_CLAIM
+
+
+@override_settings(THROTTLE_ENABLED=True)
+class ThrottlingTests(CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.request = RequestFactory().post('/api/auth/login/', REMOTE_ADDR='10.0.0.1')
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate('5/5min'), (5, 300))
+        self.assertEqual(throttling.parse_rate('20 / h'), (20, 3600))
+        with self.assertRaises(ValueError):
+            throttling.parse_rate('20 par minute')
+
+    def test_token_bucket_allows_a_burst_then_waits(self):
+        bucket = throttling.TokenBucket(3, 60)
+        now = 1_000_000_000
+
+        self.assertEqual([bucket.hit('bucket', now) for _ in range(3)], [0, 0, 0])
+        wait = bucket.hit('bucket', now)
+        # Un jeton toutes les 20 s
+        self.assertAlmostEqual(wait, 20, places=3)
+        self.assertEqual(bucket.hit('bucket', now + 20_000_000), 0)
+
+    def test_sliding_window_limits_each_window(self):
+        window = throttling.SlidingWindow(2, 60)
+        now = 60_000_000 * 1000
+
+        self.assertEqual([window.hit('window', now) for _ in range(2)], [0, 0])
+        self.assertGreater(window.hit('window', now), 0)
+        # Fenêtre suivante : la précédente compte encore au prorata
+        self.assertGreater(window.hit('window', now + 60_000_000), 0)
+        self.assertEqual(window.hit('window', now + 120_000_000), 0)
+
+    @override_settings(THROTTLE_RATES={'login.ip': '3/min', 'login.username': '1/min'})
+    def test_refused_request_is_refunded_to_other_rules(self):
+        self.assertEqual(throttling.check('login', self.request, username='alice'), 0)
+        # Refusée par la règle `username` : le jeton `ip` est rendu
+        self.assertGreater(throttling.check('login', self.request, username='Alice '), 0)
+
+        self.assertEqual(throttling.check('login', self.request, username='bob'), 0)
+        self.assertEqual(throttling.check('login', self.request, username='carol'), 0)
+        self.assertGreater(throttling.check('login', self.request, username='dave'), 0)
+
+    @override_settings(THROTTLE_ENABLED=False, THROTTLE_RATES={'login.ip': '1/min'})
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(throttling.check('login', self.request), 0)
+
+    @override_settings(THROTTLE_RATES={'login.ip': '2/min', 'login.username': '10/min'})
+    def test_login_returns_429_with_retry_after(self):
+        User.objects.create_user('alice', password=PASSWORD)
+        data = {'username': 'alice', 'password': 'mauvais-mot-de-passe'}
+
+        for _ in range(2):
+            response = self.client.post('/api/auth/login/', data, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/auth/login/', data, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+
+class AccountCacheTests(CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password=PASSWORD, email='alice@example.com')
+        self.other = User.objects.create_user('bob', password=PASSWORD)
+
+    def cached_entries(self, user_id):
+        key = caching.accounts_cache.make_key('user', user_id, caching.get_generation(user_id))
+        return [caching.accounts_cache.l2.get(key), local_cache.get(key)]
+
+    def test_second_read_is_served_from_the_cache(self):
+        self.assertEqual(caching.get_user(self.user.pk).email, 'alice@example.com')
+
+        with self.assertNumQueries(0):
+            user = caching.get_user(self.user.pk)
+
+        self.assertEqual((user.pk, user.username, user.email), (self.user.pk, 'alice', 'alice@example.com'))
+        self.assertIsNone(caching.get_user(10_000))
+
+    def test_password_is_never_cached(self):
+        caching.get_user(self.user.pk)
+
+        entries = self.cached_entries(self.user.pk)
+        self.assertTrue(all(entries))
+        for entry in entries:
+            self.assertNotIn(self.user.password.encode(), pickle.dumps(entry))
+
+        # Champ différé : chargé à la demande
+        user = caching.get_user(self.user.pk)
+        self.assertIn('password', user.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password(PASSWORD))
+
+    def test_saving_an_account_changes_its_generation_only(self):
+        caching.get_user(self.user.pk)
+        caching.get_user(self.other.pk)
+        generation = caching.get_generation(self.user.pk)
+        other_generation = caching.get_generation(self.other.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.email = 'alice@example.org'
+            self.user.save(update_fields=['email'])
+
+        self.assertNotEqual(caching.get_generation(self.user.pk), generation)
+        self.assertEqual(caching.get_generation(self.other.pk), other_generation)
+        self.assertEqual(caching.get_user(self.user.pk).email, 'alice@example.org')
+        with self.assertNumQueries(0):
+            caching.get_user(self.other.pk)
+
+    def test_last_login_update_keeps_the_cache(self):
+        caching.get_user(self.user.pk)
+        generation = caching.get_generation(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=['last_login'])
+
+        self.assertEqual(caching.get_generation(self.user.pk), generation)
+
+    def test_deleted_account_is_not_served(self):
+        user_id = self.user.pk
+        caching.get_user(user_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        self.assertIsNone(caching.get_user(user_id))
+
+
+class SessionFamilyTests(CacheIsolationMixin, TestCase):
+    """Session unique vérifiée sur le `sid` (famille de session)."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password=PASSWORD)
+
+    def login(self, device):
+        response = self.client.post('/api/auth/login/', {'username': 'alice', 'password': PASSWORD},
+                                    content_type='application/json', HTTP_USER_AGENT=device)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def me(self, access):
+        return self.client.get('/api/auth/me/', HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_login_elsewhere_rejects_the_previous_access_token(self):
+        device_a = self.login('appareil A')
+        self.assertEqual(self.me(device_a['access']).status_code, 200)
+
+        device_b = self.login('appareil B')
+
+        response = self.me(device_a['access'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_active')
+        self.assertEqual(self.me(device_b['access']).status_code, 200)
+
+    def test_refresh_keeps_the_session_id(self):
+        tokens = self.login('appareil A')
+        sid = AccessToken(tokens['access'])[SESSION_ID_CLAIM]
+
+        response = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']},
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        access = response.json()['access']
+        self.assertEqual(AccessToken(access)[SESSION_ID_CLAIM], sid)
+        self.assertEqual(self.me(access).status_code, 200)
+        # Aucune nouvelle session active : le sid de la connexion reste le seul
+        self.assertEqual(list(ActiveToken.objects.filter(user=self.user).values_list('sid', flat=True)), [sid])
+
+    def test_logout_closes_the_whole_session_family(self):
+        tokens = self.login('appareil A')
+        refreshed = self.client.post('/api/auth/refresh/', {'refresh': tokens['refresh']},
+                                     content_type='application/json').json()['access']
+
+        response = self.client.post('/api/auth/logout/', {}, content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ActiveToken.objects.filter(user=self.user).exists())
+        for access in (tokens['access'], refreshed):
+            response = self.me(access)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response.json()['code'], 'token_not_active')
+
+
+class VerifiedTokenCacheTests(CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        verified_token_cache.clear()
+        self.addCleanup(verified_token_cache.clear)
+        self.user = User.objects.create_user('alice', password=PASSWORD)
+
+    def me(self, headers):
+        return self.client.get('/api/auth/me/', **headers)
+
+    def test_entries_expire_with_the_token(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        now = time.time()
+        cache.set('jeton', {'exp': now + 60})
+
+        self.assertEqual(cache.get('jeton'), {'exp': now + 60})
+        with mock.patch('accounts.token_cache.time.time', return_value=now + 61):
+            self.assertIsNone(cache.get('jeton'))
+        # Entrée expirée retirée : plus servie, même à l'heure d'origine
+        self.assertIsNone(cache.get('jeton'))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_size_is_bounded(self):
+        cache = VerifiedTokenCache(maxsize=2)
+        exp = time.time() + 60
+        for raw in ('a', 'b', 'c'):
+            cache.set(raw, {'exp': exp})
+
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_expired_token_is_not_served_from_the_cache(self):
+        headers = auth_headers(self.user)
+        self.assertEqual(self.me(headers).status_code, 200)
+
+        # Le cache suit le claim `exp` : au-delà, la vérification simplejwt reprend la main
+        with mock.patch('accounts.token_cache.time.time', return_value=time.time() + 3601):
+            self.assertIsNone(verified_token_cache.get(headers['HTTP_AUTHORIZATION'].split()[1]))
+        self.assertEqual(verified_token_cache.stats()['size'], 0)
+
+    def test_session_is_checked_on_a_cache_hit(self):
+        headers = auth_headers(self.user)
+        self.assertEqual(self.me(headers).status_code, 200)
+        self.assertEqual(self.me(headers).status_code, 200)
+        self.assertEqual(verified_token_cache.hits, 1)
+
+        # Connexion depuis un autre appareil : le token en cache n'est plus accepté
+        auth_headers(self.user)
+
+        response = self.me(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_active')
+        self.assertEqual(verified_token_cache.hits, 2)
+
+    def test_account_is_checked_on_a_cache_hit(self):
+        headers = auth_headers(self.user)
+        self.assertEqual(self.me(headers).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        response = self.me(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'user_inactive')
+        self.assertEqual(verified_token_cache.hits, 1)
+
+
+@override_settings(SSE_HEARTBEAT_SECONDS=1, SSE_MAX_SECONDS=5)
+class SessionEventsTests(CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('alice', password=PASSWORD)
+        # Diffusion dans ce processus seulement : pas de thread de suivi du bus
+        patcher = mock.patch.object(events.broker, '_ensure_watcher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ticket_round_trip(self):
+        ticket = events.issue_ticket(self.user.pk, 'sid-a')
+        self.assertEqual(events.read_ticket(ticket), (str(self.user.pk), 'sid-a'))
+
+    def test_invalid_tickets_are_rejected(self):
+        ticket = events.issue_ticket(self.user.pk, 'sid-a')
+        # Même contenu signé pour un autre usage
+        other_salt = signing.dumps({'u': str(self.user.pk), 's': 'sid-a'}, salt='autre.usage')
+
+        for invalid in (ticket + 'x', 'pas-un-ticket', other_salt):
+            with self.subTest(ticket=invalid):
+                self.assertIsNone(events.read_ticket(invalid))
+        with override_settings(SSE_TICKET_SECONDS=-1):
+            self.assertIsNone(events.read_ticket(ticket))
+
+    def test_revocation_is_published_after_commit(self):
+        subscription = events.ThreadSubscription('sid-a')
+        events.broker.subscribe(self.user.pk, subscription)
+        self.addCleanup(events.broker.unsubscribe, self.user.pk, subscription)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            events.publish_session_revoked(self.user.pk, 'sid-b', 'login_elsewhere')
+            self.assertIsNone(subscription.get(0))
+
+        self.assertEqual(subscription.get(0), {
+            'type': events.SESSION_REVOKED, 'active_sid': 'sid-b', 'reason': 'login_elsewhere',
+        })
+
+    def test_rolled_back_revocation_is_not_published(self):
+        subscription = events.ThreadSubscription('sid-a')
+        events.broker.subscribe(self.user.pk, subscription)
+        self.addCleanup(events.broker.unsubscribe, self.user.pk, subscription)
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            events.publish_session_revoked(self.user.pk, 'sid-b', 'login_elsewhere')
+
+        self.assertTrue(callbacks)
+        self.assertIsNone(subscription.get(0))
+
+    def test_revoke_inactive_notifies_stale_sessions(self):
+        ActiveToken.set_active_token(self.user, 'sid-b', '127.0.0.1', 'tests')
+        stale, active = events.ThreadSubscription('sid-a'), events.ThreadSubscription('sid-b')
+        for subscription in (stale, active):
+            events.broker.subscribe(self.user.pk, subscription)
+            self.addCleanup(events.broker.unsubscribe, self.user.pk, subscription)
+
+        self.assertEqual(events.broker.revoke_inactive(), 1)
+
+        self.assertEqual(stale.get(0)['reason'], 'login_elsewhere')
+        self.assertIsNone(active.get(0))
+
+    def test_thread_stream_unsubscribes_when_revoked(self):
+        stream = events.iter_session_events(self.user.pk, 'sid-a', lambda: True)
+
+        self.assertTrue(next(stream).startswith('retry:'))
+        self.assertEqual(events.broker.subscriber_count(), 1)
+        events.broker.publish(self.user.pk, {
+            'type': events.SESSION_REVOKED, 'active_sid': 'sid-b', 'reason': 'login_elsewhere',
+        })
+
+        self.assertEqual(list(stream), [events.format_event(events.SESSION_REVOKED, {'reason': 'login_elsewhere'})])
+        self.assertEqual(events.broker.subscriber_count(), 0)
+
+    def test_async_streams_unsubscribe_when_revoked(self):
+        """Équivalent réduit de `manage.py bench_sse_subscribers`."""
+        users = range(20)
+
+        async def is_active():
+            return True
+
+        async def consume(user_id, ready):
+            messages = []
+            async for message in events.aiter_session_events(user_id, 'sid-a', is_active):
+                if message.startswith('retry:'):
+                    ready.release()
+                messages.append(message)
+            return messages
+
+        async def run():
+            ready = asyncio.Semaphore(0)
+            tasks = [asyncio.create_task(consume(user_id, ready)) for user_id in users]
+            for _ in users:
+                await ready.acquire()
+            self.assertEqual(events.broker.subscriber_count(), len(users))
+            for user_id in users:
+                events.broker.publish(user_id, {
+                    'type': events.SESSION_REVOKED, 'active_sid': None, 'reason': 'admin_invalidated',
+                })
+            return await asyncio.wait_for(asyncio.gather(*tasks), 5)
+
+        results = async_to_sync(run)()
+
+        self.assertTrue(all(messages[-1].startswith('event: session_revoked') for messages in results))
+        self.assertEqual(events.broker.subscriber_count(), 0)
+
+    def test_stream_requires_a_valid_ticket(self):
+        headers = {'wsgi.multithread': True}
+        self.assertEqual(self.client.get('/api/auth/events/', **headers).status_code, 401)
+        self.assertEqual(self.client.get('/api/auth/events/?ticket=abc', **headers).status_code, 401)
+        # Worker mono-thread : pas de flux
+        self.assertEqual(self.client.get('/api/auth/events/').status_code, 503)
+
+    def test_stream_of_a_replaced_session(self):
+        response = self.client.post('/api/auth/events/ticket/', **auth_headers(self.user))
+        self.assertEqual(response.status_code, 200)
+        ticket = response.json()['ticket']
+        # Connexion depuis un autre appareil avant l'ouverture du flux
+        auth_headers(self.user)
+
+        response = self.client.get(f'/api/auth/events/?ticket={ticket}', **{'wsgi.multithread': True})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(b''.join(response.streaming_content).decode(),
+                         events.format_event(events.SESSION_REVOKED, {'reason': 'inactive'}))
+        self.assertEqual(events.broker.subscriber_count(), 0)
+
+
+class AdminAPITestCase(CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password=PASSWORD, is_staff=True)
+        self.headers = auth_headers(self.admin)
+
+    def post(self, url, data, **extra):
+        extra.setdefault('content_type', 'application/json')
+        return self.client.post(url, data, **self.headers, **extra)
+
+
+class AdminUserBulkAPITests(AdminAPITestCase):
+    url = '/api/admin/users/bulk/'
+
+    def test_creates_accounts_from_json(self):
+        response = self.post(self.url, [
+            {'username': 'alice', 'password': PASSWORD, 'email': 'alice@example.com'},
+            {'username': 'bob', 'password': PASSWORD, 'is_staff': 'oui'},
+            {'username': 'admin', 'password': PASSWORD},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['created'], report['failed']), (2, 1))
+        self.assertEqual([r['status'] for r in report['results']], ['created', 'created', 'duplicate'])
+        self.assertTrue(User.objects.get(username='bob').is_staff)
+        self.assertTrue(User.objects.get(username='alice').check_password(PASSWORD))
+
+    def test_creates_accounts_from_csv(self):
+        content = f'username,password,email\ncarol,{PASSWORD},carol@example.com\n'
+
+        response = self.post(self.url, content, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(User.objects.get(username='carol').email, 'carol@example.com')
+
+    def test_generated_passwords_are_returned_once(self):
+        response = self.post(f'{self.url}?generate_passwords=1', [{'username': 'dave'}])
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()['results'][0]
+        self.assertTrue(User.objects.get(username='dave').check_password(result['password']))
+
+    @override_settings(USER_BULK_API_MAX_ROWS=2)
+    def test_too_many_rows_creates_nothing(self):
+        rows = [{'username': f'user{i}', 'password': PASSWORD} for i in range(3)]
+
+        response = self.post(self.url, rows)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('provision_users', response.json()['error'])
+        self.assertFalse(User.objects.filter(username__startswith='user').exists())
+
+    def test_requires_a_list(self):
+        response = self.post(self.url, {'username': 'erin'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_staff(self):
+        user = User.objects.create_user('frank', password=PASSWORD)
+        response = self.client.post(self.url, [], content_type='application/json', **auth_headers(user))
+        self.assertEqual(response.status_code, 403)
+
+
+class AdminReorderAPITests(AdminAPITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.categories = [
+            Category.objects.create(name=f'Catégorie {i}', order=(i + 1) * ORDER_GAP)
+            for i in range(3)
+        ]
+        self.videos = [
+            Video.objects.create(title=f'Vidéo {i}', youtube_url=youtube_url(i),
+                                 category=self.categories[0], order=(i + 1) * ORDER_GAP)
+            for i in range(3)
+        ]
+
+    def category_ids(self):
+        return list(Category.objects.order_by('order', 'name').values_list('id', flat=True))
+
+    def video_ids(self):
+        return list(self.categories[0].videos.order_by('order', '-created_at').values_list('id', flat=True))
+
+    def test_category_sequence(self):
+        first, second, third = (c.id for c in self.categories)
+
+        response = self.post('/api/admin/categories/reorder/', {'ids': [third, first, second]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.category_ids(), [third, first, second])
+
+    def test_category_sequence_must_be_complete(self):
+        first, second, _ = (c.id for c in self.categories)
+
+        response = self.post('/api/admin/categories/reorder/', {'ids': [second, first]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.category_ids(), [c.id for c in self.categories])
+
+    def test_move_category_to_head(self):
+        first, second, third = (c.id for c in self.categories)
+
+        response = self.post('/api/admin/categories/reorder/', {'id': third, 'after': None})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(self.category_ids(), [third, first, second])
+
+    def test_move_video_after_another(self):
+        first, second, third = (v.id for v in self.videos)
+
+        response = self.post('/api/admin/videos/reorder/', {'id': first, 'after': third})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.video_ids(), [second, third, first])
+
+    def test_video_sequence(self):
+        first, second, third = (v.id for v in self.videos)
+
+        response = self.post('/api/admin/videos/reorder/',
+                             {'category': self.categories[0].id, 'ids': [second, third, first]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.video_ids(), [second, third, first])
+
+    def test_invalid_bodies(self):
+        video_id = self.videos[0].id
+        category_id = self.categories[0].id
+        for url, data in (
+            ('/api/admin/categories/reorder/', [1, 2, 3]),
+            ('/api/admin/videos/reorder/', [video_id]),
+            ('/api/admin/videos/reorder/', {'id': 'abc'}),
+            ('/api/admin/videos/reorder/', {'id': video_id, 'after': video_id}),
+            ('/api/admin/videos/reorder/', {'id': video_id, 'after': [video_id]}),
+            ('/api/admin/videos/reorder/', {'after': [video_id]}),
+            ('/api/admin/categories/reorder/', {'id': [category_id]}),
+            ('/api/admin/categories/reorder/', {'id': {'x': category_id}}),
+            ('/api/admin/categories/reorder/', {'id': category_id, 'after': [category_id]}),
+            ('/api/admin/categories/reorder/', {'id': category_id, 'after': {'x': 1}}),
+        ):
+            with self.subTest(url=url, data=data):
+                self.assertEqual(self.post(url, data).status_code, 400)
+
+
+class AdminVideoBulkAPITests(AdminAPITestCase):
+    url = '/api/admin/videos/bulk/'
+
+    def test_imports_json(self):
+        response = self.post(self.url, [
+            {'title': 'Intro', 'youtube_url': youtube_url(1), 'category': 'Bases'},
+            {'title': 'Sans URL', 'youtube_url': ''},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['created'], report['failed'], report['categories_created']), (1, 1, 1))
+        self.assertEqual(Video.objects.get().category.name, 'Bases')
+
+    def test_imports_csv(self):
+        content = (
+            'title,youtube_url,category,is_published\n'
+            f'Intro,{youtube_url(1)},Bases,oui\n'
+            f'Suite,{youtube_url(2)},Bases,non\n'
+        )
+
+        response = self.post(self.url, content, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(list(Video.objects.filter(is_published=True).values_list('title', flat=True)), ['Intro'])
+
+    def test_invalid_csv_returns_400(self):
+        response = self.post(self.url, b'title,youtube_url\n\xff\xfe,x\n', content_type='text/csv')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('CSV invalide', response.json()['error'])
+
+
+class AdminExportAPITests(AdminAPITestCase):
+    """Équivalent réduit de `manage.py check_export_memory`."""
+
+    def create_users(self, prefix, count):
+        User.objects.bulk_create([User(username=f'{prefix}{i}') for i in range(count)])
+
+    def consume(self, response):
+        with CaptureQueriesContext(connection) as queries:
+            content = b''.join(response.streaming_content)
+        return content.decode(), len(queries)
+
+    def test_response_streams_with_a_constant_number_of_queries(self):
+        self.create_users('small', 3)
+        response = export_response('users', 'csv')
+        self.assertIsInstance(response, StreamingHttpResponse)
+        small, small_queries = self.consume(response)
+
+        self.create_users('large', 20)
+        large, large_queries = self.consume(export_response('users', 'csv'))
+
+        self.assertEqual((small_queries, large_queries), (1, 1))
+        # En-têtes + administrateur + comptes créés
+        self.assertEqual((len(small.splitlines()), len(large.splitlines())), (5, 25))
+
+    def test_csv_export(self):
+        response = self.client.get('/api/admin/export/users.csv', **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="users-', response['Content-Disposition'])
+        header, row = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(header.startswith('\ufeffid,username,email'))
+        self.assertEqual(row.split(',')[:2], [str(self.admin.pk), 'admin'])
+        self.assertTrue(row.endswith(',True'))
+
+    def test_ndjson_export(self):
+        category = Category.objects.create(name='Bases')
+        Video.objects.create(title='Intro', youtube_url=youtube_url(1), category=category)
+
+        response = self.client.get('/api/admin/export/videos.ndjson', **self.headers)
+
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(row['title'], row['category']) for row in rows], [('Intro', 'Bases')])
+
+    def test_asynchronous_content(self):
+        response = export_response('users', 'ndjson', asynchronous=True)
+        self.assertTrue(response.is_async)
+
+        async def collect():
+            return [part async for part in response.streaming_content]
+
+        rows = [json.loads(line) for line in b''.join(async_to_sync(collect)()).splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['admin'])
+
+    def test_unknown_export(self):
+        for path in ('/api/admin/export/tokens.csv', '/api/admin/export/users.xml'):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path, **self.headers).status_code, 404)
+
+
+# Pas de manifeste collectstatic en test
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AdminChangelistTests(CacheIsolationMixin, TestCase):
+    """Équivalent réduit de `manage.py bench_admin_changelists`."""
+
+    max_queries = 10
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password=PASSWORD, is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+        # Session admin rattachée à l'utilisateur (sinon SingleSessionMiddleware déconnecte)
+        UserSession.objects.create(user=self.admin, session_id=self.client.session.session_key)
+
+    def create_users(self, prefix, count):
+        users = User.objects.bulk_create([User(username=f'{prefix}{i}') for i in range(count)])
+        sessions = Session.objects.bulk_create([
+            Session(session_key=f'{prefix}-session-{i}', session_data='',
+                    expire_date=timezone.now() + timedelta(days=1))
+            for i in range(count)
+        ])
+        UserSession.objects.bulk_create([
+            UserSession(user=user, session=session, ip_address='127.0.0.1', user_agent='tests')
+            for user, session in zip(users, sessions)
+        ])
+        return users
+
+    def page_queries(self, user_id):
+        counts = {}
+        for path in (
+            '/admin/auth/user/',
+            '/admin/auth/user/?o=-7',
+            '/admin/auth/user/?q=small',
+            '/admin/accounts/usersession/',
+            f'/admin/accounts/usersession/?user__id__exact={user_id}',
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            counts[path] = len(queries)
+        return counts
+
+    def test_query_count_does_not_grow_with_the_rows(self):
+        user_id = self.create_users('small', 3)[0].pk
+        small = self.page_queries(user_id)
+
+        self.create_users('large', 30)
+        large = self.page_queries(user_id)
+
+        self.assertEqual(small, large)
+        self.assertLessEqual(max(large.values()), self.max_queries, large)
+
+    def test_paginator_uses_the_planner_estimate_on_large_tables(self):
+        self.create_users('small', 3)
+        queryset = User.objects.order_by('pk')
+
+        with mock.patch('eduplatform.db.pagination.planner_row_estimate', return_value=50000):
+            paginator = EstimatedCountPaginator(queryset, 100)
+            with self.assertNumQueries(0):
+                self.assertEqual((paginator.count, paginator.num_pages), (50000, 500))
+
+        # Sous le seuil (ou hors PostgreSQL) : COUNT(*) exact
+        with mock.patch('eduplatform.db.pagination.planner_row_estimate', return_value=10):
+            self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 4)
+        self.assertEqual(EstimatedCountPaginator(queryset, 100).count, 4)
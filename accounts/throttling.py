@@ -0,0 +1,252 @@
+"""
+Limitation de débit (throttling) des endpoints sensibles.
+
+Une politique regroupe des règles, chacune appliquée à une portée :
+- `ip` : adresse du client (DRF `get_ident`, voir REST_FRAMEWORK['NUM_PROXIES']) ;
+- `username` : nom d'utilisateur soumis (avant toute authentification) ;
+- `user` : utilisateur authentifié.
+
+Les débits sont dans THROTTLE_RATES['<politique>.<portée>'] ('20/min',
+'5/5min', '100/h'...). Les compteurs sont dans le cache Django, modifiés
+uniquement par `incr`/`decr` (atomiques avec Redis ou Memcached) : le cache
+doit être partagé entre workers, sinon chaque worker applique sa propre limite.
+
+Deux algorithmes :
+- TokenBucket (GCRA) : une rafale de N requêtes puis une requête toutes les
+  `période / N` secondes. Une seule clé : l'heure théorique (µs) à laquelle le
+  seau sera plein de nouveau.
+- SlidingWindow : au plus N requêtes sur toute fenêtre glissante de la
+  période, estimées à partir des compteurs de la fenêtre fixe courante et de
+  la précédente.
+
+Une requête refusée ne consomme rien : les règles déjà débitées par
+`check()` sont remboursées si une règle suivante refuse. Les vues DRF utilisent les classes
+`*RateThrottle` (vérifiées dans `APIView.initial()`, avant le handler : le
+hachage du mot de passe n'est jamais calculé pour une requête refusée) ;
+DRF répond 429 avec l'en-tête Retry-After. Les vues Django appellent `check()`.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from monitoring import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'throttle'
+
+RATE_PATTERN = re.compile(r'^(\d+)/(\d*)(s|sec|m|min|h|hour|d|day)$')
+UNIT_SECONDS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'5/5min' -> (5, 300)."""
+    match = RATE_PATTERN.match(rate.replace(' ', ''))
+    if match is None:
+        raise ValueError(f"Débit invalide : {rate!r} (attendu : '20/min', '5/5min'...)")
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * UNIT_SECONDS[unit]
+
+
+class TokenBucket:
+    """Seau à jetons (GCRA) : `limit` requêtes en rafale, rechargé sur `period` secondes."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        # Durée (µs) de recharge d'un jeton, et avance maximale sur l'horloge
+        self.interval = period * 1_000_000 // limit
+        self.capacity = self.interval * limit
+        self.timeout = period + 1
+
+    def hit(self, key, now):
+        """Consomme un jeton à l'instant `now` (µs) ; retourne 0 ou l'attente en secondes."""
+        try:
+            tat = cache.incr(key, self.interval)
+        except ValueError:
+            # Clé absente : seau plein. `add` n'écrase pas un seau créé entre-temps
+            if cache.add(key, now + self.interval, self.timeout):
+                return 0
+            tat = cache.incr(key, self.interval)
+        if tat - self.interval < now:
+            # Seau plein (inactif depuis assez longtemps) : l'heure théorique
+            # repart de maintenant
+            cache.set(key, now + self.interval, self.timeout)
+            return 0
+
+        excess = tat - now - self.capacity
+        if excess > 0:
+            cache.decr(key, self.interval)
+        if tat - now > self.capacity // 2:
+            # `incr` ne prolonge pas l'expiration : seau très utilisé, on la repousse
+            cache.touch(key, self.timeout)
+        return excess / 1_000_000 if excess > 0 else 0
+
+    def refund(self, key, now):
+        """Rend le jeton consommé par `hit` (requête refusée par une autre règle)."""
+        try:
+            cache.decr(key, self.interval)
+        except ValueError:
+            pass
+
+
+class SlidingWindow:
+    """Au plus `limit` requêtes sur toute fenêtre glissante de `period` secondes."""
+
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.window = period * 1_000_000
+        self.timeout = 2 * period + 1
+
+    def hit(self, key, now):
+        """Compte une requête à l'instant `now` (µs) ; retourne 0 ou l'attente en secondes."""
+        index, offset = divmod(now, self.window)
+        current_key = f'{key}:{index}'
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            if not cache.add(current_key, 1, self.timeout):
+                count = cache.incr(current_key)
+            else:
+                count = 1
+        previous = cache.get(f'{key}:{index - 1}', 0)
+
+        # La fenêtre précédente compte au prorata de son recouvrement
+        remaining = 1 - offset / self.window
+        if previous * remaining + count <= self.limit:
+            return 0
+
+        cache.decr(current_key)
+        if previous and count <= self.limit:
+            # Attente jusqu'à ce que la part de la fenêtre précédente suffise
+            wait = (previous * remaining + count - self.limit) / previous * self.window
+        else:
+            wait = self.window - offset
+        return wait / 1_000_000
+
+    def refund(self, key, now):
+        """Retire la requête comptée par `hit` (refusée par une autre règle)."""
+        try:
+            cache.decr(f'{key}:{now // self.window}')
+        except ValueError:
+            pass
+
+
+# Règles de chaque politique : (portée, algorithme)
+POLICIES = {
+    'login': (('ip', TokenBucket), ('username', SlidingWindow)),
+    'refresh': (('ip', TokenBucket),),
+    'catalogue': (('user', TokenBucket),),
+}
+
+
+@lru_cache(maxsize=None)
+def _algorithm(algorithm_class, rate):
+    return algorithm_class(*parse_rate(rate))
+
+
+_ident_throttle = BaseThrottle()
+
+
+def _ident(scope, request, username):
+    if scope == 'ip':
+        return _ident_throttle.get_ident(request).replace(' ', '')
+    if scope == 'username':
+        if not username or not isinstance(username, str):
+            return None
+        # Longueur et caractères des clés de cache bornés (Memcached)
+        return hashlib.blake2b(username.strip().lower().encode(), digest_size=12).hexdigest()
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return str(user.pk)
+
+
+def check(policy, request, username=None):
+    """
+    Applique les règles de `policy` à la requête.
+
+    Retourne 0 si elle est acceptée, sinon l'attente (secondes) avant de
+    réessayer. Une requête refusée par une règle n'est décomptée d'aucune
+    autre : les règles déjà débitées sont remboursées.
+    """
+    if not getattr(settings, 'THROTTLE_ENABLED', True):
+        return 0
+    _warn_if_local_cache()
+    rates = getattr(settings, 'THROTTLE_RATES', {})
+    now = time.time_ns() // 1000
+    charged = []
+    for scope, algorithm_class in POLICIES[policy]:
+        rate = rates.get(f'{policy}.{scope}')
+        if not rate:
+            continue
+        ident = _ident(scope, request, username)
+        if ident is None:
+            continue
+        algorithm = _algorithm(algorithm_class, rate)
+        key = f'{CACHE_PREFIX}:{policy}:{scope}:{ident}'
+        wait = algorithm.hit(key, now)
+        if wait:
+            for charged_algorithm, charged_key in charged:
+                charged_algorithm.refund(charged_key, now)
+            metrics.record_throttled(policy, scope)
+            logger.debug("Requête limitée (%s.%s) : réessayer dans %.1f s", policy, scope, wait)
+            return wait
+        charged.append((algorithm, key))
+    return 0
+
+
+@lru_cache(maxsize=None)
+def _warn_if_local_cache():
+    # Une fois par processus : compteurs propres à chaque worker
+    backend = settings.CACHES['default']['BACKEND']
+    if backend.endswith('LocMemCache') and not settings.DEBUG:
+        logger.warning(
+            "Limitation de débit avec un cache local au processus (%s) : chaque "
+            "worker applique sa propre limite. Définir CACHE_BACKEND (redis, database).",
+            backend,
+        )
+
+
+def retry_after(wait):
+    """Valeur de l'en-tête Retry-After (secondes entières)."""
+    return str(max(1, math.ceil(wait)))
+
+
+class PolicyRateThrottle(BaseThrottle):
+    """Throttle DRF appliquant une politique de POLICIES."""
+    policy = None
+
+    def allow_request(self, request, view):
+        self._wait = check(self.policy, request, username=self.get_username(request))
+        return not self._wait
+
+    def get_username(self, request):
+        return None
+
+    def wait(self):
+        return self._wait
+
+
+class LoginRateThrottle(PolicyRateThrottle):
+    policy = 'login'
+
+    def get_username(self, request):
+        data = request.data
+        return data.get('username') if isinstance(data, Mapping) else None
+
+
+class RefreshRateThrottle(PolicyRateThrottle):
+    policy = 'refresh'
+
+
+class CatalogueRateThrottle(PolicyRateThrottle):
+    policy = 'catalogue'
@@ -0,0 +1,105 @@
+"""
+Cache des tokens JWT déjà vérifiés.
+
+Un access token est réutilisé pendant toute sa durée de vie (1 heure) pour
+des dizaines de requêtes. Plutôt que de revérifier la signature HMAC et de
+décoder le JSON à chaque appel, on garde le token validé en mémoire jusqu'à
+son expiration (claim `exp`).
+
+Le cache est propre à chaque worker (pas de partage entre processus) et
+borné en taille (éviction LRU). La clé est une empreinte SHA-256 du token
+brut : le token lui-même n'est jamais conservé comme clé.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class VerifiedTokenCache:
+    """
+    Cache LRU borné : empreinte du token brut -> token validé.
+
+    Les entrées expirent à la date `exp` du token. Les compteurs `hits` et
+    `misses` permettent de suivre le taux de succès.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(raw_token):
+        """Empreinte du token brut (bytes ou str)."""
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        """Retourne le token validé en cache, ou None (absent ou expiré)."""
+        if self.maxsize <= 0:
+            return None
+
+        key = self.make_key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return token
+
+    def set(self, raw_token, token):
+        """Met en cache un token validé jusqu'à son expiration."""
+        if self.maxsize <= 0:
+            return
+
+        expires_at = token.get('exp')
+        if not expires_at:
+            return
+
+        key = self.make_key(raw_token)
+        with self._lock:
+            self._entries[key] = (token, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Statistiques du cache (taille, succès, échecs, taux de succès)."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+# Instance unique par worker
+verified_token_cache = VerifiedTokenCache(
+    maxsize=getattr(settings, 'JWT_VERIFIED_TOKEN_CACHE_SIZE', 1024)
+)
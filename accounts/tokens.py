@@ -0,0 +1,66 @@
+"""
+Émission des tokens JWT liés à une famille de session.
+
+Chaque connexion crée un identifiant de session (claim `sid`) stable :
+- il est porté par le refresh token émis à la connexion ;
+- il est recopié automatiquement dans chaque access token dérivé
+  (simplejwt copie les claims du refresh token vers l'access token).
+
+La vérification de session unique se fait donc sur le `sid` et non sur le
+JTI de chaque access token : un rafraîchissement ne nécessite aucune
+écriture en base, seul le login/logout modifie `ActiveToken`.
+"""
+
+import uuid
+
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Nom du claim qui identifie la famille de session
+SESSION_ID_CLAIM = 'sid'
+
+
+def new_session_id():
+    """Génère un nouvel identifiant de famille de session."""
+    return uuid.uuid4().hex
+
+
+def issue_session_tokens(user):
+    """
+    Crée une nouvelle famille de session pour l'utilisateur.
+
+    Returns:
+        (refresh, access, sid) : le refresh token, l'access token associé
+        et l'identifiant de session à enregistrer comme session active.
+    """
+    sid = new_session_id()
+    refresh = RefreshToken.for_user(user)
+    refresh[SESSION_ID_CLAIM] = sid
+    access = refresh.access_token
+    return refresh, access, sid
+
+
+def blacklist_user_tokens(user):
+    """
+    Blackliste tous les refresh tokens émis pour l'utilisateur.
+
+    Deux requêtes quel que soit le nombre de tokens. Retourne le nombre de
+    tokens nouvellement blacklistés.
+    """
+    token_ids = list(
+        OutstandingToken.objects.filter(user=user, blacklistedtoken__isnull=True)
+        .values_list('id', flat=True)
+    )
+    if token_ids:
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+            ignore_conflicts=True
+        )
+    return len(token_ids)
+
+
+def get_session_id(token):
+    """Retourne le `sid` d'un token validé (None pour les anciens tokens)."""
+    if token is None:
+        return None
+    return token.get(SESSION_ID_CLAIM)
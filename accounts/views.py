@@ -11,7 +11,9 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_protect
+from monitoring import metrics
 from .models import UserSession
+from . import throttling
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,6 +41,17 @@ def login_view(request):
             messages.error(request, "Veuillez remplir tous les champs.")
             return render(request, 'accounts/login.html')
         
+        # Limitation de débit (IP et nom d'utilisateur) avant le hachage du mot de passe
+        wait = throttling.check('login', request, username=username)
+        if wait:
+            messages.error(
+                request,
+                f"Trop de tentatives de connexion. Réessayez dans {throttling.retry_after(wait)} secondes."
+            )
+            response = render(request, 'accounts/login.html', status=429)
+            response['Retry-After'] = throttling.retry_after(wait)
+            return response
+        
         # Authentifier l'utilisateur
         user = authenticate(request, username=username, password=password)
         
@@ -53,8 +66,8 @@ def login_view(request):
                 
                 if invalidated_count > 0:
                     logger.info(
-                        f"Connexion de {username}: {invalidated_count} ancienne(s) "
-                        "session(s) invalidée(s)"
+                        "Connexion de %s: %s ancienne(s) session(s) invalidée(s)",
+                        username, invalidated_count,
                     )
                 
                 # 2. Connecter l'utilisateur (crée une nouvelle session Django)
@@ -73,7 +86,8 @@ def login_view(request):
                 # Message de bienvenue
                 messages.success(request, f"Bienvenue, {user.first_name or user.username} !")
                 
-                logger.info(f"Connexion réussie pour {username}")
+                logger.info("Connexion réussie pour %s", username)
+                metrics.record_login(True, channel='web')
                 
                 # Rediriger vers la page demandée ou le dashboard
                 next_url = request.GET.get('next', 'videos:dashboard')
@@ -83,10 +97,12 @@ def login_view(request):
                     request, 
                     "Votre compte est désactivé. Contactez l'administrateur."
                 )
-                logger.warning(f"Tentative de connexion avec compte désactivé: {username}")
+                logger.warning("Tentative de connexion avec compte désactivé: %s", username)
+                metrics.record_login(False, channel='web')
         else:
             messages.error(request, "Identifiants incorrects.")
-            logger.warning(f"Échec de connexion pour: {username}")
+            logger.warning("Échec de connexion pour: %s", username)
+            metrics.record_login(False, channel='web')
     
     return render(request, 'accounts/login.html')
 
@@ -113,7 +129,7 @@ def logout_view(request):
         logout(request)
         
         messages.info(request, "Vous avez été déconnecté avec succès.")
-        logger.info(f"Déconnexion de {username}")
+        logger.info("Déconnexion de %s", username)
         
         return redirect('accounts:login')
     
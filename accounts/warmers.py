@@ -0,0 +1,28 @@
+"""
+Warmers de l'application accounts (voir monitoring.warmup).
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework_simplejwt.state import token_backend
+
+from .serializers import LoginSerializer, UserSerializer, UserSessionSerializer
+from . import stats
+
+
+def warm_jwt_backend():
+    """Prépare les objets de clé et d'algorithme JWT (signature + vérification)."""
+    expires_at = timezone.now() + timedelta(minutes=1)
+    token_backend.decode(token_backend.encode({'exp': int(expires_at.timestamp())}))
+
+
+def warm_serializers():
+    """Construit une fois les champs des serializers."""
+    for serializer_class in (UserSerializer, LoginSerializer, UserSessionSerializer):
+        serializer_class().fields
+
+
+def warm_admin_stats():
+    """Remplit l'instantané des statistiques admin du cache."""
+    stats.get_snapshot()
@@ -0,0 +1,30 @@
+"""
+ASGI config for eduplatform project.
+
+À utiliser pour le flux SSE /api/auth/events/ : chaque connexion ouverte est
+une coroutine et n'occupe pas de thread (voir accounts/events.py).
+
+    gunicorn eduplatform.asgi:application -k uvicorn.workers.UvicornWorker
+"""
+
+import os
+import time
+
+_boot_start = time.perf_counter()
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eduplatform.settings')
+
+application = get_asgi_application()
+
+# Pas de hook post_worker_init côté serveur ASGI : les deux phases sont
+# exécutées au chargement, dans chaque worker
+from monitoring import warmup  # noqa: E402
+
+warmup.run(warmup.PRELOAD)
+warmup.run(warmup.WORKER)
+warmup.logger.info(
+    "Application ASGI chargée en %.0f ms (pid %s)",
+    (time.perf_counter() - _boot_start) * 1000, os.getpid(),
+)
@@ -0,0 +1,454 @@
+"""
+Cache à deux niveaux : L1 en mémoire du worker, L2 partagé (cache Django).
+
+- L1 : LRU borné en nombre d'entrées et en octets (taille des valeurs
+  sérialisées), avec durée de vie courte (CACHE_L1_TIMEOUT). Aucune E/S.
+- L2 : cache Django `default` (CACHES) : fichiers ou base de données en
+  local, Redis en production. Partagé par les workers.
+
+Les clés sont déclarées par espace de noms, avec le type de chaque partie :
+
+    catalogue_cache = TwoTierCache('videos', {'dashboard': ()}, stamp=CATALOGUE_STAMP)
+    accounts_cache = TwoTierCache('accounts', {'user': (int, int)})
+
+    data = catalogue_cache.get_or_set('dashboard', compute=build_dashboard)
+    row = accounts_cache.get_or_set('user', user_id, generation, compute=lambda: load(user_id))
+
+Invalidation : chaque clé contient la version `stamp` du bus d'invalidation
+(monitoring.invalidation), s'il est déclaré (sinon, à l'appelant de versionner
+ses clés, ex. accounts.caching). Une modification change la version : les entrées
+existantes ne sont plus lues, dans tous les workers, au plus
+INVALIDATION_POLL_INTERVAL secondes après le commit. Sans bus
+(INVALIDATION_ENABLED=False), les espaces versionnés ne sont pas mis en cache.
+
+Protection contre les recalculs simultanés (cache stampede) :
+- expiration anticipée probabiliste (XFetch) : avant l'expiration, une
+  lecture sur N recalcule la valeur, d'autant plus tôt que le calcul est
+  long ; les autres continuent de lire l'ancienne valeur ;
+- un seul calcul par clé et par processus : les threads concurrents
+  attendent son résultat ;
+- un seul calcul par clé entre processus : verrou `cache.add()` dans le L2 ;
+  les autres workers attendent que la valeur y apparaisse.
+
+Statistiques : `stats()` par espace de noms (processus courant) et
+eduplatform_cache_requests_total (`<espace>.l1`, `<espace>.l2`) dans /metrics.
+"""
+
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import caches
+
+from monitoring import invalidation, metrics
+
+logger = logging.getLogger(__name__)
+
+# Intervalle (secondes) entre deux lectures du L2 en attendant le calcul d'un autre worker
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+_namespaces = []
+
+
+class LocalLRU:
+    """
+    Cache LRU en mémoire, borné en entrées et en octets, avec durée de vie.
+
+    La taille d'une entrée est celle de sa valeur sérialisée (pickle) :
+    approximative, mais indépendante du type des valeurs.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Valeur de `key`, ou _MISSING (absente ou expirée)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.size_bytes -= size
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        """Garde `value` pendant `timeout` secondes (ignorée si trop grande)."""
+        if self.max_entries <= 0 or timeout <= 0:
+            return
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[2]
+            self._entries[key] = (value, time.monotonic() + timeout, size)
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size_bytes -= entry[2]
+
+    def delete_prefix(self, prefix):
+        """Supprime les entrées dont la clé commence par `prefix`."""
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self.size_bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self.size_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
+
+
+# Instance unique par worker, partagée par les espaces de noms
+local_cache = LocalLRU(
+    max_entries=getattr(settings, 'CACHE_L1_MAX_ENTRIES', 10000),
+    max_bytes=getattr(settings, 'CACHE_L1_MAX_BYTES', 32 * 1024 * 1024),
+)
+
+
+class _Flight:
+    """Calcul en cours d'une clé dans ce processus."""
+
+    __slots__ = ('event', 'value', 'done')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.done = False
+
+
+class TwoTierCache:
+    """
+    Espace de noms du cache à deux niveaux.
+
+    `keys` associe chaque type de clé aux types de ses parties ; une clé
+    inconnue (KeyError) ou mal typée (TypeError) est une erreur de
+    programmation. `timeout` : durée de vie dans le L2 (défaut : TIMEOUT de
+    CACHES) ; `l1_timeout` : durée maximale dans le L1 (CACHE_L1_TIMEOUT).
+    `beta` règle l'expiration anticipée (0 : désactivée).
+    """
+
+    STAT_NAMES = ('l1_hits', 'l2_hits', 'misses', 'recomputes', 'early_recomputes',
+                  'coalesced', 'lock_waits', 'errors')
+
+    def __init__(self, namespace, keys, stamp=None, timeout=None, l1_timeout=None,
+                 beta=None, alias='default'):
+        self.namespace = namespace
+        self.keys = dict(keys)
+        self.stamp = stamp
+        self.timeout = timeout
+        self.l1_timeout = l1_timeout
+        self.beta = beta
+        self.alias = alias
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(self.STAT_NAMES, 0)
+        if stamp is not None:
+            # Les entrées des versions précédentes ne seront plus lues
+            invalidation.bus.watch(stamp, lambda: local_cache.delete_prefix(f'{namespace}:'))
+        _namespaces.append(self)
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def _l2_timeout(self, timeout):
+        if timeout is not None:
+            return timeout
+        if self.timeout is not None:
+            return self.timeout
+        return self.l2.default_timeout
+
+    def _l1_timeout(self):
+        if self.l1_timeout is not None:
+            return self.l1_timeout
+        return getattr(settings, 'CACHE_L1_TIMEOUT', 30)
+
+    def _beta(self):
+        if self.beta is not None:
+            return self.beta
+        return getattr(settings, 'CACHE_EARLY_EXPIRY_BETA', 1.0)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    # -- Clés ------------------------------------------------------------------
+
+    def make_key(self, kind, *parts):
+        """
+        Clé complète de (`kind`, `parts`), ou None si l'espace n'est pas
+        mis en cache (bus d'invalidation désactivé).
+        """
+        types = self.keys[kind]
+        if len(parts) != len(types):
+            raise TypeError(f"{self.namespace}:{kind} attend {len(types)} partie(s), reçu {len(parts)}")
+        for part, expected in zip(parts, types):
+            if not isinstance(part, expected) or (isinstance(part, bool) and expected is not bool):
+                raise TypeError(
+                    f"{self.namespace}:{kind} : {part!r} n'est pas de type {expected.__name__}"
+                )
+
+        key = f'{self.namespace}:{kind}'
+        if self.stamp is not None:
+            if not invalidation.is_enabled():
+                return None
+            invalidation.bus.ensure_loaded(self.stamp)
+            key = f'{key}:v{invalidation.bus.version(self.stamp)}'
+        for part in parts:
+            key = f"{key}:{quote(str(part), safe='')}"
+        return key
+
+    # -- Lecture et écriture ---------------------------------------------------
+
+    def get(self, kind, *parts, default=None):
+        """Valeur en cache (L1 puis L2), ou `default`."""
+        key = self.make_key(kind, *parts)
+        if key is None:
+            return default
+        entry = self._lookup(key)
+        if entry is None:
+            self._count('misses')
+            return default
+        return entry[0]
+
+    def set(self, kind, *parts, value, timeout=None):
+        """Écrit `value` dans les deux niveaux."""
+        key = self.make_key(kind, *parts)
+        if key is not None:
+            self._store(key, value, 0.0, timeout)
+
+    def delete(self, kind, *parts):
+        """
+        Supprime l'entrée du L1 de ce worker et du L2.
+
+        Les L1 des autres workers la gardent jusqu'à CACHE_L1_TIMEOUT : pour
+        une invalidation immédiate partout, incrémenter la version `stamp`.
+        """
+        key = self.make_key(kind, *parts)
+        if key is None:
+            return
+        local_cache.delete(key)
+        try:
+            self.l2.delete(key)
+        except Exception as e:
+            self._l2_error('delete', e)
+
+    def get_or_set(self, kind, *parts, compute, timeout=None):
+        """
+        Valeur en cache, ou résultat de `compute()` mis en cache.
+
+        Un seul appel de `compute()` par clé à la fois (threads et workers) ;
+        avant l'expiration, la valeur est parfois recalculée par anticipation.
+        """
+        key = self.make_key(kind, *parts)
+        if key is None:
+            return compute()
+
+        entry = self._lookup(key)
+        if entry is None:
+            self._count('misses')
+            return self._compute_once(key, compute, timeout)
+
+        value, expires_at, delta = entry
+        if not self._expires_early(expires_at, delta):
+            return value
+        # Recalcul anticipé par un seul worker ; les autres gardent la valeur
+        if not self._acquire(key):
+            return value
+        self._count('early_recomputes')
+        try:
+            return self._recompute(key, compute, timeout)
+        finally:
+            self._release(key)
+
+    def _lookup(self, key):
+        """Entrée (valeur, expiration, durée du calcul) du L1 ou du L2, ou None."""
+        entry = local_cache.get(key)
+        metrics.record_cache(f'{self.namespace}.l1', entry is not _MISSING)
+        if entry is not _MISSING:
+            self._count('l1_hits')
+            return entry
+
+        try:
+            entry = self.l2.get(key)
+        except Exception as e:
+            self._l2_error('get', e)
+            entry = None
+        metrics.record_cache(f'{self.namespace}.l2', entry is not None)
+        if entry is None:
+            return None
+        self._count('l2_hits')
+        self._store_local(key, entry)
+        return entry
+
+    def _expires_early(self, expires_at, delta):
+        # XFetch : -log(u) suit une loi exponentielle ; u dans ]0, 1]
+        beta = self._beta()
+        if not beta or not delta:
+            return False
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+    def _compute_once(self, key, compute, timeout):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            # Calcul en cours dans un autre thread : attendre son résultat
+            flight.event.wait(self._lock_timeout())
+            if flight.done:
+                self._count('coalesced')
+                return flight.value
+            return compute()
+
+        try:
+            if self._acquire(key):
+                try:
+                    value = self._recompute(key, compute, timeout)
+                finally:
+                    self._release(key)
+            else:
+                value = self._wait_for_l2(key)
+                if value is _MISSING:
+                    # Calcul trop long ou abandonné par l'autre worker
+                    value = self._recompute(key, compute, timeout)
+            flight.value = value
+            flight.done = True
+            return value
+        finally:
+            flight.event.set()
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def _recompute(self, key, compute, timeout):
+        start = time.monotonic()
+        value = compute()
+        self._count('recomputes')
+        self._store(key, value, time.monotonic() - start, timeout)
+        return value
+
+    def _store(self, key, value, delta, timeout):
+        timeout = self._l2_timeout(timeout)
+        # TIMEOUT=None : pas d'expiration (la version `stamp` invalide seule)
+        entry = (value, time.time() + timeout if timeout is not None else math.inf, delta)
+        try:
+            self.l2.set(key, entry, timeout)
+        except Exception as e:
+            self._l2_error('set', e)
+        self._store_local(key, entry)
+
+    def _store_local(self, key, entry):
+        local_cache.set(key, entry, min(self._l1_timeout(), entry[1] - time.time()))
+
+    # -- Verrou entre workers --------------------------------------------------
+
+    def _lock_timeout(self):
+        return getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)
+
+    def _acquire(self, key):
+        try:
+            return self.l2.add(f'{key}:lock', 1, self._lock_timeout())
+        except Exception as e:
+            # L2 indisponible : calcul local, sans coordination
+            self._l2_error('add', e)
+            return True
+
+    def _release(self, key):
+        try:
+            self.l2.delete(f'{key}:lock')
+        except Exception as e:
+            self._l2_error('delete', e)
+
+    def _wait_for_l2(self, key):
+        """Valeur écrite dans le L2 par le worker qui calcule, ou _MISSING."""
+        self._count('lock_waits')
+        deadline = time.monotonic() + self._lock_timeout()
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            try:
+                entry = self.l2.get(key)
+            except Exception as e:
+                self._l2_error('get', e)
+                return _MISSING
+            if entry is not None:
+                self._store_local(key, entry)
+                return entry[0]
+        return _MISSING
+
+    def _l2_error(self, operation, error):
+        self._count('errors')
+        logger.warning("Cache %s : échec de %s dans le L2: %s", self.namespace, operation, error)
+
+    # -- Statistiques ----------------------------------------------------------
+
+    def stats(self):
+        """Compteurs de ce processus depuis le démarrage (ou `reset_stats()`)."""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = dict.fromkeys(self.STAT_NAMES, 0)
+
+
+def namespaces():
+    """Espaces de noms déclarés (modules importés)."""
+    return list(_namespaces)
+
+
+def clear_local():
+    """Vide le L1 de ce worker."""
+    local_cache.clear()
+
+
+def clear_all():
+    """
+    Vide le L1 et le cache Django de chaque espace de noms.
+
+    `cache.clear()` supprime toutes les clés du cache, pas seulement celles
+    des espaces de noms : réservé aux bases de test et aux benchmarks.
+    """
+    clear_local()
+    for alias in {namespace.alias for namespace in _namespaces}:
+        caches[alias].clear()
@@ -0,0 +1,48 @@
+"""
+Pagination des très grandes tables avec l'estimation du planificateur PostgreSQL.
+
+`COUNT(*)` parcourt toute la table (ou tout l'index) sous PostgreSQL : sur
+des centaines de milliers de lignes, il coûte plus cher que la page
+elle-même. EstimatedCountPaginator demande d'abord au planificateur son
+estimation du nombre de lignes (`EXPLAIN`, quelques millisecondes) et ne
+compte exactement que si elle est sous ESTIMATE_THRESHOLD : au-delà, le total
+et le nombre de pages affichés sont approximatifs (une dernière page peut
+être vide). Les autres bases comptent toujours exactement.
+"""
+
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Nombre estimé de lignes à partir duquel l'estimation remplace COUNT(*)
+ESTIMATE_THRESHOLD = 10000
+
+
+def planner_row_estimate(queryset):
+    """Nombre de lignes estimé par le planificateur (None hors PostgreSQL)."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator (admin : `paginator = EstimatedCountPaginator`) au total estimé."""
+
+    threshold = ESTIMATE_THRESHOLD
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = planner_row_estimate(self.object_list)
+            if estimate is not None and estimate >= self.threshold:
+                return estimate
+        return super().count
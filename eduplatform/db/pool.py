@@ -0,0 +1,175 @@
+"""
+Pool de connexions borné, partagé par les threads d'un processus.
+
+Utilisé par le backend `eduplatform.db.postgresql_pool` : chaque thread
+(gthread, ASGI...) emprunte une connexion pour la durée d'une requête au lieu
+d'en garder une ouverte par thread.
+
+- `min_size` connexions sont ouvertes à la création du pool ;
+- au plus `max_size` connexions existent (empruntées + libres) ; au-delà,
+  l'emprunt attend `timeout` secondes puis lève `PoolTimeout` ;
+- une connexion restée libre plus de `health_check_interval` secondes est
+  vérifiée (`SELECT 1`) avant d'être prêtée, et remplacée si elle est morte ;
+- une connexion rendue en cours de transaction est annulée (rollback).
+"""
+
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Aucune connexion libre dans le délai d'attente."""
+
+
+class ConnectionPool:
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=10.0, health_check_interval=30.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Tailles de pool invalides : min={min_size}, max={max_size}")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._lock = threading.Condition()
+        # Connexions libres : (connexion, instant de retour au pool)
+        self._idle = deque()
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self.stats_counters = {'checkouts': 0, 'created': 0, 'discarded': 0, 'timeouts': 0, 'wait_time_s': 0.0}
+
+        for _ in range(min_size):
+            connection = self._new_connection()
+            self._idle.append((connection, time.monotonic()))
+            self._size += 1
+
+    def _new_connection(self):
+        connection = self._connect()
+        with self._lock:
+            self.stats_counters['created'] += 1
+        return connection
+
+    def getconn(self):
+        """Emprunte une connexion (bloque au plus `timeout` secondes)."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise psycopg2.InterfaceError("Pool de connexions fermé")
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Place réservée : la connexion est ouverte hors du verrou
+                    self._size += 1
+                    connection = returned_at = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats_counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"Aucune connexion libre après {self.timeout} s "
+                        f"({self.max_size} connexions déjà empruntées)"
+                    )
+                self._waiting += 1
+                try:
+                    self._lock.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self.stats_counters['checkouts'] += 1
+            self.stats_counters['wait_time_s'] += time.monotonic() - start
+
+        if connection is not None and not self._is_healthy(connection, returned_at):
+            self._discard(connection, release_slot=False)
+            connection = None
+        if connection is None:
+            try:
+                connection = self._new_connection()
+            except Exception:
+                self._release_slot()
+                raise
+        return connection
+
+    def putconn(self, connection, discard=False):
+        """Rend une connexion empruntée ; `discard` la ferme (erreur, état inconnu)."""
+        if not discard and not self._reset(connection):
+            discard = True
+        if discard or self._closed:
+            self._discard(connection)
+            return
+        with self._lock:
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    def _is_healthy(self, connection, returned_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _reset(self, connection):
+        """Remet la connexion dans un état réutilisable (False si impossible)."""
+        if connection.closed:
+            return False
+        try:
+            if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            return connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, connection, release_slot=True):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self.stats_counters['discarded'] += 1
+            if release_slot:
+                self._size -= 1
+                self._lock.notify()
+
+    def _release_slot(self):
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def close(self):
+        """Ferme les connexions libres ; les connexions empruntées le seront au retour."""
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._lock.notify_all()
+        for connection, _ in idle:
+            try:
+                connection.close()
+            except psycopg2.Error:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                **self.stats_counters,
+                'wait_time_s': round(self.stats_counters['wait_time_s'], 3),
+            }
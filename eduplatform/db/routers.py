@@ -0,0 +1,132 @@
+"""
+Routage des lectures du catalogue vers les réplicas en lecture.
+
+Configuration (settings.py) : DATABASE_REPLICA_URLS déclare les alias
+`replica`, `replica_2`... et active ReplicaRouter.
+
+- Seules les lectures des modèles du catalogue (REPLICA_MODELS) faites
+  pendant une requête GET/HEAD d'une vue de REPLICA_VIEW_MODULES partent vers
+  un réplica (le même pendant toute la requête, voir ReplicaRoutingMiddleware).
+- Tout le reste reste sur `default` : écritures, lectures dans une
+  transaction, tables d'authentification et de session (ActiveToken,
+  UserSession, blacklist simplejwt, auth, sessions), progression...
+- Lecture de ses propres écritures : un utilisateur qui vient d'écrire
+  (requête POST/PUT/PATCH/DELETE réussie) est épinglé sur `default` pendant
+  REPLICA_PIN_SECONDS, le temps que la réplication rattrape ses modifications.
+  L'épinglage est stocké dans le cache `default` : il doit être partagé
+  entre workers en production.
+- Valeurs mises en cache (read_from_primary) : calculées depuis `default`,
+  car elles sont partagées par tous les workers jusqu'à la prochaine
+  invalidation. Lues sur un réplica en retard, elles garderaient l'état
+  d'avant la modification qui a déclenché le recalcul.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Modèles lus depuis les réplicas ('app_label.model_name')
+REPLICA_MODELS = frozenset({'videos.category', 'videos.video'})
+
+# Vues dont les requêtes GET/HEAD peuvent lire depuis un réplica
+REPLICA_VIEW_MODULES = frozenset({'videos.api_views', 'videos.views'})
+
+PIN_KEY = 'db_primary_pin:{}'
+
+# Requête en cours et réplica choisi pour elle (None : tout sur `default`)
+_read_context = ContextVar('replica_read_context', default=None)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def pin_to_primary(user_id):
+    """Lit depuis `default` les requêtes de l'utilisateur pendant REPLICA_PIN_SECONDS."""
+    cache.set(PIN_KEY.format(user_id), True, getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+
+
+def is_pinned_to_primary(user_id):
+    return cache.get(PIN_KEY.format(user_id), False)
+
+
+@contextmanager
+def read_from_primary():
+    """Lectures du bloc (ou de la fonction décorée) sur `default`."""
+    token = _read_context.set(None)
+    try:
+        yield
+    finally:
+        _read_context.reset(token)
+
+
+def activate(request, alias):
+    return _read_context.set((request, alias))
+
+
+def deactivate(token):
+    _read_context.reset(token)
+
+
+class ReplicaRouter:
+    """Routeur Django (DATABASE_ROUTERS)."""
+
+    def db_for_read(self, model, **hints):
+        context = _read_context.get()
+        if context is None or model._meta.label_lower not in REPLICA_MODELS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        request, alias = context
+        # L'utilisateur n'est connu qu'après l'authentification (DRF la fait
+        # dans la vue) : vérifié à la première lecture du catalogue
+        pinned = getattr(request, '_db_pinned_to_primary', None)
+        if pinned is None:
+            user = getattr(request, 'user', None)
+            pinned = bool(user is not None and user.is_authenticated and is_pinned_to_primary(user.pk))
+            request._db_pinned_to_primary = pinned
+        return DEFAULT_DB_ALIAS if pinned else alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas sont des copies de `default`
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Active le routage vers un réplica pendant les requêtes de lecture du
+    catalogue et épingle sur `default` les utilisateurs qui écrivent.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.replicas = replica_aliases()
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            token = getattr(request, '_replica_context_token', None)
+            if token is not None:
+                deactivate(token)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.replicas or request.method not in ('GET', 'HEAD'):
+            return None
+        if view_func.__module__ in REPLICA_VIEW_MODULES:
+            request._replica_context_token = activate(request, random.choice(self.replicas))
+        return None
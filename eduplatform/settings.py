@@ -51,11 +51,14 @@ INSTALLED_APPS = [
     'corsheaders',
     
     # Custom apps
+    'monitoring.apps.MonitoringConfig',
     'accounts.apps.AccountsConfig',
     'videos.apps.VideosConfig',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.InstrumentationMiddleware',  # Custom: Server-Timing, requêtes lentes
+    'monitoring.invalidation.InvalidationMiddleware',  # Custom: invalidations entre workers
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Static files in production
     'corsheaders.middleware.CorsMiddleware',  # CORS for Next.js
@@ -64,8 +67,10 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'accounts.middleware.SingleSessionMiddleware',  # Custom: Session unique
+    'eduplatform.db.routers.ReplicaRoutingMiddleware',  # Custom: lectures sur réplicas
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.profiling.ProfilingMiddleware',  # Custom: profilage à la demande (juste avant la vue)
 ]
 
 ROOT_URLCONF = 'eduplatform.urls'
@@ -112,6 +117,81 @@ else:
         }
     }
 
+# Réplicas en lecture (optionnel) : URLs séparées par des virgules, alias
+# `replica`, `replica_2`... Les lectures du catalogue y sont envoyées, le reste
+# reste sur `default` (voir eduplatform/db/routers.py). En local :
+# DATABASE_REPLICA_URLS=sqlite:///db_replica.sqlite3
+DATABASE_REPLICA_URLS = config('DATABASE_REPLICA_URLS', default='', cast=Csv())
+
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    replica = dj_database_url.parse(replica_url, conn_max_age=600, conn_health_checks=True)
+    # Base de test : même base que `default` (pas de réplication en test)
+    replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica' if index == 1 else f'replica_{index}'] = replica
+
+# Pool de connexions optionnel (workers multi-threads) : `?pool=true` dans
+# l'URL de la base, avec pool_min_size, pool_max_size, pool_timeout (s) et
+# pool_health_check (s). Voir eduplatform/db/postgresql_pool/base.py.
+for database in DATABASES.values():
+    if database.get('OPTIONS', {}).get('pool'):
+        database.update({
+            'ENGINE': 'eduplatform.db.postgresql_pool',
+            # Connexion rendue au pool à la fin de chaque requête
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False,
+        })
+
+DATABASE_ROUTERS = ['eduplatform.db.routers.ReplicaRouter'] if DATABASE_REPLICA_URLS else []
+
+# Durée (s) pendant laquelle un utilisateur qui vient d'écrire lit depuis `default`
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+# =============================================================================
+# CACHE (voir eduplatform/caching.py)
+# =============================================================================
+
+# Cache partagé par les workers (L2 du cache à deux niveaux, limitation de
+# débit, statistiques admin) :
+# - 'locmem' (défaut) : propre à chaque processus (runserver) ;
+# - 'file' ou 'database' (`python manage.py createcachetable`) : partagé par
+#   les processus locaux, mais lent (plusieurs ms par accès, à chaque requête
+#   pour la limitation de débit) ;
+# - 'redis' : production (CACHE_LOCATION=redis://...).
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+CACHE_BACKENDS = {
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.django_cache')),
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'eduplatform'),
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'eduplatform',
+        'OPTIONS': {} if CACHE_BACKEND == 'redis' else {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+        },
+    }
+}
+
+# Niveau L1 (mémoire de chaque worker) : taille maximale et durée de vie (s)
+# d'une entrée ; une modification l'invalide au plus INVALIDATION_POLL_INTERVAL
+# secondes après le commit
+CACHE_L1_MAX_ENTRIES = config('CACHE_L1_MAX_ENTRIES', default=10000, cast=int)
+CACHE_L1_MAX_BYTES = config('CACHE_L1_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+CACHE_L1_TIMEOUT = config('CACHE_L1_TIMEOUT', default=30, cast=int)
+
+# Expiration anticipée (XFetch) : 0 la désactive, > 1 recalcule plus tôt
+CACHE_EARLY_EXPIRY_BETA = config('CACHE_EARLY_EXPIRY_BETA', default=1.0, cast=float)
+
+# Durée maximale (s) d'un calcul pendant laquelle les autres workers attendent
+# son résultat plutôt que de recalculer
+CACHE_LOCK_TIMEOUT = config('CACHE_LOCK_TIMEOUT', default=10, cast=int)
+
 # =============================================================================
 # PASSWORD VALIDATION
 # =============================================================================
@@ -134,6 +214,14 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Processus utilisés pour hacher les mots de passe lors de la création
+# de comptes en masse (0 = nombre de CPU)
+USER_PROVISIONING_WORKERS = config('USER_PROVISIONING_WORKERS', default=0, cast=int)
+
+# Lignes acceptées par POST /api/admin/users/bulk/ (hachage dans la requête,
+# environ 0,3 s par compte) ; au-delà, commande `provision_users`
+USER_BULK_API_MAX_ROWS = config('USER_BULK_API_MAX_ROWS', default=50, cast=int)
+
 # =============================================================================
 # INTERNATIONALIZATION
 # =============================================================================
@@ -208,6 +296,13 @@ if not DEBUG:
 # LOGGING CONFIGURATION
 # =============================================================================
 
+# Format des journaux : 'json' (une ligne JSON avec request_id, user_id, vue,
+# durée) ou 'verbose' (texte). Écriture dans un thread dédié (monitoring.logs).
+LOG_FORMAT = config('LOG_FORMAT', default='verbose' if DEBUG else 'json')
+
+# Enregistrements en attente d'écriture au-delà desquels ils sont abandonnés
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -216,11 +311,17 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'monitoring.logs.JSONFormatter',
+        },
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            # '()' et non 'class' : dictConfig (Python 3.12+) traite à part les
+            # sous-classes de QueueHandler déclarées par 'class'
+            '()': 'monitoring.logs.QueueStreamHandler',
+            'formatter': LOG_FORMAT,
+            'queue_size': LOG_QUEUE_SIZE,
         },
     },
     'root': {
@@ -233,6 +334,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'monitoring': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -254,6 +360,26 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
+    # Nombre de proxys devant l'application : l'IP client est lue dans
+    # X-Forwarded-For à cette profondeur (0 : REMOTE_ADDR)
+    'NUM_PROXIES': config('NUM_PROXIES', default=1, cast=int),
+}
+
+# =============================================================================
+# LIMITATION DE DÉBIT (voir accounts/throttling.py)
+# =============================================================================
+
+THROTTLE_ENABLED = config('THROTTLE_ENABLED', default=True, cast=bool)
+
+# Débits par '<politique>.<portée>' ; une valeur vide désactive la règle
+THROTTLE_RATES = {
+    # Seau à jetons par IP : freine le credential stuffing avant le hachage du mot de
+    # passe, assez large pour une classe derrière une même IP (NAT) en début de cours
+    'login.ip': config('THROTTLE_LOGIN_IP', default='300/min'),
+    # Fenêtre glissante par nom d'utilisateur : protège un compte visé depuis plusieurs IP
+    'login.username': config('THROTTLE_LOGIN_USERNAME', default='10/5min'),
+    'refresh.ip': config('THROTTLE_REFRESH_IP', default='60/min'),
+    'catalogue.user': config('THROTTLE_CATALOGUE_USER', default='300/min'),
 }
 
 # =============================================================================
@@ -271,6 +397,102 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
 }
 
+# Nombre maximal d'access tokens vérifiés gardés en mémoire par worker (0 = désactivé)
+JWT_VERIFIED_TOKEN_CACHE_SIZE = config('JWT_VERIFIED_TOKEN_CACHE_SIZE', default=1024, cast=int)
+
+# Flux SSE des révocations de session (/api/auth/events/) : intervalle des
+# pings et durée maximale d'une connexion (EventSource se reconnecte ensuite).
+# Sous WSGI, chaque connexion occupe un thread : servir via ASGI
+# (eduplatform.asgi) ou des workers gthread ; un worker mono-thread répond 503.
+SSE_HEARTBEAT_SECONDS = config('SSE_HEARTBEAT_SECONDS', default=15, cast=int)
+SSE_MAX_SECONDS = config('SSE_MAX_SECONDS', default=300, cast=int)
+
+# Durée de validité (s) d'un ticket d'ouverture du flux (POST /api/auth/events/ticket/)
+SSE_TICKET_SECONDS = config('SSE_TICKET_SECONDS', default=30, cast=int)
+
+# =============================================================================
+# PROGRESSION DE VISIONNAGE (écriture différée)
+# =============================================================================
+
+# Intervalle (secondes) entre deux écritures groupées des heartbeats
+PROGRESS_FLUSH_INTERVAL = config('PROGRESS_FLUSH_INTERVAL', default=5.0, cast=float)
+
+# Nombre d'entrées (utilisateur, vidéo) en attente déclenchant une écriture immédiate
+PROGRESS_FLUSH_MAX_PENDING = config('PROGRESS_FLUSH_MAX_PENDING', default=5000, cast=int)
+
+# =============================================================================
+# DASHBOARD ADMIN
+# =============================================================================
+
+# Durée de vie (secondes) de l'instantané des statistiques admin en cache
+ADMIN_STATS_CACHE_TIMEOUT = config('ADMIN_STATS_CACHE_TIMEOUT', default=300, cast=int)
+
+# =============================================================================
+# INVALIDATION DES CACHES ENTRE WORKERS (voir monitoring/invalidation.py)
+# =============================================================================
+
+INVALIDATION_ENABLED = config('INVALIDATION_ENABLED', default=True, cast=bool)
+
+# Stockage des versions : 'database' (table partagée) ou 'cache' (cache partagé requis)
+INVALIDATION_STORE = config('INVALIDATION_STORE', default='database')
+
+# Intervalle (secondes) de relecture des versions : délai maximal de
+# propagation d'une modification aux autres workers (LISTEN/NOTIFY avec PostgreSQL)
+INVALIDATION_POLL_INTERVAL = config('INVALIDATION_POLL_INTERVAL', default=1.0, cast=float)
+
+# =============================================================================
+# ACCÈS AUX CATÉGORIES (cohortes)
+# =============================================================================
+
+# Durée de vie (secondes) des catégories interdites d'un utilisateur en cache
+ENTITLEMENTS_CACHE_TIMEOUT = config('ENTITLEMENTS_CACHE_TIMEOUT', default=300, cast=int)
+
+# =============================================================================
+# STATISTIQUES DE VUES (cumuls pré-agrégés)
+# =============================================================================
+
+# Intervalle (secondes) entre deux écritures des compteurs de vues
+ANALYTICS_FLUSH_INTERVAL = config('ANALYTICS_FLUSH_INTERVAL', default=60.0, cast=float)
+
+# Nombre de compteurs en attente déclenchant une écriture immédiate
+ANALYTICS_FLUSH_MAX_PENDING = config('ANALYTICS_FLUSH_MAX_PENDING', default=5000, cast=int)
+
+# =============================================================================
+# INSTRUMENTATION DES REQUÊTES
+# =============================================================================
+
+# En-tête Server-Timing (db, auth, ser, total) sur chaque réponse
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=DEBUG, cast=bool)
+
+# Seuils (millisecondes) du journal des requêtes lentes (logger `monitoring.slow`)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=100, cast=int)
+
+# Dépassement du `query_budget` d'une vue : 'warn' (log), 'raise' (exception) ou 'off'
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='warn' if DEBUG else 'off')
+
+# Adresses autorisées à lire /metrics (collecteur Prometheus).
+# Agrégation multi-workers : définir PROMETHEUS_MULTIPROC_DIR (répertoire vide
+# au démarrage de gunicorn) dans l'environnement du serveur.
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
+# Préchauffage des workers au démarrage (monitoring.warmup, gunicorn.conf.py)
+WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+
+# =============================================================================
+# PROFILAGE À LA DEMANDE (voir monitoring/profiling.py)
+# =============================================================================
+
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+
+# Répertoire des profils (partagé par les workers) et nombre de profils conservés
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=200, cast=int)
+
+# Durée de validité (secondes) d'un jeton de l'en-tête X-Profile (accepté tant
+# que son titulaire reste un administrateur actif)
+PROFILING_TOKEN_MAX_AGE = config('PROFILING_TOKEN_MAX_AGE', default=3600, cast=int)
+
 # =============================================================================
 # CORS SETTINGS (for Next.js frontend)
 # =============================================================================
@@ -0,0 +1,55 @@
+"""
+Outils communs aux tests des applications (python manage.py test).
+"""
+
+from django.core.cache import cache
+
+from accounts.models import ActiveToken
+from accounts.tokens import issue_session_tokens
+from eduplatform import caching
+from videos.analytics import view_aggregator
+from videos.progress import progress_buffer
+
+PASSWORD = 'test-password-123'
+
+
+def auth_headers(user):
+    """En-tête Authorization d'une session JWT active pour `user`."""
+    _, access, sid = issue_session_tokens(user)
+    ActiveToken.set_active_token(user, sid, '127.0.0.1', 'tests')
+    return {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+
+def youtube_url(index):
+    return f'https://www.youtube.com/watch?v=test{index:07d}'
+
+
+class CacheIsolationMixin:
+    """
+    Caches vidés à chaque test : compteurs de débit, entrées du cache à deux
+    niveaux (les identifiants sont réutilisés après l'annulation du test).
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        caching.clear_all()
+
+
+class DeferredWritesMixin:
+    """
+    Tampons d'écriture différée (progression, vues) sans thread de vidage :
+    vidés par le test lui-même, puis dans la transaction du test à la fin.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self._flush_intervals = [(buffer, buffer.flush_interval) for buffer in (progress_buffer, view_aggregator)]
+        for buffer, _ in self._flush_intervals:
+            buffer.flush_interval = 0
+
+    def tearDown(self):
+        for buffer, interval in self._flush_intervals:
+            buffer.flush()
+            buffer.flush_interval = interval
+        super().tearDown()
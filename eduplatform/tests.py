@@ -0,0 +1,98 @@
+"""
+Tests du projet (routage des bases, cache à deux niveaux).
+
+    python manage.py test eduplatform
+"""
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from videos.api_views import DashboardAPIView
+from videos.models import Category, Video
+from .db import routers
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    """Hors transaction de test : le routeur laisse sur `default` les lectures dans un bloc atomique."""
+
+    def setUp(self):
+        cache.clear()
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read_alias(self, request, model=Video):
+        token = routers.activate(request, 'replica')
+        try:
+            return self.router.db_for_read(model)
+        finally:
+            routers.deactivate(token)
+
+    def request(self, user=None, method='get'):
+        request = getattr(self.factory, method)('/api/dashboard/')
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_only_catalogue_reads_go_to_the_replica(self):
+        request = self.request()
+
+        self.assertEqual(self.router.db_for_read(Video), 'default')
+        self.assertEqual(self.read_alias(request), 'replica')
+        self.assertEqual(self.read_alias(request, Category), 'replica')
+        self.assertEqual(self.read_alias(request, User), 'default')
+        self.assertEqual(self.router.db_for_write(Video), 'default')
+
+    def test_user_is_pinned_after_a_write(self):
+        user = User(pk=7, username='alice')
+        middleware = routers.ReplicaRoutingMiddleware(lambda request: HttpResponse(status=201))
+
+        self.assertEqual(self.read_alias(self.request(user)), 'replica')
+        middleware(self.request(user, 'post'))
+
+        self.assertTrue(routers.is_pinned_to_primary(user.pk))
+        self.assertEqual(self.read_alias(self.request(user)), 'default')
+        # Les autres utilisateurs lisent toujours le réplica
+        self.assertEqual(self.read_alias(self.request(User(pk=8, username='bob'))), 'replica')
+
+    def test_failed_write_does_not_pin(self):
+        user = User(pk=7, username='alice')
+        middleware = routers.ReplicaRoutingMiddleware(lambda request: HttpResponse(status=400))
+
+        middleware(self.request(user, 'post'))
+
+        self.assertFalse(routers.is_pinned_to_primary(user.pk))
+
+    def test_middleware_routes_catalogue_views_during_the_request(self):
+        seen = []
+
+        def get_response(request):
+            seen.append(self.router.db_for_read(Video))
+            return HttpResponse()
+
+        middleware = routers.ReplicaRoutingMiddleware(get_response)
+        middleware.replicas = ['replica']
+        request = self.request()
+
+        middleware.process_view(request, DashboardAPIView.as_view(), (), {})
+        middleware(request)
+
+        self.assertEqual(seen, ['replica'])
+        # Contexte retiré à la fin de la requête
+        self.assertEqual(self.router.db_for_read(Video), 'default')
+
+    def test_read_from_primary(self):
+        request = self.request()
+
+        @routers.read_from_primary()
+        def compute():
+            return self.router.db_for_read(Video)
+
+        token = routers.activate(request, 'replica')
+        try:
+            with routers.read_from_primary():
+                self.assertEqual(self.router.db_for_read(Video), 'default')
+            self.assertEqual(compute(), 'default')
+            self.assertEqual(self.router.db_for_read(Video), 'replica')
+        finally:
+            routers.deactivate(token)
@@ -5,6 +5,7 @@ URL configuration for eduplatform project.
 from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import redirect
+from monitoring.views import metrics_view
 
 urlpatterns = [
     # Admin Django
@@ -17,6 +18,9 @@ urlpatterns = [
     path('api/admin/', include('accounts.admin_api_urls', namespace='admin_api')),
     path('api/', include('videos.api_urls', namespace='videos_api')),
     
+    # Métriques Prometheus (accès local)
+    path('metrics', metrics_view, name='metrics'),
+    
     # =========================================
     # Templates Django (optionnel, peut être supprimé)
     # =========================================
@@ -3,8 +3,22 @@ WSGI config for eduplatform project.
 """
 
 import os
+import time
+
+_boot_start = time.perf_counter()
+
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eduplatform.settings')
 
 application = get_wsgi_application()
+
+# Préchauffage partagé par les workers (processus maître avec preload_app) ;
+# la phase « worker » est lancée par le hook post_worker_init de gunicorn.conf.py
+from monitoring import warmup  # noqa: E402
+
+warmup.run(warmup.PRELOAD)
+warmup.logger.info(
+    "Application chargée en %.0f ms (pid %s)",
+    (time.perf_counter() - _boot_start) * 1000, os.getpid(),
+)
@@ -13,21 +13,28 @@ export const API_ENDPOINTS = {
   DASHBOARD: `${API_URL}/api/dashboard/`,
   VIDEOS: `${API_URL}/api/videos/`,
   VIDEO_DETAIL: (id: number) => `${API_URL}/api/videos/${id}/`,
+  VIDEO_PROGRESS: (id: number) => `${API_URL}/api/videos/${id}/progress/`,
+  PROGRESS: `${API_URL}/api/progress/`,
   CATEGORIES: `${API_URL}/api/categories/`,
   CATEGORY_DETAIL: (id: number) => `${API_URL}/api/categories/${id}/`,
   
   // Admin API
   ADMIN: {
     DASHBOARD: `${API_URL}/api/admin/dashboard/`,
+    ANALYTICS: `${API_URL}/api/admin/analytics/`,
     // Users
     USERS: `${API_URL}/api/admin/users/`,
+    USERS_BULK: `${API_URL}/api/admin/users/bulk/`,
     USER_DETAIL: (id: number) => `${API_URL}/api/admin/users/${id}/`,
     USER_INVALIDATE_SESSIONS: (id: number) => `${API_URL}/api/admin/users/${id}/invalidate-sessions/`,
     // Categories
     CATEGORIES: `${API_URL}/api/admin/categories/`,
+    CATEGORIES_REORDER: `${API_URL}/api/admin/categories/reorder/`,
     CATEGORY_DETAIL: (id: number) => `${API_URL}/api/admin/categories/${id}/`,
     // Videos
     VIDEOS: `${API_URL}/api/admin/videos/`,
+    VIDEOS_BULK: `${API_URL}/api/admin/videos/bulk/`,
+    VIDEOS_REORDER: `${API_URL}/api/admin/videos/reorder/`,
     VIDEO_DETAIL: (id: number) => `${API_URL}/api/admin/videos/${id}/`,
   }
 };
@@ -72,6 +72,13 @@ export interface DashboardData {
   };
 }
 
+export interface WatchProgress {
+  position: number;
+  duration: number | null;
+  completed: boolean;
+  updated_at: string;
+}
+
 export interface Session {
   id: number;
   created_at: string;
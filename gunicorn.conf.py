@@ -0,0 +1,53 @@
+"""
+Configuration gunicorn (chargée automatiquement depuis le répertoire courant,
+ou via `gunicorn -c gunicorn.conf.py`).
+
+L'application est chargée une fois dans le processus maître (`preload_app`) :
+la phase PRELOAD du préchauffage (monitoring.warmup) y est exécutée et son
+résultat est partagé par les workers après le fork. Chaque worker exécute
+ensuite la phase WORKER (connexion à la base, caches locaux) avant d'accepter
+des requêtes.
+
+Variables d'environnement : PORT, WEB_CONCURRENCY, GUNICORN_THREADS,
+GUNICORN_TIMEOUT, GUNICORN_PRELOAD, PROMETHEUS_MULTIPROC_DIR.
+"""
+
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() not in ('0', 'false', 'no')
+accesslog = '-'
+# Format par défaut sans la chaîne de requête (%(r)s -> méthode, chemin,
+# protocole) : elle peut contenir un secret (jeton du flux SSE)
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def _reset_metrics_directory():
+    """Vide le répertoire des métriques multi-processus d'un démarrage précédent."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    # Une fois par maître : la configuration est relue à chaque rechargement (HUP)
+    if directory and os.environ.get('EDUPLATFORM_METRICS_RESET_BY') != str(os.getpid()):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        os.environ['EDUPLATFORM_METRICS_RESET_BY'] = str(os.getpid())
+
+
+# Au chargement de cette configuration, avant l'application (preload) : les
+# compteurs sans label créent leur fichier dans ce répertoire dès l'import
+# (on_starting n'est appelé qu'après le preload)
+_reset_metrics_directory()
+
+
+def post_worker_init(worker):
+    """Phase WORKER du préchauffage, avant la première requête du worker."""
+    from monitoring import warmup
+    warmup.run(warmup.WORKER)
+
+
+def child_exit(server, worker):
+    from monitoring import metrics
+    metrics.mark_process_dead(worker.pid)
@@ -0,0 +1 @@
+# Monitoring App - Instrumentation et mesures de performance
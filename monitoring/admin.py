@@ -0,0 +1,24 @@
+"""
+Configuration de l'admin pour l'application monitoring.
+"""
+
+from django.contrib import admin
+from .models import ProfilingSwitch
+
+
+@admin.register(ProfilingSwitch)
+class ProfilingSwitchAdmin(admin.ModelAdmin):
+    """
+    Échantillonnage du profilage des requêtes (une seule ligne).
+    """
+    list_display = ('sample_rate', 'view_name', 'expires_at', 'updated_by', 'updated_at')
+    fields = ('sample_rate', 'view_name', 'expires_at', 'updated_by', 'updated_at')
+    readonly_fields = ('updated_by', 'updated_at')
+
+    def has_add_permission(self, request):
+        return super().has_add_permission(request) and not ProfilingSwitch.objects.exists()
+
+    def save_model(self, request, obj, form, change):
+        obj.pk = ProfilingSwitch.SINGLETON_ID
+        obj.updated_by = request.user
+        super().save_model(request, obj, form, change)
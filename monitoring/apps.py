@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+    verbose_name = 'Monitoring'
+
+    def ready(self):
+        from . import invalidation, warmup, warmers
+        from .models import PROFILING_STAMP, ProfilingSwitch
+        invalidation.bump_on_change(PROFILING_STAMP, ProfilingSwitch)
+        warmup.register('url_resolver', warmers.warm_url_resolver)
+        warmup.register('templates', warmers.warm_templates)
+        warmup.register('db_connections', warmers.warm_db_connections, phase=warmup.WORKER)
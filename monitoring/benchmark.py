@@ -0,0 +1,441 @@
+"""
+Jeu de données synthétique et scénarios du benchmark des endpoints API.
+
+`seed_dataset` crée un jeu de données paramétrable et reproductible (même
+graine = mêmes données) : utilisateurs avec N tokens JWT émis et M sessions,
+K catégories × V vidéos, progression de visionnage et cumuls de vues.
+
+`build_scenarios` décrit une requête par (endpoint, méthode) des fichiers
+videos/api_urls.py, accounts/api_urls.py et accounts/admin_api_urls.py ;
+`run_scenario` l'exécute via le client de test et mesure latence, nombre de
+requêtes SQL et pic mémoire.
+
+Chaque requête mesurée s'exécute dans une transaction annulée ensuite : les
+écritures (login, suppression, import...) ne modifient pas le jeu de données
+des requêtes suivantes.
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment,
+)
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from accounts import stats
+from accounts.models import ActiveToken, UserSession
+from accounts.tokens import issue_session_tokens
+from eduplatform import caching
+from videos.analytics import period_start, view_aggregator
+from videos.models import Category, Video, VideoViewRollup, WatchProgress
+from videos.ordering import ORDER_GAP
+from videos.progress import progress_buffer
+
+# Mot de passe commun des comptes générés
+BENCH_PASSWORD = 'bench-password-123'
+
+# Espaces de noms d'URL couverts par le benchmark
+BENCH_NAMESPACES = ('videos_api', 'accounts_api', 'admin_api')
+
+# Routes sans réponse finie, mesurées à part (bench_sse_subscribers)
+UNBENCHED_URL_NAMES = {'accounts_api:events'}
+
+BATCH_SIZE = 1000
+
+
+class Dataset:
+    """Identifiants des objets créés par `seed_dataset`."""
+
+    def __init__(self, admin, login_user, user_ids, category_ids, video_ids, params):
+        self.admin = admin
+        # Session JWT active de l'administrateur (requêtes authentifiées)
+        refresh, access, sid = issue_session_tokens(admin)
+        ActiveToken.set_active_token(admin, sid, '127.0.0.1', 'bench')
+        self.access_token = str(access)
+        self.refresh_token = str(refresh)
+        self.login_user = login_user
+        self.user_ids = user_ids
+        self.category_ids = category_ids
+        self.video_ids = video_ids
+        self.params = params
+
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+@contextmanager
+def benchmark_database():
+    """Base de test temporaire (comme le lanceur de tests Django), détruite à la sortie."""
+    buffers = (progress_buffer, view_aggregator)
+    intervals = [buffer.flush_interval for buffer in buffers]
+    for buffer in buffers:
+        # Pas de thread de vidage concurrent des requêtes mesurées
+        buffer.flush_interval = 0
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    # Les scénarios répètent login et refresh depuis la même IP (coût mesuré
+    # à part par bench_throttling) ; cache propre au benchmark, vidé à la sortie
+    overrides = override_settings(THROTTLE_ENABLED=False, CACHES=BENCHMARK_CACHES)
+    overrides.enable()
+    try:
+        yield
+    finally:
+        caching.clear_all()
+        overrides.disable()
+        # Vider les tampons d'écriture différée tant que la base de test existe
+        for buffer, interval in zip(buffers, intervals):
+            buffer.stop()
+            buffer.flush_interval = interval
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def _random_key(rng, length=32):
+    return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(length))
+
+
+def _random_youtube_id(rng):
+    return ''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_-')
+                   for _ in range(11))
+
+
+def seed_dataset(users=100, tokens_per_user=5, sessions_per_user=1, categories=10,
+                 videos_per_category=20, seed=42):
+    """
+    Crée le jeu de données synthétique (base supposée vide) et retourne un Dataset.
+
+    Un seul hachage de mot de passe est calculé, partagé par tous les comptes.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+
+    admin = User.objects.create(username='bench_admin', password=password,
+                                is_staff=True, is_superuser=True)
+    login_user = User.objects.create(username='bench_login', password=password)
+
+    created_users = User.objects.bulk_create([
+        User(
+            username=f'bench_user_{i:06d}',
+            email=f'bench_user_{i:06d}@example.com',
+            password=password,
+            date_joined=now - timedelta(minutes=i),
+        )
+        for i in range(users)
+    ], batch_size=BATCH_SIZE)
+    user_ids = [u.id for u in created_users]
+    # Le compte de login a aussi des tokens et des sessions à invalider
+    owner_ids = [login_user.id] + user_ids
+
+    # Tokens émis (table parcourue au login pour le blacklistage)
+    OutstandingToken.objects.bulk_create([
+        OutstandingToken(
+            user_id=user_id,
+            jti=_random_key(rng),
+            token='bench',
+            created_at=now,
+            expires_at=now + timedelta(days=1),
+        )
+        for user_id in owner_ids
+        for _ in range(tokens_per_user)
+    ], batch_size=BATCH_SIZE)
+
+    # Sessions Django et session JWT active de chaque utilisateur
+    sessions = []
+    user_sessions = []
+    for user_id in owner_ids:
+        for _ in range(sessions_per_user):
+            session = Session(session_key=_random_key(rng, 40), session_data='',
+                              expire_date=now + timedelta(days=1))
+            sessions.append(session)
+            user_sessions.append(UserSession(user_id=user_id, session=session,
+                                             ip_address='127.0.0.1', user_agent='bench'))
+    Session.objects.bulk_create(sessions, batch_size=BATCH_SIZE)
+    UserSession.objects.bulk_create(user_sessions, batch_size=BATCH_SIZE)
+    ActiveToken.objects.bulk_create([
+        ActiveToken(user_id=user_id, sid=_random_key(rng), ip_address='127.0.0.1')
+        for user_id in owner_ids
+    ], batch_size=BATCH_SIZE)
+
+    created_categories = Category.objects.bulk_create([
+        Category(name=f'Catégorie {i:04d}', description='Catégorie générée',
+                 order=(i + 1) * ORDER_GAP)
+        for i in range(categories)
+    ], batch_size=BATCH_SIZE)
+    category_ids = [c.id for c in created_categories]
+
+    created_videos = Video.objects.bulk_create([
+        Video(
+            title=f'Vidéo {c:04d}-{v:04d}',
+            description='Vidéo générée pour le benchmark',
+            youtube_url=f'https://www.youtube.com/watch?v={_random_youtube_id(rng)}',
+            category_id=category_id,
+            order=(v + 1) * ORDER_GAP,
+            is_published=rng.random() < 0.9,
+        )
+        for c, category_id in enumerate(category_ids)
+        for v in range(videos_per_category)
+    ], batch_size=BATCH_SIZE)
+    video_ids = [v.id for v in created_videos]
+
+    # Progression de l'administrateur sur une vidéo sur trois
+    WatchProgress.objects.bulk_create([
+        WatchProgress(user=admin, video_id=video_id, position=rng.randint(0, 600),
+                      duration=600, updated_at=now)
+        for video_id in video_ids[::3]
+    ], batch_size=BATCH_SIZE)
+
+    # Cumuls de vues de la semaine et du jour courants
+    VideoViewRollup.objects.bulk_create([
+        VideoViewRollup(video_id=video_id, period=period,
+                        period_start=period_start(now, period), views=rng.randint(1, 5000))
+        for video_id in video_ids
+        for period in ('day', 'week')
+    ], batch_size=BATCH_SIZE)
+
+    # bulk_create ne déclenche pas les signaux des statistiques
+    stats.invalidate()
+
+    return Dataset(admin, login_user, user_ids, category_ids, video_ids, {
+        'users': users,
+        'tokens_per_user': tokens_per_user,
+        'sessions_per_user': sessions_per_user,
+        'categories': categories,
+        'videos_per_category': videos_per_category,
+        'seed': seed,
+    })
+
+
+class Scenario:
+    """Une requête mesurée : méthode + nom d'URL (+ paramètres et corps)."""
+
+    def __init__(self, url_name, method='get', kwargs=None, data=None, query='',
+                 auth=True, heavy=False, label=None, expected_status=None):
+        self.url_name = url_name
+        self.method = method
+        self.kwargs = kwargs or {}
+        self.data = data
+        self.query = query
+        self.auth = auth
+        # Requête coûteuse (hachage de mots de passe) : moins d'itérations
+        self.heavy = heavy
+        # Distingue plusieurs scénarios d'une même route
+        self.label = label
+        # Code HTTP attendu (None : n'importe quel succès 2xx)
+        self.expected_status = expected_status
+
+    def status_ok(self, status_code):
+        if self.expected_status is not None:
+            return status_code == self.expected_status
+        return 200 <= status_code < 300
+
+    @property
+    def name(self):
+        name = f'{self.method.upper()} {self.url_name}'
+        return f'{name} {self.label}' if self.label else name
+
+    @property
+    def path(self):
+        path = reverse(self.url_name, kwargs=self.kwargs)
+        return f'{path}?{self.query}' if self.query else path
+
+
+def build_scenarios(dataset):
+    """Scénarios couvrant chaque méthode de chaque endpoint benchmarké."""
+    video_id = dataset.video_ids[len(dataset.video_ids) // 2]
+    category_id = dataset.category_ids[len(dataset.category_ids) // 2]
+    user_id = dataset.user_ids[len(dataset.user_ids) // 2]
+
+    return [
+        # Catalogue
+        Scenario('videos_api:dashboard'),
+        Scenario('videos_api:video_list'),
+        Scenario('videos_api:video_detail', kwargs={'video_id': video_id}),
+        Scenario('videos_api:video_progress', kwargs={'video_id': video_id}),
+        Scenario('videos_api:video_progress', 'post', kwargs={'video_id': video_id},
+                 data={'position': 120, 'duration': 600}),
+        Scenario('videos_api:progress'),
+        Scenario('videos_api:category_list'),
+        Scenario('videos_api:category_detail', kwargs={'category_id': category_id}),
+
+        # Authentification
+        Scenario('accounts_api:login', 'post', auth=False, heavy=True,
+                 data={'username': dataset.login_user.username, 'password': BENCH_PASSWORD}),
+        Scenario('accounts_api:logout', 'post'),
+        Scenario('accounts_api:refresh', 'post', auth=False, data={'refresh': dataset.refresh_token}),
+        Scenario('accounts_api:me'),
+        Scenario('accounts_api:sessions'),
+        Scenario('accounts_api:events_ticket', 'post'),
+
+        # Administration
+        Scenario('admin_api:dashboard'),
+        Scenario('admin_api:analytics'),
+        Scenario('admin_api:user_list'),
+        Scenario('admin_api:user_list', 'post', heavy=True,
+                 data={'username': 'bench_new_user', 'password': BENCH_PASSWORD}),
+        Scenario('admin_api:user_bulk', 'post', heavy=True, data=[
+            {'username': f'bench_bulk_{i}', 'password': BENCH_PASSWORD} for i in range(5)
+        ]),
+        Scenario('admin_api:user_detail', kwargs={'user_id': user_id}),
+        Scenario('admin_api:user_detail', 'put', kwargs={'user_id': user_id},
+                 data={'first_name': 'Bench'}),
+        Scenario('admin_api:user_detail', 'delete', kwargs={'user_id': user_id}),
+        Scenario('admin_api:invalidate_sessions', 'post', kwargs={'user_id': user_id}),
+        Scenario('admin_api:category_list'),
+        Scenario('admin_api:category_list', 'post', data={'name': 'Catégorie bench'}),
+        Scenario('admin_api:category_reorder', 'post',
+                 data={'id': dataset.category_ids[-1], 'after': None}),
+        Scenario('admin_api:category_detail', kwargs={'category_id': category_id}),
+        Scenario('admin_api:category_detail', 'put', kwargs={'category_id': category_id},
+                 data={'description': 'Modifiée'}),
+        Scenario('admin_api:category_detail', 'delete', kwargs={'category_id': category_id}),
+        Scenario('admin_api:video_list'),
+        Scenario('admin_api:video_list', 'post', data={
+            'title': 'Vidéo bench',
+            'youtube_url': 'https://www.youtube.com/watch?v=benchbench1',
+            'category': category_id,
+        }),
+        Scenario('admin_api:video_bulk', 'post', data=[
+            {'title': f'Import {i}', 'youtube_url': f'https://www.youtube.com/watch?v=benchimp{i:03d}',
+             'category': 'Import bench'}
+            for i in range(50)
+        ]),
+        Scenario('admin_api:video_reorder', 'post', data={'id': video_id, 'after': None}),
+        Scenario('admin_api:video_detail', kwargs={'video_id': video_id}),
+        Scenario('admin_api:video_detail', 'put', kwargs={'video_id': video_id},
+                 data={'title': 'Titre modifié'}),
+        Scenario('admin_api:video_detail', 'delete', kwargs={'video_id': video_id}),
+
+        # Exports
+        Scenario('admin_api:export', kwargs={'resource': 'users', 'export_format': 'csv'},
+                 label='users.csv'),
+        Scenario('admin_api:export', kwargs={'resource': 'sessions', 'export_format': 'ndjson'},
+                 label='sessions.ndjson'),
+        Scenario('admin_api:export', kwargs={'resource': 'videos', 'export_format': 'csv'},
+                 label='videos.csv'),
+
+        # Profilage
+        Scenario('admin_api:profile_list'),
+        Scenario('admin_api:profile_token', 'post'),
+        Scenario('admin_api:profile_sampling'),
+        Scenario('admin_api:profile_sampling', 'put', data={'sample_rate': 0, 'view_name': ''}),
+        Scenario('admin_api:profile_detail', kwargs={'name': 'absent'}, label='absent',
+                 expected_status=404),
+    ]
+
+
+def uncovered_url_names(scenarios, namespaces=BENCH_NAMESPACES):
+    """Noms d'URL des espaces benchmarkés sans aucun scénario."""
+    covered = {scenario.url_name for scenario in scenarios}
+    names = set()
+    resolver = get_resolver()
+    for namespace in namespaces:
+        _, sub_resolver = resolver.namespace_dict[namespace]
+        for pattern in sub_resolver.url_patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                names.add(f'{namespace}:{pattern.name}')
+    return sorted(names - covered - UNBENCHED_URL_NAMES)
+
+
+class _QueryCounter:
+    """`execute_wrapper` comptant les requêtes SQL."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, p):
+    """Percentile (interpolation linéaire) d'une liste triée."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _request(client, scenario, headers, counter=None):
+    with transaction.atomic():
+        # Le BEGIN et le ROLLBACK du benchmark ne sont pas comptés
+        with connection.execute_wrapper(counter or _QueryCounter()):
+            extra = dict(headers) if scenario.auth else {}
+            if scenario.method != 'get':
+                extra.update(data=scenario.data or {}, content_type='application/json')
+            response = getattr(client, scenario.method)(scenario.path, **extra)
+            if response.streaming:
+                # Exports : les lignes sont lues pendant la lecture du flux
+                for _ in response.streaming_content:
+                    pass
+        transaction.set_rollback(True)
+    return response
+
+
+def run_scenario(scenario, dataset, iterations=50, warmup=5):
+    """
+    Exécute un scénario et retourne ses mesures.
+
+    Les requêtes d'échauffement ne sont pas mesurées. Le pic mémoire
+    (tracemalloc) est mesuré sur une requête supplémentaire, à part, car le
+    traçage ralentit fortement l'exécution.
+    """
+    client = Client()
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {dataset.access_token}'}
+
+    for _ in range(warmup):
+        _request(client, scenario, headers)
+
+    durations = []
+    queries = []
+    statuses = set()
+    for _ in range(iterations):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        response = _request(client, scenario, headers, counter)
+        durations.append(time.perf_counter() - start)
+        queries.append(counter.count)
+        statuses.add(response.status_code)
+
+    tracemalloc.start()
+    try:
+        _request(client, scenario, headers)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    durations.sort()
+    return {
+        'method': scenario.method.upper(),
+        'path': scenario.path,
+        'status': sorted(statuses),
+        'iterations': iterations,
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p95_ms': round(percentile(durations, 95) * 1000, 3),
+        'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(durations) * 1000, 3),
+        'queries': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
@@ -0,0 +1,165 @@
+"""
+Instrumentation par requête : nombre de requêtes SQL, temps base de données,
+temps d'authentification et de sérialisation.
+
+Le middleware (monitoring.middleware.InstrumentationMiddleware) crée un
+objet RequestMetrics par requête et le rend accessible via `current()`.
+Les autres couches y ajoutent leurs mesures :
+- les requêtes SQL via `connection.execute_wrapper` (sql_wrapper) ;
+- l'authentification JWT via `timed('auth')` ;
+- la sérialisation DRF via TimedSerializerMixin.
+
+Les durées se recouvrent : le temps d'authentification ou de sérialisation
+inclut les requêtes SQL exécutées pendant cette étape.
+"""
+
+import contextvars
+import hashlib
+import re
+import time
+from contextlib import contextmanager
+
+from rest_framework import serializers
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+# Nombre maximal de requêtes SQL lentes gardées par requête HTTP
+MAX_SLOW_QUERIES = 20
+
+
+class RequestMetrics:
+    """Mesures d'une requête HTTP."""
+
+    def __init__(self, slow_query_ms=100, request=None, request_id=None):
+        self.start = time.perf_counter()
+        self.slow_query_ms = slow_query_ms
+        # Contexte des journaux (monitoring.logs)
+        self.request = request
+        self.request_id = request_id
+        self.view_name = None
+        self.query_budget = None
+        self.query_count = 0
+        self.db_time = 0.0
+        self.timings = {}
+        self.slow_queries = []
+        self._depth = {}
+
+    def add_timing(self, name, duration):
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    def record_query(self, sql, duration):
+        self.query_count += 1
+        self.db_time += duration
+        if duration * 1000 >= self.slow_query_ms and len(self.slow_queries) < MAX_SLOW_QUERIES:
+            self.slow_queries.append({
+                'fingerprint': sql_fingerprint(sql),
+                'sql': normalize_sql(sql)[:500],
+                'duration_ms': round(duration * 1000, 2),
+            })
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+def current():
+    """Mesures de la requête en cours, ou None hors requête instrumentée."""
+    return _current.get()
+
+
+def activate(metrics):
+    """Rend `metrics` courant ; retourne le jeton à passer à `deactivate`."""
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def timed(name):
+    """
+    Mesure la durée d'un bloc et l'ajoute aux mesures de la requête en cours.
+
+    Les blocs imbriqués portant le même nom ne sont comptés qu'une fois.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+
+    depth = metrics._depth.get(name, 0)
+    metrics._depth[name] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth[name] = depth
+        if depth == 0:
+            metrics.add_timing(name, time.perf_counter() - start)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    """`execute_wrapper` comptant les requêtes et leur durée."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, time.perf_counter() - start)
+
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """
+    Forme normalisée d'une requête SQL : littéraux remplacés par `?`,
+    listes IN réduites, espaces compactés.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def sql_fingerprint(sql):
+    """Empreinte courte d'une requête normalisée (regroupement dans les logs)."""
+    return hashlib.md5(normalize_sql(sql).encode()).hexdigest()[:12]
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """ListSerializer dont la sérialisation est mesurée (`ser` dans Server-Timing)."""
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """
+    Mixin des serializers du projet : mesure le temps passé dans `.data`.
+
+    À placer avant la classe DRF de base ; s'applique aussi à `many=True`.
+    """
+
+    @property
+    def data(self):
+        with timed('serializer'):
+            return super().data
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_serializer = super().many_init(*args, **kwargs)
+        # ListSerializer par défaut : même objet, `.data` mesuré
+        if type(list_serializer) is serializers.ListSerializer:
+            list_serializer.__class__ = TimedListSerializer
+        return list_serializer
@@ -0,0 +1,305 @@
+"""
+Bus d'invalidation des caches entre workers.
+
+Chaque worker gunicorn est un processus distinct : un cache en mémoire d'un
+worker ne voit pas les modifications faites par les autres. Les données
+mises en cache sont donc associées à une version nommée (« stamp »), stockée
+dans un emplacement partagé et incrémentée à chaque modification :
+
+    from monitoring import invalidation
+    invalidation.bump_on_commit('catalogue')            # après une écriture
+    invalidation.bus.version('catalogue')                # lecture locale, sans E/S
+    invalidation.bus.watch('catalogue', local_cache.clear)
+
+Stockage (INVALIDATION_STORE) :
+- 'database' (défaut) : table InvalidationStamp, partagée par construction ;
+- 'cache' : cache Django, qui doit alors être partagé (Redis, Memcached).
+
+Chaque worker lit les versions dans un thread d'arrière-plan, jamais pendant
+une requête :
+- toutes les INVALIDATION_POLL_INTERVAL secondes ;
+- avec PostgreSQL, le thread écoute aussi le canal LISTEN/NOTIFY alimenté à
+  chaque incrément : la nouvelle version est lue dès la notification.
+
+Les callbacks de `watch()` sont exécutés par InvalidationMiddleware, au début
+de la requête suivante, dans le thread de la requête. Une modification est
+donc visible par tous les workers au plus INVALIDATION_POLL_INTERVAL secondes
+après le commit (`check_invalidation_staleness` le vérifie).
+
+Les modèles déclarent leurs versions avec `bump_on_change()` (signaux
+post_save / post_delete) ; les écritures qui contournent les signaux
+(`QuerySet.update`, `bulk_create`, `bulk_update`) appellent `bump_on_commit()`.
+"""
+
+import logging
+import os
+import select
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Canal PostgreSQL des notifications d'incrément
+NOTIFY_CHANNEL = 'eduplatform_invalidation'
+
+CACHE_PREFIX = 'invalidation'
+
+
+def _poll_interval():
+    return getattr(settings, 'INVALIDATION_POLL_INTERVAL', 1.0)
+
+
+def is_enabled():
+    return getattr(settings, 'INVALIDATION_ENABLED', True)
+
+
+class DatabaseStampStore:
+    """Versions dans la table InvalidationStamp (une requête par incrément)."""
+
+    def read(self, names):
+        from .models import InvalidationStamp
+        return dict(InvalidationStamp.objects.filter(name__in=names).values_list('name', 'version'))
+
+    def bump(self, name):
+        from .models import InvalidationStamp
+        now = timezone.now()
+        if not InvalidationStamp.objects.filter(name=name).update(version=F('version') + 1, updated_at=now):
+            try:
+                with transaction.atomic():
+                    InvalidationStamp.objects.create(name=name, version=1)
+            except IntegrityError:
+                # Créée entre-temps par un autre worker
+                InvalidationStamp.objects.filter(name=name).update(version=F('version') + 1, updated_at=now)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, name])
+
+    def supports_listen(self):
+        return connection.vendor == 'postgresql'
+
+
+class CacheStampStore:
+    """Versions dans le cache Django (aucune requête SQL ; cache partagé requis)."""
+
+    def _key(self, name):
+        return f'{CACHE_PREFIX}:{name}'
+
+    def read(self, names):
+        values = cache.get_many([self._key(name) for name in names])
+        return {name: values[self._key(name)] for name in names if self._key(name) in values}
+
+    def bump(self, name):
+        key = self._key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+
+    def supports_listen(self):
+        return False
+
+
+STORES = {
+    'database': DatabaseStampStore,
+    'cache': CacheStampStore,
+}
+
+
+class InvalidationBus:
+    """Versions connues du worker, tenues à jour par un thread d'arrière-plan."""
+
+    def __init__(self, store=None):
+        self._store = store
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._callbacks = {}
+        self._pending = set()
+        self._thread = None
+        self._pid = None
+        self._stop_event = threading.Event()
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = STORES[getattr(settings, 'INVALIDATION_STORE', 'database')]()
+        return self._store
+
+    def watch(self, name, callback=None):
+        """Suit la version `name` ; `callback()` est appelé après chaque changement."""
+        with self._lock:
+            self._versions.setdefault(name, None)
+            if callback is not None:
+                self._callbacks.setdefault(name, []).append(callback)
+
+    def version(self, name):
+        """Dernière version lue (0 si jamais incrémentée) ; aucune E/S."""
+        self._ensure_started()
+        with self._lock:
+            # Nom encore inconnu du thread : 0 jusqu'au prochain passage (le
+            # changement de version qui suivra invalide ce qui a été mis en cache)
+            return self._versions.setdefault(name, None) or 0
+
+    def ensure_loaded(self, name):
+        """
+        Lit immédiatement la version `name` si elle ne l'a jamais été.
+
+        Une lecture du stockage par nom et par processus ; ensuite `version()`
+        suffit. Pour les caches partagés : la version 0 d'un nom encore non lu
+        désignerait des entrées peut-être écrites avant le dernier incrément.
+        """
+        if self._versions.get(name) is None:
+            self.watch(name)
+            self.refresh()
+
+    def bump(self, name):
+        """
+        Incrémente la version `name` dans le stockage partagé (immédiatement).
+
+        Les callbacks du worker courant sont exécutés dès sa prochaine requête,
+        sans attendre la relecture des versions.
+        """
+        self.store.bump(name)
+        with self._lock:
+            if name in self._callbacks:
+                self._pending.add(name)
+
+    def refresh(self):
+        """Relit les versions suivies ; retourne les noms modifiés."""
+        with self._lock:
+            names = list(self._versions)
+        if not names:
+            return set()
+        current = self.store.read(names)
+        changed = set()
+        with self._lock:
+            for name in names:
+                version = current.get(name, 0)
+                previous = self._versions.get(name)
+                if previous != version:
+                    self._versions[name] = version
+                    # La première lecture n'est pas un changement
+                    if previous is not None:
+                        changed.add(name)
+            self._pending |= changed
+        return changed
+
+    def apply_pending(self):
+        """Exécute les callbacks des versions modifiées depuis le dernier appel."""
+        self._ensure_started()
+        if not self._pending:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            callbacks = [callback for name in pending for callback in self._callbacks.get(name, ())]
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("Échec d'un callback d'invalidation: %s", e)
+
+    # -- Thread d'arrière-plan ------------------------------------------------
+
+    def _ensure_started(self):
+        # Un thread par processus : démarré au premier usage (après le fork)
+        if self._pid == os.getpid() or not is_enabled():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='invalidation-bus', daemon=True)
+            self._thread.start()
+
+    def _reset_after_fork(self):
+        # Le verrou a pu être copié verrouillé par un thread du parent
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._pending = set()
+
+    def stop(self):
+        """Arrête le thread (tests, fin de processus)."""
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self._pid = None
+
+    def _run(self):
+        stop_event = self._stop_event
+        listening = False
+        while not stop_event.is_set():
+            try:
+                if not listening and self.store.supports_listen():
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                    listening = True
+                self.refresh()
+                if listening:
+                    self._wait_for_notify(_poll_interval())
+                else:
+                    stop_event.wait(_poll_interval())
+            except Exception as e:
+                logger.warning("Lecture des versions de cache impossible: %s", e)
+                listening = False
+                connection.close()
+                stop_event.wait(_poll_interval())
+        connection.close()
+
+    def _wait_for_notify(self, timeout):
+        raw = connection.connection
+        if select.select([raw], [], [], timeout)[0]:
+            raw.poll()
+            raw.notifies.clear()
+
+
+bus = InvalidationBus()
+os.register_at_fork(after_in_child=bus._reset_after_fork)
+
+
+def bump_on_commit(*names):
+    """Incrémente les versions après le commit de la transaction en cours."""
+    for name in names:
+        transaction.on_commit(lambda name=name: bus.bump(name))
+
+
+def bump_on_change(name, *models, ignore_fields=()):
+    """
+    Incrémente la version `name` à chaque enregistrement ou suppression
+    d'une instance de `models` (après le commit).
+
+    Les enregistrements limités à `ignore_fields` (ex. last_login) sont ignorés.
+    """
+    ignored = set(ignore_fields)
+
+    def saved(sender, update_fields=None, **kwargs):
+        if ignored and update_fields and set(update_fields) <= ignored:
+            return
+        bump_on_commit(name)
+
+    def deleted(sender, **kwargs):
+        bump_on_commit(name)
+
+    for model in models:
+        uid = f'invalidation:{name}:{model._meta.label}'
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+class InvalidationMiddleware:
+    """Applique les invalidations reçues par le worker avant chaque requête."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        bus.apply_pending()
+        return self.get_response(request)
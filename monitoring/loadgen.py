@@ -0,0 +1,256 @@
+"""
+Générateur de charge « début de cours » (bibliothèque standard uniquement).
+
+Chaque étudiant virtuel est un thread qui, contre un serveur déjà lancé :
+1. se connecte (POST /api/auth/login/) au moment prévu par la rampe ;
+2. charge le dashboard (GET /api/dashboard/) ;
+3. navigue : liste des vidéos, détail, heartbeats de progression, profil,
+   avec un temps de réflexion entre deux requêtes.
+
+Une partie des étudiants se reconnecte depuis un « second appareil » en cours
+de navigation : le premier appareil doit alors recevoir un 401
+`token_not_active` (session unique), compté à part des erreurs.
+
+Tous les étudiants partagent l'IP du générateur : sans limitation de débit
+désactivée (THROTTLE_ENABLED=False) ou relevée (THROTTLE_LOGIN_IP) sur le
+serveur testé, la plupart des logins reçoivent un 429. Les 429 sont comptés à
+part (`throttled`), ni comme erreurs ni dans les latences.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from .benchmark import percentile
+
+
+class LoadStats:
+    """Mesures partagées par tous les threads, par endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+        self.token_not_active = Counter()
+        self.throttled = Counter()
+
+    def record(self, endpoint, status, elapsed, token_not_active=False):
+        with self._lock:
+            self.statuses[endpoint][status] += 1
+            if status == 429:
+                # Refusée par la limitation de débit : ni erreur ni latence mesurée
+                self.throttled[endpoint] += 1
+                return
+            self.latencies[endpoint].append(elapsed)
+            if token_not_active:
+                self.token_not_active[endpoint] += 1
+            elif status is None or status >= 400:
+                self.errors[endpoint] += 1
+
+    def report(self, duration):
+        """Débit, taux d'erreur et percentiles de latence par endpoint."""
+        endpoints = {}
+        total = 0
+        total_errors = 0
+        with self._lock:
+            for endpoint in sorted(self.statuses):
+                values = sorted(self.latencies[endpoint])
+                total += len(values)
+                total_errors += self.errors[endpoint]
+                endpoints[endpoint] = {
+                    'requests': len(values),
+                    'throughput_rps': round(len(values) / duration, 2),
+                    'error_rate': round(self.errors[endpoint] / len(values), 4) if values else 0,
+                    'token_not_active': self.token_not_active[endpoint],
+                    'throttled': self.throttled[endpoint],
+                    'status': {str(k): v for k, v in self.statuses[endpoint].items()},
+                    'p50_ms': round(percentile(values, 50) * 1000, 1) if values else None,
+                    'p95_ms': round(percentile(values, 95) * 1000, 1) if values else None,
+                    'p99_ms': round(percentile(values, 99) * 1000, 1) if values else None,
+                }
+            token_not_active = sum(self.token_not_active.values())
+            throttled = sum(self.throttled.values())
+        return {
+            'duration_s': round(duration, 1),
+            'requests': total,
+            'throughput_rps': round(total / duration, 2) if duration else 0,
+            'error_rate': round(total_errors / total, 4) if total else 0,
+            'token_not_active': token_not_active,
+            'throttled': throttled,
+            'endpoints': endpoints,
+        }
+
+
+class Device:
+    """Un appareil (connexion HTTP persistante + token d'accès) d'un étudiant."""
+
+    def __init__(self, base_url, stats, timeout=30):
+        parts = urlsplit(base_url)
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        )
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=timeout)
+        self.prefix = parts.path.rstrip('/')
+        self.stats = stats
+        self.connection = self._connect()
+        self.access = None
+        self.kicked = False
+
+    def request(self, endpoint, method, path, body=None):
+        """Envoie une requête, l'enregistre dans les mesures et retourne (status, json)."""
+        headers = {'Accept': 'application/json'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.access:
+            headers['Authorization'] = f'Bearer {self.access}'
+
+        start = time.perf_counter()
+        try:
+            self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            raw = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Connexion fermée par le serveur : nouvelle connexion pour la suite
+            self.connection.close()
+            self.connection = self._connect()
+            self.stats.record(endpoint, None, time.perf_counter() - start)
+            return None, None
+        elapsed = time.perf_counter() - start
+
+        try:
+            data = json.loads(raw) if raw else None
+        except ValueError:
+            data = None
+        kicked = status == 401 and isinstance(data, dict) and data.get('code') == 'token_not_active'
+        self.kicked = self.kicked or kicked
+        self.stats.record(endpoint, status, elapsed, token_not_active=kicked)
+        return status, data
+
+    def login(self, username, password):
+        status, data = self.request('login', 'POST', '/api/auth/login/',
+                                    {'username': username, 'password': password})
+        if status == 200:
+            self.access = data['access']
+        return status == 200
+
+    def close(self):
+        self.connection.close()
+
+
+class Student(threading.Thread):
+    """Étudiant virtuel : login, dashboard puis navigation."""
+
+    def __init__(self, config, stats, username, start_delay, second_device, seed):
+        super().__init__(name=f'student-{username}', daemon=True)
+        self.config = config
+        self.stats = stats
+        self.username = username
+        self.start_delay = start_delay
+        self.second_device = second_device
+        self.rng = random.Random(seed)
+        self.devices = []
+
+    def new_device(self):
+        device = Device(self.config['base_url'], self.stats)
+        self.devices.append(device)
+        return device
+
+    def think(self):
+        think_time = self.config['think_time']
+        if think_time > 0:
+            time.sleep(self.rng.uniform(0.5, 1.5) * think_time)
+
+    def run(self):
+        time.sleep(self.start_delay)
+        try:
+            self.browse()
+        finally:
+            for device in self.devices:
+                device.close()
+
+    def browse(self):
+        device = self.new_device()
+        if not device.login(self.username, self.config['password']):
+            return
+
+        status, dashboard = device.request('dashboard', 'GET', '/api/dashboard/')
+        video_ids = []
+        if status == 200:
+            for category in dashboard['categories']:
+                video_ids.extend(v['id'] for v in category['videos'])
+            video_ids.extend(v['id'] for v in dashboard['uncategorized_videos'])
+
+        # Moment (en nombre de requêtes) de la connexion depuis le second appareil
+        switch_at = None
+        if self.second_device and self.config['requests'] > 0:
+            switch_at = self.rng.randrange(self.config['requests'])
+        position = 0
+        for i in range(self.config['requests']):
+            self.think()
+            if i == switch_at:
+                device = self.switch_device(device)
+            if device.kicked:
+                return
+            action = self.rng.random()
+            if not video_ids or action < 0.2:
+                device.request('videos', 'GET', '/api/videos/')
+            elif action < 0.4:
+                device.request('video_detail', 'GET', f'/api/videos/{self.rng.choice(video_ids)}/')
+            elif action < 0.9:
+                position += 15
+                device.request('progress', 'POST', f'/api/videos/{video_ids[0]}/progress/',
+                               {'position': position, 'duration': 600})
+            else:
+                device.request('me', 'GET', '/api/auth/me/')
+
+    def switch_device(self, first_device):
+        """Connexion depuis un second appareil, qui poursuit la navigation."""
+        second = self.new_device()
+        if not second.login(self.username, self.config['password']):
+            return first_device
+        second.request('dashboard', 'GET', '/api/dashboard/')
+        # L'ancien appareil doit être rejeté (token_not_active)
+        first_device.request('me', 'GET', '/api/auth/me/')
+        return second
+
+
+def run_load(base_url, usernames, password, ramp=60.0, think_time=1.0, requests=20,
+             second_device_ratio=0.1, seed=42):
+    """
+    Lance un étudiant virtuel par compte et attend la fin.
+
+    Les départs sont répartis uniformément sur `ramp` secondes. Retourne le
+    rapport de LoadStats.
+    """
+    rng = random.Random(seed)
+    stats = LoadStats()
+    config = {
+        'base_url': base_url,
+        'password': password,
+        'think_time': think_time,
+        'requests': requests,
+    }
+    students = [
+        Student(
+            config, stats, username,
+            start_delay=ramp * i / max(len(usernames), 1),
+            second_device=rng.random() < second_device_ratio,
+            seed=rng.random(),
+        )
+        for i, username in enumerate(usernames)
+    ]
+
+    start = time.perf_counter()
+    for student in students:
+        student.start()
+    for student in students:
+        student.join()
+    return stats.report(time.perf_counter() - start)
@@ -0,0 +1,203 @@
+"""
+Journalisation non bloquante et structurée.
+
+Les handlers du projet (settings.LOGGING) sont des QueueStreamHandler : le
+thread qui journalise se contente de déposer l'enregistrement dans une file
+bornée ; un thread par processus (QueueListener) le met en forme et l'écrit
+sur la sortie d'erreur. Une sortie lente (pipe plein, collecteur saturé) ne
+ralentit plus les requêtes.
+
+Au moment de l'appel, l'enregistrement reçoit le contexte de la requête en
+cours (monitoring.instrumentation) : request_id, user_id, vue et durée
+écoulée. JSONFormatter écrit une ligne JSON par enregistrement avec ces
+champs et ceux passés par `extra=`.
+
+File pleine : l'enregistrement est abandonné et compté
+(eduplatform_log_records_dropped_total) plutôt que de bloquer la requête.
+
+Les appels utilisent le formatage différé de logging
+(`logger.info("Connexion de %s", username)`) : un message sous le niveau
+configuré n'est jamais mis en forme.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import weakref
+from datetime import datetime, timezone
+
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import metrics
+
+# Attributs standard d'un LogRecord (les autres viennent de `extra=`)
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'user_id', 'view', 'duration_ms',
+}
+
+_handlers = weakref.WeakSet()
+
+
+def _request_context():
+    """(request_id, user_id, vue, durée en ms) de la requête en cours."""
+    from .instrumentation import current
+    request_metrics = current()
+    if request_metrics is None:
+        return None, None, None, None
+
+    user = None
+    request = request_metrics.request
+    if request is not None:
+        # Sans forcer l'authentification : utilisateur déjà résolu uniquement
+        user = request.__dict__.get('user')
+        if isinstance(user, SimpleLazyObject):
+            user = None if user._wrapped is empty else user._wrapped
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    return (
+        request_metrics.request_id,
+        user_id,
+        request_metrics.view_name,
+        round(request_metrics.elapsed * 1000, 2),
+    )
+
+
+class JSONFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key in ('request_id', 'user_id', 'view', 'duration_ms'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueListener(logging.handlers.QueueListener):
+
+    def enqueue_sentinel(self):
+        # File pleine à l'arrêt : attendre plutôt que perdre la fin du journal
+        self.queue.put(self._sentinel)
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """
+    Handler non bloquant : mise en forme et écriture dans un thread dédié.
+
+    Le formatter configuré (`formatter` dans LOGGING) est celui du handler
+    d'écriture. Le thread est démarré au premier enregistrement de chaque
+    processus (après le fork des workers gunicorn) et vidé à la sortie.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        self.queue_size = queue_size
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self._listener = None
+        self._pid = None
+        self._stopped = False
+        self._start_lock = threading.Lock()
+        _handlers.add(self)
+
+    def setFormatter(self, fmt):
+        # Mise en forme faite par le thread d'écriture, pas par l'appelant
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Copie de l'enregistrement, autonome pour le thread d'écriture.
+
+        Le message est calculé ici (les arguments peuvent changer ensuite)
+        et le contexte de la requête ajouté ; la mise en forme reste différée.
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # La trace référence les frames du thread appelant
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id, record.user_id, record.view, record.duration_ms = _request_context()
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            if self._stopped:
+                # Après l'arrêt (fin du processus) : écriture directe
+                self.target.handle(record)
+                return
+            self._start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.record_log_dropped()
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self._listener = _QueueListener(self.queue, self.target)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def flush(self):
+        """Attend l'écriture des enregistrements en file."""
+        if self._pid == os.getpid():
+            self.queue.join()
+        self.target.flush()
+
+    def stop(self):
+        """Vide la file et arrête le thread d'écriture du processus."""
+        with self._start_lock:
+            listener, self._listener = self._listener, None
+            running = self._pid == os.getpid()
+            self._pid = None
+            self._stopped = True
+        if listener is not None and running:
+            listener.stop()
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
+
+    def _reset_after_fork(self):
+        # File et verrou copiés du parent, peut-être pris par son thread d'écriture
+        self.queue = queue.Queue(self.queue_size)
+        self._start_lock = threading.Lock()
+        self._listener = None
+        self._pid = None
+        self._stopped = False
+
+
+def _reset_handlers_after_fork():
+    for handler in list(_handlers):
+        handler._reset_after_fork()
+
+
+def _stop_handlers():
+    for handler in list(_handlers):
+        handler.stop()
+
+
+os.register_at_fork(after_in_child=_reset_handlers_after_fork)
+atexit.register(_stop_handlers)
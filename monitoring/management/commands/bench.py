@@ -0,0 +1,123 @@
+"""
+Benchmark reproductible des endpoints API.
+
+Crée une base de test temporaire, y génère un jeu de données synthétique
+(voir monitoring.benchmark), exécute chaque endpoint de videos/api_urls.py,
+accounts/api_urls.py et accounts/admin_api_urls.py via le client de test et
+produit un rapport JSON (p50/p95/p99, requêtes SQL par requête, pic mémoire)
+à comparer d'un commit à l'autre. La base configurée n'est pas modifiée.
+
+Usage:
+    python manage.py bench --output bench.json
+    python manage.py bench --users 10000 --tokens-per-user 20 --only admin_api:
+"""
+
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from monitoring.benchmark import (
+    benchmark_database, build_scenarios, run_scenario, seed_dataset, uncovered_url_names,
+)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Mesure latence, requêtes SQL et mémoire de chaque endpoint API sur des données synthétiques."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tokens-per-user', type=int, default=5,
+                            help='Tokens JWT émis (OutstandingToken) par utilisateur')
+        parser.add_argument('--sessions-per-user', type=int, default=1)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--videos-per-category', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--heavy-iterations', type=int, default=5,
+                            help='Itérations des requêtes hachant des mots de passe (login, création)')
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', action='append', default=[],
+                            help='Ne garder que les scénarios dont le nom contient ce texte (répétable)')
+        parser.add_argument('--output', help='Fichier JSON (défaut : sortie standard)')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            report = self.run_benchmark(options)
+
+        content = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(content + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}"))
+        else:
+            self.stdout.write(content)
+
+    def run_benchmark(self, options):
+        start = time.perf_counter()
+        dataset = seed_dataset(
+            users=options['users'],
+            tokens_per_user=options['tokens_per_user'],
+            sessions_per_user=options['sessions_per_user'],
+            categories=options['categories'],
+            videos_per_category=options['videos_per_category'],
+            seed=options['seed'],
+        )
+        self.stderr.write(f"Jeu de données créé en {time.perf_counter() - start:.1f} s")
+
+        scenarios = build_scenarios(dataset)
+        uncovered = uncovered_url_names(scenarios)
+        for url_name in uncovered:
+            self.stderr.write(self.style.WARNING(f"Endpoint sans scénario : {url_name}"))
+
+        if options['only']:
+            scenarios = [s for s in scenarios if any(text in s.name for text in options['only'])]
+
+        results = {}
+        for scenario in scenarios:
+            iterations = options['heavy_iterations'] if scenario.heavy else options['iterations']
+            result = run_scenario(scenario, dataset, iterations=iterations,
+                                  warmup=min(options['warmup'], iterations))
+            results[scenario.name] = result
+            self.stderr.write(
+                f"{scenario.name:<45} p50={result['p50_ms']:>9.2f} ms  "
+                f"p99={result['p99_ms']:>9.2f} ms  requêtes={result['queries']:>6.1f}  "
+                f"status={result['status']}"
+            )
+
+        return {
+            'meta': {
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'dataset': dataset.params,
+                'iterations': options['iterations'],
+                'heavy_iterations': options['heavy_iterations'],
+                'warmup': options['warmup'],
+                # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+                'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // (
+                    1024 if sys.platform == 'darwin' else 1
+                ),
+                'duration_s': round(time.perf_counter() - start, 1),
+            },
+            'uncovered': uncovered,
+            'results': results,
+        }
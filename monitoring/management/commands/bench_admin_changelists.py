@@ -0,0 +1,95 @@
+"""
+Requêtes SQL et latence des listes de l'admin Django sur un grand volume.
+
+Crée une base de test temporaire avec `--users` comptes synthétiques (une
+session chacun, voir monitoring.benchmark), se connecte à l'admin avec le
+superutilisateur du jeu de données et mesure les pages listes des
+utilisateurs et des sessions (première page, page lointaine, recherche,
+filtre par utilisateur) ainsi que la recherche du filtre autocomplete.
+Échoue si une page dépasse `--max-queries` requêtes SQL. La base configurée
+n'est pas modifiée.
+
+Usage:
+    python manage.py bench_admin_changelists --users 50000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import UserSession
+from monitoring.benchmark import benchmark_database, percentile, seed_dataset
+
+
+def _pages(dataset):
+    user_id = dataset.user_ids[len(dataset.user_ids) // 2]
+    username = f'bench_user_{len(dataset.user_ids) // 2:06d}'
+    return [
+        ('utilisateurs', '/admin/auth/user/'),
+        ('utilisateurs p.200', '/admin/auth/user/?p=200'),
+        ('utilisateurs tri sessions', '/admin/auth/user/?o=-7'),
+        ('utilisateurs recherche', f'/admin/auth/user/?q={username}'),
+        ('sessions', '/admin/accounts/usersession/'),
+        ('sessions p.200', '/admin/accounts/usersession/?p=200'),
+        ('sessions par utilisateur', f'/admin/accounts/usersession/?user__id__exact={user_id}'),
+        ('autocomplete utilisateur', '/admin/autocomplete/?app_label=accounts&model_name=usersession'
+                                     '&field_name=user&term=bench_user_0001'),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Mesure requêtes SQL et latence des listes admin utilisateurs/sessions sur un grand volume."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--max-queries', type=int, default=10,
+                            help='Nombre maximal de requêtes SQL par page')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            start = time.perf_counter()
+            dataset = seed_dataset(users=options['users'], tokens_per_user=0, sessions_per_user=1,
+                                   categories=1, videos_per_category=1)
+            self.stderr.write(f"Jeu de données créé en {time.perf_counter() - start:.1f} s")
+
+            client = Client()
+            client.force_login(dataset.admin)
+            # Session admin rattachée à l'utilisateur (sinon SingleSessionMiddleware déconnecte)
+            UserSession.objects.create(user=dataset.admin, session_id=client.session.session_key)
+
+            failures = []
+            for name, path in _pages(dataset):
+                result = self.measure(client, path, options['iterations'])
+                self.stdout.write(
+                    f"{name:<26} requêtes={result['queries']:>3}  p50={result['p50_ms']:>8.1f} ms  "
+                    f"max={result['max_ms']:>8.1f} ms  {result['size_kb']:>6.1f} Ko"
+                )
+                if result['queries'] > options['max_queries']:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(
+                f"Plus de {options['max_queries']} requêtes SQL : {', '.join(failures)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Listes admin dans le budget de requêtes"))
+
+    def measure(self, client, path, iterations):
+        durations = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = client.get(path)
+                durations.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise CommandError(f"{path} : statut {response.status_code}")
+        durations.sort()
+        return {
+            'queries': len(queries),
+            'p50_ms': percentile(durations, 50) * 1000,
+            'max_ms': durations[-1] * 1000,
+            'size_kb': len(response.content) / 1024,
+        }
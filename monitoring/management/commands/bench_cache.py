@@ -0,0 +1,132 @@
+"""
+Cache à deux niveaux (eduplatform/caching.py) : gain par endpoint, coût
+d'un accès par niveau et protection contre les recalculs simultanés.
+
+1. Endpoints servis depuis le cache (dashboard, catégories, `me` pour le
+   compte de l'utilisateur authentifié), sur une base de test temporaire :
+   latence et requêtes SQL sans cache (INVALIDATION_ENABLED=False, les
+   espaces versionnés ne sont pas mis en cache) puis avec cache.
+2. Coût de `get_or_set` : succès L1, succès L2 (L1 vidé), calcul.
+3. `--threads` threads demandent la même clé absente, calcul de
+   `--compute-ms` ms : un seul calcul attendu (échec sinon).
+
+Usage:
+    python manage.py bench_cache --iterations 200 --threads 32
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from eduplatform import caching
+from monitoring.benchmark import (
+    benchmark_database, build_scenarios, percentile, run_scenario, seed_dataset,
+)
+
+SCENARIOS = (
+    'GET videos_api:dashboard',
+    'GET videos_api:category_list',
+    'GET accounts_api:me',
+)
+
+
+class Command(BaseCommand):
+    help = "Mesure le cache à deux niveaux (endpoints, coût par niveau, recalculs simultanés)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--videos-per-category', type=int, default=20)
+        parser.add_argument('--threads', type=int, default=32,
+                            help='Threads demandant simultanément la même clé absente')
+        parser.add_argument('--compute-ms', type=float, default=50.0,
+                            help='Durée du calcul de la clé disputée')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            dataset = seed_dataset(users=20, categories=options['categories'],
+                                   videos_per_category=options['videos_per_category'])
+            scenarios = [s for s in build_scenarios(dataset) if s.name in SCENARIOS]
+
+            with override_settings(INVALIDATION_ENABLED=False):
+                uncached = self.run(scenarios, dataset, options)
+            caching.clear_all()
+            cached = self.run(scenarios, dataset, options)
+
+            self.stdout.write(f"{'scénario':<30} {'sans p50':>10} {'avec p50':>10} {'SQL sans':>9} {'SQL avec':>9}")
+            for scenario in scenarios:
+                before, after = uncached[scenario.name], cached[scenario.name]
+                self.stdout.write(
+                    f"{scenario.name:<30} {before['p50_ms']:>7.2f} ms {after['p50_ms']:>7.2f} ms "
+                    f"{before['queries_max']:>9} {after['queries_max']:>9}"
+                )
+
+            self.stdout.write('')
+            self.measure_tiers(options['iterations'] * 50)
+            self.measure_stampede(options['threads'], options['compute_ms'] / 1000)
+
+    def run(self, scenarios, dataset, options):
+        return {
+            scenario.name: run_scenario(scenario, dataset, iterations=options['iterations'],
+                                        warmup=options['warmup'])
+            for scenario in scenarios
+        }
+
+    def measure_tiers(self, iterations):
+        namespace = caching.TwoTierCache('bench_cache', {'tier': (int,)}, beta=0)
+        value = {'id': 1, 'videos': [{'id': i, 'title': f'Vidéo {i}'} for i in range(20)]}
+
+        def timed(prepare, key):
+            durations = []
+            for i in range(iterations):
+                prepare(key(i))
+                start = time.perf_counter()
+                namespace.get_or_set('tier', key(i), compute=lambda: value)
+                durations.append(time.perf_counter() - start)
+            durations.sort()
+            return durations
+
+        results = {
+            'succès L1': timed(lambda key: None, lambda i: 0),
+            'succès L2': timed(lambda key: caching.clear_local(), lambda i: 0),
+            'calcul': timed(lambda key: None, lambda i: i + 1),
+        }
+        for name, durations in results.items():
+            self.stdout.write(
+                f"get_or_set {name:<12} p50={percentile(durations, 50) * 1e6:>8.1f} µs  "
+                f"p99={percentile(durations, 99) * 1e6:>8.1f} µs"
+            )
+
+    def measure_stampede(self, threads, compute_seconds):
+        namespace = caching.TwoTierCache('bench_cache', {'stampede': ()})
+        calls = []
+        results = []
+        barrier = threading.Barrier(threads)
+
+        def compute():
+            calls.append(1)
+            time.sleep(compute_seconds)
+            return 'valeur'
+
+        def worker():
+            barrier.wait()
+            results.append(namespace.get_or_set('stampede', compute=compute))
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        stats = namespace.stats()
+        self.stdout.write(
+            f"{threads} threads sur une clé absente : {len(calls)} calcul(s), "
+            f"{stats['coalesced']} en attente du calcul, {elapsed * 1000:.0f} ms"
+        )
+        if len(calls) != 1 or set(results) != {'valeur'}:
+            raise CommandError(f"Recalculs simultanés : {len(calls)} calculs pour une même clé")
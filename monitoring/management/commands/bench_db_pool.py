@@ -0,0 +1,192 @@
+"""
+Connexions persistantes ou pool de connexions sous un worker multi-threads.
+
+Simule un worker gthread contre la base PostgreSQL configurée : `--threads`
+threads traitent chacun `--requests` requêtes (requêtes du catalogue puis
+`--work-ms` de travail hors base), en fermant les connexions comme Django en
+fin de requête (close_old_connections). Deux configurations sont comparées :
+- persistent : backend PostgreSQL, CONN_MAX_AGE=600 (une connexion par thread) ;
+- pooled : eduplatform.db.postgresql_pool, CONN_MAX_AGE=0 (connexions rendues
+  au pool, au plus `--pool-max-size`).
+
+Le nombre de connexions ouvertes côté serveur est échantillonné dans
+pg_stat_activity pendant la mesure.
+
+Usage:
+    DATABASE_URL=postgres://localhost/eduplatform python manage.py bench_db_pool
+    python manage.py bench_db_pool --threads 32 --pool-max-size 8 --output pool.json
+"""
+
+import copy
+import json
+import threading
+import time
+
+import psycopg2
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from monitoring.benchmark import percentile
+from videos.models import Category, Video
+
+ENGINES = {
+    'persistent': 'django.db.backends.postgresql',
+    'pooled': 'eduplatform.db.postgresql_pool',
+}
+
+
+def _register_alias(mode, options):
+    """Ajoute un alias de base `bench_<mode>` copié de 'default'."""
+    alias = f'bench_{mode}'
+    settings_dict = copy.deepcopy(connections.settings['default'])
+    database_options = {
+        key: value for key, value in settings_dict['OPTIONS'].items()
+        if key != 'pool' and not key.startswith('pool_')
+    }
+    # Distingue les connexions de chaque configuration dans pg_stat_activity
+    database_options['application_name'] = alias
+    settings_dict['ENGINE'] = ENGINES[mode]
+    if mode == 'pooled':
+        database_options.update({
+            'pool': True,
+            'pool_min_size': options['pool_min_size'],
+            'pool_max_size': options['pool_max_size'],
+            'pool_timeout': options['pool_timeout'],
+        })
+        settings_dict['CONN_MAX_AGE'] = 0
+        settings_dict['CONN_HEALTH_CHECKS'] = False
+    else:
+        settings_dict['CONN_MAX_AGE'] = 600
+        settings_dict['CONN_HEALTH_CHECKS'] = True
+    settings_dict['OPTIONS'] = database_options
+    connections.settings[alias] = settings_dict
+    return alias
+
+
+class ConnectionSampler(threading.Thread):
+    """Relève périodiquement le nombre de connexions serveur d'un alias."""
+
+    def __init__(self, application_name, interval=0.02):
+        super().__init__(daemon=True)
+        self.application_name = application_name
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self.connection = psycopg2.connect(**connections['default'].get_connection_params())
+        self.connection.autocommit = True
+
+    def run(self):
+        with self.connection.cursor() as cursor:
+            while not self._stop_event.is_set():
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND application_name = %s",
+                    [self.application_name],
+                )
+                self.samples.append(cursor.fetchone()[0])
+                time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.connection.close()
+
+
+def _simulate_requests(alias, requests, work_ms, latencies, errors, lock):
+    connection = connections[alias]
+    local_latencies = []
+    local_errors = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            list(Category.objects.using(alias).with_published_video_count())
+            list(Video.objects.using(alias).filter(is_published=True).select_related('category')[:50])
+            time.sleep(work_ms / 1000)
+        except Exception:
+            local_errors += 1
+        finally:
+            # Équivalent du signal request_finished (close_old_connections)
+            connection.close_if_unusable_or_obsolete()
+        local_latencies.append(time.perf_counter() - start)
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+class Command(BaseCommand):
+    help = "Compare connexions persistantes et pool de connexions sous un worker multi-threads (PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=200, help='Requêtes par thread')
+        parser.add_argument('--work-ms', type=float, default=5.0,
+                            help='Travail hors base (ms) par requête')
+        parser.add_argument('--pool-min-size', type=int, default=2)
+        parser.add_argument('--pool-max-size', type=int, default=4)
+        parser.add_argument('--pool-timeout', type=float, default=10.0)
+        parser.add_argument('--output', help='Fichier JSON du rapport')
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError("Ce benchmark nécessite PostgreSQL : définir DATABASE_URL.")
+
+        report = {}
+        for mode in ENGINES:
+            result = self.run_mode(mode, options)
+            report[mode] = result
+            self.stdout.write(
+                f"{mode:<11} {result['throughput_rps']:>8.1f} req/s  "
+                f"p50={result['p50_ms']:>7.2f} ms  p95={result['p95_ms']:>7.2f} ms  "
+                f"p99={result['p99_ms']:>7.2f} ms  connexions max={result['peak_connections']:>3}  "
+                f"erreurs={result['errors']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                parameters = {
+                    key: options[key] for key in
+                    ('threads', 'requests', 'work_ms', 'pool_min_size', 'pool_max_size', 'pool_timeout')
+                }
+                json.dump({'parameters': parameters, 'results': report}, f, indent=2)
+            self.stderr.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}"))
+
+    def run_mode(self, mode, options):
+        alias = _register_alias(mode, options)
+        sampler = ConnectionSampler(alias)
+        latencies, errors = [], []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=_simulate_requests,
+                args=(alias, options['requests'], options['work_ms'], latencies, errors, lock),
+            )
+            for _ in range(options['threads'])
+        ]
+
+        sampler.start()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+        sampler.stop()
+
+        result = {}
+        if mode == 'pooled':
+            from eduplatform.db.postgresql_pool.base import get_pool
+            pool = get_pool(alias)
+            result['pool'] = pool.stats() if pool else None
+
+        latencies.sort()
+        result.update({
+            'requests': len(latencies),
+            'errors': sum(errors),
+            'throughput_rps': round(len(latencies) / duration, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'peak_connections': max(sampler.samples, default=0),
+        })
+        return result
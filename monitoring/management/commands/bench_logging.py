@@ -0,0 +1,130 @@
+"""
+Latence des requêtes avec journalisation synchrone ou non bloquante.
+
+Exécute des endpoints qui journalisent (écritures admin, logout, export) sur
+une base de test temporaire, avec deux configurations des loggers du projet :
+- `sync` : logging.StreamHandler, écriture dans le thread de la requête ;
+- `queue` : monitoring.logs.QueueStreamHandler (configuration du projet).
+
+La sortie simule un collecteur lent : chaque écriture bloque
+`--sink-latency-ms` millisecondes. `--background-threads` threads
+journalisent en continu pendant la mesure (charge des autres requêtes du
+worker). Les deux configurations utilisent JSONFormatter.
+
+Usage:
+    python manage.py bench_logging --iterations 100 --sink-latency-ms 1
+"""
+
+import io
+import logging
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from monitoring.benchmark import benchmark_database, build_scenarios, run_scenario, seed_dataset
+from monitoring.logs import JSONFormatter, QueueStreamHandler
+
+# Scénarios dont la vue journalise au niveau INFO
+SCENARIOS = (
+    'PUT admin_api:user_detail',
+    'POST admin_api:invalidate_sessions',
+    'POST accounts_api:logout',
+    'GET admin_api:export users.csv',
+)
+PROJECT_LOGGERS = ('accounts', 'monitoring', 'videos')
+
+
+class SlowStream(io.TextIOBase):
+    """Flux dont chaque écriture bloque `latency` secondes (sans tenir le GIL)."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        self.lines += 1
+        return len(text)
+
+
+class Command(BaseCommand):
+    help = "Compare la latence des requêtes avec journalisation synchrone et non bloquante."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--sink-latency-ms', type=float, default=1.0,
+                            help="Durée d'une écriture dans la sortie des journaux")
+        parser.add_argument('--background-threads', type=int, default=2,
+                            help='Threads journalisant en continu pendant la mesure')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            dataset = seed_dataset(users=20, categories=3, videos_per_category=5)
+            scenarios = [s for s in build_scenarios(dataset) if s.name in SCENARIOS]
+
+            results = {}
+            for mode in ('sync', 'queue'):
+                results[mode] = self.measure(mode, scenarios, dataset, options)
+
+        self.stdout.write(f"{'scénario':<38} {'sync p50':>10} {'queue p50':>10} {'sync p99':>10} {'queue p99':>10}")
+        for scenario in scenarios:
+            sync, queued = results['sync'][scenario.name], results['queue'][scenario.name]
+            self.stdout.write(
+                f"{scenario.name:<38} {sync['p50_ms']:>7.2f} ms {queued['p50_ms']:>7.2f} ms "
+                f"{sync['p99_ms']:>7.2f} ms {queued['p99_ms']:>7.2f} ms"
+            )
+
+    def measure(self, mode, scenarios, dataset, options):
+        stream = SlowStream(options['sink_latency_ms'] / 1000)
+        if mode == 'sync':
+            handler = logging.StreamHandler(stream)
+        else:
+            handler = QueueStreamHandler(stream, queue_size=100000)
+        handler.setFormatter(JSONFormatter())
+
+        loggers = [logging.getLogger(name) for name in PROJECT_LOGGERS]
+        saved = [(logger.handlers[:], logger.level, logger.propagate) for logger in loggers]
+        for logger in loggers:
+            logger.handlers = [handler]
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
+        stop = threading.Event()
+        background = [
+            threading.Thread(target=self.log_continuously, args=(stop,), daemon=True)
+            for _ in range(options['background_threads'])
+        ]
+        for thread in background:
+            thread.start()
+
+        try:
+            results = {
+                scenario.name: run_scenario(scenario, dataset, iterations=options['iterations'],
+                                            warmup=options['warmup'])
+                for scenario in scenarios
+            }
+        finally:
+            stop.set()
+            for thread in background:
+                thread.join()
+            handler.flush()
+            handler.close()
+            for logger, (handlers, level, propagate) in zip(loggers, saved):
+                logger.handlers = handlers
+                logger.setLevel(level)
+                logger.propagate = propagate
+
+        self.stderr.write(f"{mode}: {stream.lines} lignes écrites")
+        return results
+
+    @staticmethod
+    def log_continuously(stop):
+        logger = logging.getLogger('monitoring.bench_logging')
+        i = 0
+        while not stop.is_set():
+            logger.info("Enregistrement de fond %s", i)
+            i += 1
+            time.sleep(0.002)
@@ -0,0 +1,101 @@
+"""
+Coût des connexions SSE inactives et délai de diffusion des révocations.
+
+Ouvre `--subscribers` flux aiter_session_events (accounts/events.py) dans une
+boucle asyncio, comme sous un serveur ASGI, sans base de données ni réseau :
+- mémoire Python (tracemalloc) par connexion une fois tous les flux en attente ;
+- temps entre la publication d'une révocation pour chaque utilisateur et la
+  fermeture de tous les flux.
+
+Usage:
+    python manage.py bench_sse_subscribers --subscribers 5000
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from accounts.events import SESSION_REVOKED, aiter_session_events, broker
+from monitoring.benchmark import percentile
+
+
+async def _is_active():
+    return True
+
+
+async def _consume(user_id, ready, closed_at):
+    async for message in aiter_session_events(user_id, 'bench-sid', _is_active):
+        if message.startswith('retry:'):
+            ready.release()
+    closed_at[user_id] = time.perf_counter()
+
+
+class Command(BaseCommand):
+    help = "Mesure la mémoire par connexion SSE inactive et la diffusion des révocations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=5000)
+        parser.add_argument('--max-memory-kb', type=float, default=8.0,
+                            help='Mémoire maximale par connexion inactive')
+
+    def handle(self, *args, **options):
+        # Aucun ping pendant la mesure
+        with override_settings(SSE_HEARTBEAT_SECONDS=3600, SSE_MAX_SECONDS=3600):
+            result = asyncio.run(self.run(options['subscribers']))
+
+        self.stdout.write(
+            f"{options['subscribers']} connexions : "
+            f"{result['memory_per_connection_kb']:.2f} Ko/connexion, "
+            f"ouverture {result['open_s']:.2f} s\n"
+            f"diffusion : publication {result['publish_ms']:.1f} ms, "
+            f"toutes fermées en {result['fanout_ms']:.1f} ms "
+            f"(p50={result['p50_ms']:.1f} ms, p99={result['p99_ms']:.1f} ms)"
+        )
+        if result['memory_per_connection_kb'] > options['max_memory_kb']:
+            raise CommandError(
+                f"Plus de {options['max_memory_kb']} Ko par connexion inactive"
+            )
+        self.stdout.write(self.style.SUCCESS("Connexions SSE dans le budget mémoire"))
+
+    async def run(self, subscribers):
+        ready = asyncio.Semaphore(0)
+        closed_at = {}
+
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            tasks = [
+                asyncio.create_task(_consume(user_id, ready, closed_at))
+                for user_id in range(subscribers)
+            ]
+            for _ in range(subscribers):
+                await ready.acquire()
+            open_s = time.perf_counter() - start
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        if broker.subscriber_count() != subscribers:
+            raise CommandError(f"{broker.subscriber_count()} abonnés au lieu de {subscribers}")
+
+        # Événement de publish_session_revoked, publié directement (pas de
+        # transaction.on_commit dans une coroutine)
+        event = {'type': SESSION_REVOKED, 'active_sid': None, 'reason': 'admin_invalidated'}
+        published = time.perf_counter()
+        for user_id in range(subscribers):
+            broker.publish(user_id, event)
+        publish_ms = (time.perf_counter() - published) * 1000
+        await asyncio.gather(*tasks)
+
+        delays = sorted(closed - published for closed in closed_at.values())
+        return {
+            'memory_per_connection_kb': (current - baseline) / subscribers / 1024,
+            'open_s': open_s,
+            'publish_ms': publish_ms,
+            'fanout_ms': delays[-1] * 1000,
+            'p50_ms': percentile(delays, 50) * 1000,
+            'p99_ms': percentile(delays, 99) * 1000,
+        }
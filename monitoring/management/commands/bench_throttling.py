@@ -0,0 +1,101 @@
+"""
+Coût de la limitation de débit par requête (accounts/throttling.py).
+
+Mesure `throttling.check()` de chaque politique avec le cache configuré,
+sans base de données :
+- premier passage : une IP / un nom d'utilisateur / un utilisateur différent
+  à chaque requête (création des clés) ;
+- même client : requêtes répétées d'un client sous sa limite ;
+- refus : client au-delà de sa limite.
+
+Échoue si le coût médian d'un cas dépasse `--max-us` microsecondes. Les
+clients simulés (IP de la plage de test 198.18.0.0/15, noms d'utilisateur
+propres à chaque exécution, identifiants négatifs) ne partagent aucune clé
+avec de vrais clients ; leurs clés expirent seules.
+
+Usage:
+    python manage.py bench_throttling --iterations 20000
+"""
+
+import secrets
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from accounts import throttling
+from monitoring.benchmark import percentile
+
+# Débit jamais atteint pendant la mesure (refus mesurés avec RATE_LIMITED)
+RATE_UNLIMITED = '1000000000/min'
+RATE_LIMITED = '1/day'
+
+
+def _requests(count, distinct):
+    factory = RequestFactory()
+    run = secrets.randbelow(1 << 17)
+    requests = []
+    for i in range(count):
+        n = (run + (i if distinct else 0)) % (1 << 17)
+        request = factory.post('/api/auth/login/', REMOTE_ADDR=f'198.{18 + (n >> 16)}.{n >> 8 & 255}.{n & 255}')
+        request.user = User(pk=-(n + 1))
+        requests.append((request, f'bench-throttle-{run}-{n}'))
+    return requests
+
+
+class Command(BaseCommand):
+    help = "Mesure le coût par requête de la limitation de débit (token bucket, fenêtre glissante)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--max-us', type=float, default=200.0,
+                            help='Coût médian maximal par requête (µs)')
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        failures = []
+        for policy in throttling.POLICIES:
+            for case, distinct, rate in (
+                ('premier passage', True, RATE_UNLIMITED),
+                ('même client', False, RATE_UNLIMITED),
+                ('refus', False, RATE_LIMITED),
+            ):
+                rates = {f'{policy}.{scope}': rate for scope, _ in throttling.POLICIES[policy]}
+                with override_settings(THROTTLE_ENABLED=True, THROTTLE_RATES=rates):
+                    result = self.measure(policy, _requests(iterations, distinct), rate == RATE_LIMITED)
+                name = f"{policy} / {case}"
+                self.stdout.write(
+                    f"{name:<28} p50={result['p50_us']:>7.1f} µs  p99={result['p99_us']:>7.1f} µs  "
+                    f"refusées={result['rejected']:>6}"
+                )
+                if result['p50_us'] > options['max_us']:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"Plus de {options['max_us']} µs par requête : {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Coût de la limitation de débit dans le budget"))
+
+    def measure(self, policy, requests, expect_rejected):
+        if expect_rejected:
+            # Consomme la rafale autorisée avant la mesure
+            request, username = requests[0]
+            throttling.check(policy, request, username=username)
+
+        durations = []
+        rejected = 0
+        for request, username in requests:
+            start = time.perf_counter()
+            wait = throttling.check(policy, request, username=username)
+            durations.append(time.perf_counter() - start)
+            rejected += bool(wait)
+
+        if expect_rejected and rejected != len(requests):
+            raise CommandError(f"{policy} : {len(requests) - rejected} requête(s) acceptée(s) au-delà de la limite")
+        durations.sort()
+        return {
+            'p50_us': percentile(durations, 50) * 1_000_000,
+            'p99_us': percentile(durations, 99) * 1_000_000,
+            'rejected': rejected,
+        }
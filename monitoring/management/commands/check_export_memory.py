@@ -0,0 +1,95 @@
+"""
+Vérifie que les exports en flux gardent une mémoire constante.
+
+Crée une base de test temporaire avec `--users` comptes synthétiques (voir
+monitoring.benchmark), lit en entier chaque export de
+GET /api/admin/export/<ressource>.<format> via le client de test et mesure le
+pic mémoire Python (tracemalloc) pendant la lecture du flux. Échoue si un
+export dépasse `--max-memory-kb`. La base configurée n'est pas modifiée.
+
+Usage:
+    python manage.py check_export_memory --users 200000
+    python manage.py check_export_memory --users 20000 --compare-list
+"""
+
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from accounts.exports import EXPORTS, FORMATS
+from monitoring.benchmark import benchmark_database, seed_dataset
+
+
+class Command(BaseCommand):
+    help = "Mesure le pic mémoire des exports CSV/NDJSON sur un grand nombre de lignes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200000)
+        parser.add_argument('--max-memory-kb', type=int, default=4096,
+                            help='Pic mémoire maximal autorisé par export')
+        parser.add_argument('--compare-list', action='store_true',
+                            help='Mesure aussi GET /api/admin/users/ (liste JSON complète)')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            start = time.perf_counter()
+            dataset = seed_dataset(users=options['users'], tokens_per_user=0, sessions_per_user=1,
+                                   categories=10, videos_per_category=20)
+            self.stderr.write(f"Jeu de données créé en {time.perf_counter() - start:.1f} s")
+
+            client = Client()
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {dataset.access_token}'}
+            failures = []
+            for resource in EXPORTS:
+                for export_format in FORMATS:
+                    path = reverse('admin_api:export', kwargs={
+                        'resource': resource, 'export_format': export_format,
+                    })
+                    name = f"{resource}.{export_format}"
+                    result = self.measure(client, path, headers)
+                    self.stdout.write(
+                        f"{name:<16} {result['lines']:>8} lignes  "
+                        f"{result['bytes'] / 1024 / 1024:>7.1f} Mo  {result['duration_s']:>6.1f} s  "
+                        f"pic mémoire={result['peak_memory_kb']:>8.0f} Ko"
+                    )
+                    if result['peak_memory_kb'] > options['max_memory_kb']:
+                        failures.append(name)
+
+            if options['compare_list']:
+                result = self.measure(client, reverse('admin_api:user_list'), headers)
+                self.stdout.write(
+                    f"{'liste JSON':<16} {'':>8}         {result['bytes'] / 1024 / 1024:>7.1f} Mo  "
+                    f"{result['duration_s']:>6.1f} s  pic mémoire={result['peak_memory_kb']:>8.0f} Ko"
+                )
+
+        if failures:
+            raise CommandError(
+                f"Pic mémoire supérieur à {options['max_memory_kb']} Ko : {', '.join(failures)}"
+            )
+        self.stdout.write(self.style.SUCCESS("Mémoire des exports constante"))
+
+    def measure(self, client, path, headers):
+        size = 0
+        lines = 0
+        start = time.perf_counter()
+        tracemalloc.start()
+        try:
+            response = client.get(path, **headers)
+            if response.status_code != 200:
+                raise CommandError(f"{path} : statut {response.status_code}")
+            chunks = response.streaming_content if response.streaming else [response.content]
+            for chunk in chunks:
+                size += len(chunk)
+                lines += chunk.count(b'\n')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {
+            'bytes': size,
+            'lines': lines,
+            'duration_s': time.perf_counter() - start,
+            'peak_memory_kb': peak / 1024,
+        }
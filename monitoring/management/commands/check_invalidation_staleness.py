@@ -0,0 +1,157 @@
+"""
+Vérifie le délai de propagation du bus d'invalidation entre processus.
+
+Lance `--workers` processus indépendants (comme des workers gunicorn) qui
+suivent une version de test et simulent une requête toutes les
+`--request-interval` secondes (InvalidationMiddleware puis lecture de la
+version). Le processus principal incrémente la version `--bumps` fois ;
+chaque worker note l'instant où il voit chaque nouvelle version.
+
+Le délai d'une version pour un worker est le temps entre l'incrément et la
+première requête où le worker voit cette version (ou une plus récente).
+Échoue si un délai dépasse `--max-staleness` (par défaut
+INVALIDATION_POLL_INTERVAL + 2 × `--request-interval` + 0,25 s).
+
+Utilise le stockage configuré (INVALIDATION_STORE) : la base doit être
+migrée, et le cache partagé entre processus pour le stockage 'cache'.
+
+Usage:
+    python manage.py check_invalidation_staleness --workers 4 --bumps 20
+"""
+
+import multiprocessing
+import os
+import queue
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _worker(stamp, initial_version, request_interval, ready, stop, results):
+    # Processus « spawn » : ce module est importé avant django.setup()
+    import django
+    django.setup()
+    from monitoring.invalidation import bus as worker_bus
+
+    worker_bus.watch(stamp)
+    seen = []
+    last = None
+    while not stop.is_set():
+        worker_bus.apply_pending()
+        version = worker_bus.version(stamp)
+        if version != last:
+            seen.append((version, time.time()))
+            last = version
+            if version >= initial_version:
+                ready.set()
+        time.sleep(request_interval)
+    worker_bus.stop()
+    results.put((os.getpid(), seen))
+
+
+class Command(BaseCommand):
+    help = "Mesure le délai de propagation des invalidations entre processus."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--bumps', type=int, default=20)
+        parser.add_argument('--bump-interval', type=float, default=0.3,
+                            help='Secondes entre deux incréments')
+        parser.add_argument('--request-interval', type=float, default=0.01,
+                            help='Secondes entre deux requêtes simulées par worker')
+        parser.add_argument('--max-staleness', type=float,
+                            help='Délai maximal autorisé (secondes)')
+
+    def handle(self, *args, **options):
+        from monitoring.benchmark import percentile
+        from monitoring.invalidation import bus
+
+        poll_interval = getattr(settings, 'INVALIDATION_POLL_INTERVAL', 1.0)
+        max_staleness = options['max_staleness'] or (
+            poll_interval + 2 * options['request_interval'] + 0.25
+        )
+        stamp = f'staleness-check-{os.getpid()}'
+        store = bus.store
+
+        store.bump(stamp)
+        initial_version = store.read([stamp])[stamp]
+
+        context = multiprocessing.get_context('spawn')
+        stop = context.Event()
+        results = context.Queue()
+        readies = []
+        processes = []
+        for _ in range(options['workers']):
+            ready = context.Event()
+            process = context.Process(
+                target=_worker,
+                args=(stamp, initial_version, options['request_interval'], ready, stop, results),
+            )
+            process.start()
+            readies.append(ready)
+            processes.append(process)
+
+        try:
+            for ready in readies:
+                if not ready.wait(timeout=30 + poll_interval):
+                    raise CommandError("Un worker n'a pas lu la version initiale")
+
+            bumped_at = {}
+            for _ in range(options['bumps']):
+                store.bump(stamp)
+                bumped_at[store.read([stamp])[stamp]] = time.time()
+                time.sleep(options['bump_interval'])
+            time.sleep(max_staleness + poll_interval)
+        finally:
+            stop.set()
+            seen_by_worker = []
+            for _ in processes:
+                try:
+                    seen_by_worker.append(results.get(timeout=30))
+                except queue.Empty:
+                    break
+            for process in processes:
+                process.join(timeout=10)
+            self.delete_stamp(stamp)
+
+        if len(seen_by_worker) < len(processes):
+            raise CommandError("Un worker s'est arrêté sans résultat")
+
+        delays = []
+        missed = 0
+        for pid, seen in seen_by_worker:
+            worker_delays = []
+            for version, bump_time in bumped_at.items():
+                seen_time = next((t for v, t in seen if v >= version), None)
+                if seen_time is None:
+                    missed += 1
+                else:
+                    worker_delays.append(max(0.0, seen_time - bump_time))
+            worker_delays.sort()
+            delays.extend(worker_delays)
+            if worker_delays:
+                self.stdout.write(
+                    f"worker {pid:<8} p50={percentile(worker_delays, 50) * 1000:>7.1f} ms  "
+                    f"max={worker_delays[-1] * 1000:>7.1f} ms"
+                )
+
+        delays.sort()
+        if not delays:
+            raise CommandError("Aucune version propagée")
+        self.stdout.write(
+            f"{len(delays)} propagations ({options['workers']} workers, stockage "
+            f"{getattr(settings, 'INVALIDATION_STORE', 'database')}) : "
+            f"p50={percentile(delays, 50) * 1000:.1f} ms  p99={percentile(delays, 99) * 1000:.1f} ms  "
+            f"max={delays[-1] * 1000:.1f} ms  (borne {max_staleness * 1000:.0f} ms)"
+        )
+        if missed:
+            raise CommandError(f"{missed} version(s) jamais vue(s) par un worker")
+        if delays[-1] > max_staleness:
+            raise CommandError(f"Délai de propagation supérieur à {max_staleness:.2f} s")
+        self.stdout.write(self.style.SUCCESS("Délai de propagation dans la borne"))
+
+    def delete_stamp(self, stamp):
+        if getattr(settings, 'INVALIDATION_STORE', 'database') == 'database':
+            from monitoring.models import InvalidationStamp
+            InvalidationStamp.objects.filter(name=stamp).delete()
@@ -0,0 +1,37 @@
+"""
+Vérifie les budgets de requêtes SQL de toutes les routes API.
+
+Exécute chaque route (scénarios du benchmark) sur deux jeux de données de
+tailles différentes, dans une base de test temporaire. Échoue (code de
+sortie 1) si le nombre de requêtes d'une route augmente avec les données ou
+dépasse le `query_budget` déclaré sur sa vue.
+
+Usage:
+    python manage.py check_query_budgets
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.benchmark import benchmark_database
+from monitoring.query_budget import check_query_budgets
+
+
+class Command(BaseCommand):
+    help = "Vérifie que les requêtes SQL de chaque route API respectent leur budget et ne croissent pas avec les données."
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            report, errors = check_query_budgets()
+
+        for name, counts in report.items():
+            budget = counts['budget'] if counts['budget'] is not None else '-'
+            self.stdout.write(
+                f"{name:<45} petit={counts['small']:>4}  grand={counts['large']:>4}  budget={budget:>4}"
+            )
+
+        if errors:
+            for error in errors:
+                self.stderr.write(self.style.ERROR(error))
+            raise CommandError(f"{len(errors)} dépassement(s) de budget de requêtes SQL")
+
+        self.stdout.write(self.style.SUCCESS("Budgets de requêtes SQL respectés"))
@@ -0,0 +1,112 @@
+"""
+Test de charge « début de cours » contre un serveur lancé.
+
+Des centaines d'étudiants se connectent en une minute (chaque login invalide
+les sessions et blackliste les tokens précédents), chargent le dashboard puis
+naviguent. Une partie se reconnecte depuis un second appareil. Voir
+monitoring.loadgen.
+
+Les comptes `<prefix>0000`, `<prefix>0001`... doivent exister avec le même
+mot de passe ; `--create-users` les crée (ou réinitialise leur mot de passe)
+dans la base configurée, qui doit être celle du serveur testé.
+
+Tous les étudiants partagent l'IP du générateur : lancer le serveur testé avec
+THROTTLE_ENABLED=False (ou THROTTLE_LOGIN_IP relevé, ex. 100000/min), sinon la
+plupart des logins sont refusés (429). Les 429 sont comptés à part
+(`throttled`) et exclus des latences.
+
+Usage:
+    python manage.py loadtest --create-users --users 300 --ramp 60
+    python manage.py loadtest --base-url http://127.0.0.1:8000 --think-time 0.5 --output charge.json
+"""
+
+import json
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from accounts import stats
+from monitoring.loadgen import run_load
+
+
+class Command(BaseCommand):
+    help = "Simule une vague de connexions d'étudiants suivie de navigation contre un serveur lancé."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--users', type=int, default=100, help='Étudiants simulés')
+        parser.add_argument('--username-prefix', default='load_user_')
+        parser.add_argument('--password', default='load-test-password')
+        parser.add_argument('--create-users', action='store_true',
+                            help='Crée les comptes manquants et réinitialise leur mot de passe')
+        parser.add_argument('--ramp', type=float, default=60.0,
+                            help='Durée (s) sur laquelle les connexions sont réparties')
+        parser.add_argument('--think-time', type=float, default=1.0,
+                            help='Temps de réflexion moyen (s) entre deux requêtes')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Requêtes de navigation par étudiant après le dashboard')
+        parser.add_argument('--second-device-ratio', type=float, default=0.1,
+                            help='Part des étudiants se reconnectant depuis un second appareil')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Fichier JSON du rapport')
+
+    def handle(self, *args, **options):
+        usernames = [f"{options['username_prefix']}{i:04d}" for i in range(options['users'])]
+        if options['create_users']:
+            self.create_users(usernames, options['password'])
+
+        self.stdout.write(
+            f"{len(usernames)} étudiant(s) sur {options['ramp']:.0f} s contre {options['base_url']}..."
+        )
+        report = run_load(
+            options['base_url'],
+            usernames,
+            options['password'],
+            ramp=options['ramp'],
+            think_time=options['think_time'],
+            requests=options['requests'],
+            second_device_ratio=options['second_device_ratio'],
+            seed=options['seed'],
+        )
+
+        for endpoint, result in report['endpoints'].items():
+            latencies = '  '.join(
+                f"{name}={result[f'{name}_ms']:>8.1f} ms" if result[f'{name}_ms'] is not None
+                else f"{name}={'-':>8}   "
+                for name in ('p50', 'p95', 'p99')
+            )
+            self.stdout.write(
+                f"{endpoint:<14} {result['requests']:>7} req  {result['throughput_rps']:>8.1f} req/s  "
+                f"erreurs={result['error_rate']:>7.2%}  token_not_active={result['token_not_active']:>5}  "
+                f"429={result['throttled']:>5}  {latencies}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Total : {report['requests']} requêtes en {report['duration_s']} s "
+            f"({report['throughput_rps']} req/s), erreurs={report['error_rate']:.2%}, "
+            f"token_not_active={report['token_not_active']}, 429={report['throttled']}"
+        ))
+        if report['throttled']:
+            self.stdout.write(self.style.WARNING(
+                f"{report['throttled']} requête(s) refusée(s) par la limitation de débit (429) : "
+                "relancer le serveur testé avec THROTTLE_ENABLED=False ou THROTTLE_LOGIN_IP relevé"
+            ))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+    def create_users(self, usernames, password):
+        """Crée les comptes manquants ; un seul hachage partagé par tous."""
+        password_hash = make_password(password)
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        User.objects.bulk_create(
+            [User(username=username, password=password_hash)
+             for username in usernames if username not in existing],
+            batch_size=1000
+        )
+        User.objects.filter(username__in=existing).update(password=password_hash)
+        # bulk_create/update ne déclenchent pas les signaux des statistiques
+        stats.invalidate()
+        self.stdout.write(f"{len(usernames) - len(existing)} compte(s) créé(s), {len(existing)} mis à jour")
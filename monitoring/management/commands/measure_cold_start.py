@@ -0,0 +1,182 @@
+"""
+Mesure du démarrage à froid d'un worker gunicorn, avec et sans préchauffage.
+
+Pour chaque tour, lance `gunicorn -c gunicorn.conf.py` (un worker) sur un port
+libre, une fois avec WARMUP_ENABLED=0 puis avec WARMUP_ENABLED=1, et mesure :
+- le temps entre le lancement et l'ouverture du port (chargement de l'application) ;
+- le temps entre le lancement et le premier octet de la première réponse ;
+- le temps jusqu'au premier octet (TTFB) de chaque endpoint, au premier appel
+  puis au second.
+
+Le serveur utilise la base configurée, qui doit être migrée. Un compte staff
+de mesure y est créé si nécessaire, avec une session JWT active.
+
+Usage:
+    python manage.py measure_cold_start --rounds 5
+    python manage.py measure_cold_start --output cold_start.json
+"""
+
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import ActiveToken
+from accounts.tokens import issue_session_tokens
+
+# Endpoints mesurés, dans l'ordre d'appel (le premier sert de sonde de démarrage)
+PATHS = [
+    '/api/dashboard/',
+    '/api/videos/',
+    '/api/categories/',
+    '/api/auth/me/',
+    '/api/admin/dashboard/',
+]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port, process, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"gunicorn s'est arrêté (code {process.returncode})")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            return
+        except OSError:
+            time.sleep(0.01)
+    raise CommandError(f"gunicorn n'écoute pas sur le port {port} après {timeout} s")
+
+
+def _ttfb(port, path, token, timeout):
+    """Temps (ms) jusqu'à la réception des en-têtes de la réponse, et statut."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        start = time.perf_counter()
+        connection.request('GET', path, headers={'Authorization': f'Bearer {token}'})
+        response = connection.getresponse()
+        elapsed = (time.perf_counter() - start) * 1000
+        response.read()
+        return elapsed, response.status
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Compare le temps de réponse des premières requêtes d'un worker avec et sans préchauffage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=3)
+        parser.add_argument('--username', default='cold_start_probe')
+        parser.add_argument('--timeout', type=float, default=60.0,
+                            help='Délai maximal (s) de démarrage et de réponse')
+        parser.add_argument('--output', help='Fichier JSON du rapport')
+
+    def handle(self, *args, **options):
+        token = self.issue_token(options['username'])
+
+        runs = {'without_warmup': [], 'with_warmup': []}
+        for round_number in range(options['rounds']):
+            for label, enabled in (('without_warmup', False), ('with_warmup', True)):
+                result = self.measure(enabled, token, options['timeout'])
+                runs[label].append(result)
+                self.stderr.write(
+                    f"tour {round_number + 1} {label:<15} port={result['port_open_ms']:>7.0f} ms  "
+                    f"première réponse={result['first_response_ms']:>7.0f} ms"
+                )
+
+        report = {label: self.summarize(results) for label, results in runs.items()}
+        for label, summary in report.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(
+                f"  démarrage -> port ouvert      {summary['port_open_ms']:>8.1f} ms\n"
+                f"  démarrage -> première réponse {summary['first_response_ms']:>8.1f} ms"
+            )
+            for path, values in summary['ttfb_ms'].items():
+                self.stdout.write(
+                    f"  {path:<28} 1er appel={values['first']:>8.1f} ms  2e appel={values['second']:>8.1f} ms"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump({'rounds': options['rounds'], 'median': report, 'runs': runs}, f, indent=2)
+            self.stderr.write(self.style.SUCCESS(f"Rapport écrit dans {options['output']}"))
+
+    def issue_token(self, username):
+        user, created = User.objects.get_or_create(
+            username=username, defaults={'is_staff': True}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+        _, access, sid = issue_session_tokens(user)
+        ActiveToken.set_active_token(user, sid, '127.0.0.1', 'measure_cold_start')
+        return str(access)
+
+    def measure(self, warmup_enabled, token, timeout):
+        port = _free_port()
+        env = {
+            **os.environ,
+            'PORT': str(port),
+            'WEB_CONCURRENCY': '1',
+            'WARMUP_ENABLED': '1' if warmup_enabled else '0',
+        }
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'127.0.0.1:{port}', 'eduplatform.wsgi:application'],
+            cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for_port(port, process, timeout)
+            port_open = (time.perf_counter() - start) * 1000
+
+            # Première requête envoyée dès l'ouverture du port
+            ttfb = {}
+            for call in ('first', 'second'):
+                for path in PATHS:
+                    elapsed, status = _ttfb(port, path, token, timeout)
+                    if status != 200:
+                        raise CommandError(f"{path} : statut {status}")
+                    ttfb.setdefault(path, {})[call] = round(elapsed, 2)
+                    if call == 'first' and path == PATHS[0]:
+                        first_response = (time.perf_counter() - start) * 1000
+        finally:
+            process.terminate()
+            process.wait(timeout=timeout)
+
+        return {
+            'port_open_ms': round(port_open, 2),
+            'first_response_ms': round(first_response, 2),
+            'ttfb_ms': ttfb,
+        }
+
+    def summarize(self, results):
+        """Médiane de chaque mesure sur les tours."""
+        return {
+            'port_open_ms': statistics.median(r['port_open_ms'] for r in results),
+            'first_response_ms': statistics.median(r['first_response_ms'] for r in results),
+            'ttfb_ms': {
+                path: {
+                    call: statistics.median(r['ttfb_ms'][path][call] for r in results)
+                    for call in ('first', 'second')
+                }
+                for path in PATHS
+            },
+        }
@@ -0,0 +1,132 @@
+"""
+Métriques agrégées au format Prometheus (exposées sur /metrics).
+
+Chaque worker incrémente ses propres compteurs et histogrammes. Pour agréger
+les workers gunicorn, définir la variable d'environnement
+PROMETHEUS_MULTIPROC_DIR (répertoire partagé, vidé au démarrage) : chaque
+processus écrit alors ses valeurs dans des fichiers mmap de ce répertoire et
+l'endpoint /metrics les additionne à la lecture.
+
+Sans cette variable (runserver, un seul worker), les valeurs restent en
+mémoire dans le registre par défaut.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+
+# Nom de vue utilisé pour les URL non résolues (404)
+UNRESOLVED_VIEW = '<unresolved>'
+
+REQUEST_COUNT = Counter(
+    'eduplatform_http_requests_total',
+    'Requêtes HTTP traitées',
+    ['view', 'method', 'status'],
+)
+
+REQUEST_LATENCY = Histogram(
+    'eduplatform_http_request_duration_seconds',
+    'Durée des requêtes HTTP',
+    ['view'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+REQUEST_QUERIES = Histogram(
+    'eduplatform_http_request_db_queries',
+    'Nombre de requêtes SQL par requête HTTP',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+
+REQUEST_DB_TIME = Histogram(
+    'eduplatform_http_request_db_duration_seconds',
+    'Temps passé en base de données par requête HTTP',
+    ['view'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+LOGINS = Counter(
+    'eduplatform_logins_total',
+    'Tentatives de connexion',
+    ['channel', 'result'],
+)
+
+SESSION_EVICTIONS = Counter(
+    'eduplatform_single_session_evictions_total',
+    'Sessions rejetées car remplacées par une connexion sur un autre appareil',
+    ['source'],
+)
+
+CACHE_REQUESTS = Counter(
+    'eduplatform_cache_requests_total',
+    'Accès aux caches applicatifs',
+    ['cache', 'result'],
+)
+
+THROTTLED_REQUESTS = Counter(
+    'eduplatform_throttled_requests_total',
+    'Requêtes refusées par la limitation de débit',
+    ['policy', 'scope'],
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    'eduplatform_log_records_dropped_total',
+    "Enregistrements de journal abandonnés (file d'écriture pleine)",
+)
+
+
+def observe_request(view, method, status, duration, query_count, db_time):
+    """Enregistre les mesures d'une requête HTTP terminée."""
+    REQUEST_COUNT.labels(view, method, status).inc()
+    REQUEST_LATENCY.labels(view).observe(duration)
+    REQUEST_QUERIES.labels(view).observe(query_count)
+    REQUEST_DB_TIME.labels(view).observe(db_time)
+
+
+def record_login(success, channel='api'):
+    """Compte une connexion réussie ou échouée (`channel` : api ou web)."""
+    LOGINS.labels(channel, 'success' if success else 'failure').inc()
+
+
+def record_session_eviction(source):
+    """Compte un ancien token JWT (`jwt`) ou une session Django (`session`) rejetés."""
+    SESSION_EVICTIONS.labels(source).inc()
+
+
+def record_cache(cache, hit):
+    """Compte un succès ou un échec de lecture dans un cache."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_throttled(policy, scope):
+    """Compte une requête refusée par une règle de limitation de débit."""
+    THROTTLED_REQUESTS.labels(policy, scope).inc()
+
+
+def record_log_dropped():
+    """Compte un enregistrement de journal abandonné (voir monitoring.logs)."""
+    LOG_RECORDS_DROPPED.inc()
+
+
+def is_multiprocess():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def render():
+    """Retourne (contenu, content_type) de toutes les métriques."""
+    if is_multiprocess():
+        # Registre éphémère : agrège les fichiers de tous les workers
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """À appeler à la sortie d'un worker (hook gunicorn `child_exit`)."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
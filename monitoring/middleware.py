@@ -0,0 +1,136 @@
+"""
+Middleware d'instrumentation des requêtes.
+
+Pour chaque requête :
+- compte les requêtes SQL et leur durée (toutes les connexions) ;
+- ajoute un en-tête `Server-Timing` (db, auth, ser, total), lisible dans
+  l'onglet réseau du navigateur ;
+- écrit une ligne JSON dans le logger `monitoring.slow` si la requête dépasse
+  SLOW_REQUEST_MS ou contient des requêtes SQL plus lentes que SLOW_QUERY_MS ;
+- alimente les histogrammes Prometheus par nom d'URL (voir monitoring.metrics) ;
+- vérifie le budget de requêtes SQL de la vue (voir monitoring.query_budget) ;
+- identifie la requête (en-tête `X-Request-ID` reçu du proxy, sinon généré),
+  identifiant renvoyé dans la réponse et ajouté aux journaux (monitoring.logs).
+"""
+
+import json
+import logging
+import re
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics as prometheus_metrics
+from .instrumentation import RequestMetrics, activate, current, deactivate, sql_wrapper
+from .query_budget import enforce_query_budget, get_query_budget, query_budget_mode
+
+slow_logger = logging.getLogger('monitoring.slow')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Identifiant fourni par le proxy : repris seulement s'il est sûr dans un journal
+REQUEST_ID_PATTERN = re.compile(r'^[\w.-]{1,64}$')
+
+# Noms courts des étapes dans l'en-tête Server-Timing (valeurs ASCII uniquement)
+SERVER_TIMING_NAMES = (
+    ('auth', 'auth', 'Authentification JWT'),
+    ('serializer', 'ser', 'Serialisation DRF'),
+)
+
+
+class InstrumentationMiddleware:
+    """
+    Mesure la requête en cours (à placer en tête de MIDDLEWARE).
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'SERVER_TIMING_ENABLED', settings.DEBUG)
+        self.slow_request_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.slow_query_ms = getattr(settings, 'SLOW_QUERY_MS', 100)
+        self.timing_origins = set(getattr(settings, 'CORS_ALLOWED_ORIGINS', []))
+        self.query_budget_mode = query_budget_mode()
+
+    def __call__(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        metrics = RequestMetrics(slow_query_ms=self.slow_query_ms, request=request, request_id=request_id)
+        token = activate(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+
+        total = metrics.elapsed
+        response[REQUEST_ID_HEADER] = request_id
+        if self.server_timing:
+            response['Server-Timing'] = self.format_server_timing(metrics, total)
+            origin = request.headers.get('Origin')
+            if origin in self.timing_origins:
+                # Rend l'en-tête lisible par le frontend (Resource Timing API)
+                response['Timing-Allow-Origin'] = origin
+
+        match = getattr(request, 'resolver_match', None)
+        prometheus_metrics.observe_request(
+            match.view_name if match else prometheus_metrics.UNRESOLVED_VIEW,
+            request.method,
+            response.status_code,
+            total,
+            metrics.query_count,
+            metrics.db_time,
+        )
+
+        total_ms = total * 1000
+        if total_ms >= self.slow_request_ms or metrics.slow_queries:
+            self.log_slow_request(request, response, metrics, total_ms)
+
+        enforce_query_budget(
+            metrics.view_name, request.method, metrics.query_budget,
+            metrics.query_count, self.query_budget_mode,
+        )
+
+        return response
+    
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Retient le nom de la vue (classe APIView ou fonction)."""
+        metrics = current()
+        if metrics is not None:
+            view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+            name = view_class.__name__ if view_class else getattr(view_func, '__name__', repr(view_func))
+            metrics.view_name = f"{view_func.__module__}.{name}"
+            metrics.query_budget = get_query_budget(view_class, request.method)
+        return None
+    
+    @staticmethod
+    def format_server_timing(metrics, total):
+        entries = [
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.query_count} requetes SQL"'
+        ]
+        for key, short_name, description in SERVER_TIMING_NAMES:
+            if key in metrics.timings:
+                entries.append(
+                    f'{short_name};dur={metrics.timings[key] * 1000:.2f};desc="{description}"'
+                )
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+    
+    @staticmethod
+    def log_slow_request(request, response, metrics, total_ms):
+        slow_logger.warning(json.dumps({
+            'event': 'slow_request',
+            'request_id': metrics.request_id,
+            'method': request.method,
+            'path': request.path,
+            'view': metrics.view_name,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'queries': metrics.query_count,
+            'timings_ms': {k: round(v * 1000, 2) for k, v in metrics.timings.items()},
+            'slow_queries': metrics.slow_queries,
+        }, ensure_ascii=False))
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-19 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvalidationStamp',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='Nom')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Version')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière modification')),
+            ],
+            options={
+                'verbose_name': 'Version de cache',
+                'verbose_name_plural': 'Versions de cache',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 08:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfilingSwitch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sample_rate', models.FloatField(default=0.0, help_text='Fraction des requêtes profilées (0 à 1)', verbose_name="Taux d'échantillonnage")),
+                ('view_name', models.CharField(blank=True, help_text="Nom d'URL (ex. videos_api:video_list) ; vide = toutes les vues", max_length=200, verbose_name='Vue')),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Fin du profilage ; vide = sans limite', null=True, verbose_name='Expiration')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière modification')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Modifié par')),
+            ],
+            options={
+                'verbose_name': 'Échantillonnage du profilage',
+                'verbose_name_plural': 'Échantillonnage du profilage',
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+"""
+Modèles de l'application monitoring.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+# Version du bus d'invalidation du réglage d'échantillonnage (monitoring.profiling)
+PROFILING_STAMP = 'profiling'
+
+
+class InvalidationStamp(models.Model):
+    """
+    Version nommée d'un ensemble de données mises en cache par les workers
+    (voir monitoring.invalidation). Incrémentée à chaque modification.
+    """
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        verbose_name='Nom'
+    )
+    version = models.BigIntegerField(
+        default=0,
+        verbose_name='Version'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Dernière modification'
+    )
+
+    class Meta:
+        verbose_name = 'Version de cache'
+        verbose_name_plural = 'Versions de cache'
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class ProfilingSwitch(models.Model):
+    """
+    Échantillonnage des requêtes profilées (voir monitoring.profiling).
+    Une seule ligne (SINGLETON_ID).
+    """
+    SINGLETON_ID = 1
+
+    sample_rate = models.FloatField(
+        default=0.0,
+        verbose_name="Taux d'échantillonnage",
+        help_text='Fraction des requêtes profilées (0 à 1)'
+    )
+    view_name = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name='Vue',
+        help_text="Nom d'URL (ex. videos_api:video_list) ; vide = toutes les vues"
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Expiration',
+        help_text='Fin du profilage ; vide = sans limite'
+    )
+    updated_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Modifié par'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Dernière modification'
+    )
+
+    class Meta:
+        verbose_name = 'Échantillonnage du profilage'
+        verbose_name_plural = 'Échantillonnage du profilage'
+
+    def __str__(self):
+        return f"{self.sample_rate:.2%} {self.view_name or 'toutes les vues'}"
+
+    def is_active(self, now=None):
+        if self.sample_rate <= 0:
+            return False
+        return self.expires_at is None or self.expires_at > (now or timezone.now())
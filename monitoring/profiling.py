@@ -0,0 +1,262 @@
+"""
+Profilage à la demande des requêtes en production.
+
+Deux déclencheurs, réservés aux administrateurs :
+- en-tête `X-Profile` portant un jeton signé de courte durée, délivré par
+  POST /api/admin/profiles/token/ (vérifié avant la vue : signature, puis
+  compte toujours actif et staff, lu dans le cache des comptes) ;
+- échantillonnage : une fraction `sample_rate` des requêtes (d'une seule vue
+  si `view_name`, nom d'URL) est profilée jusqu'à `expires_at`. Réglé par
+  PUT /api/admin/profiles/sampling/ ou dans l'admin Django (ProfilingSwitch) ;
+  propagé aux workers par le bus d'invalidation (PROFILING_STAMP).
+
+La vue est exécutée sous cProfile (à partir de `process_view`). Le profil
+(`.prof`, lisible par pstats ou snakeviz) et ses métadonnées (`.json` : vue,
+durée, statut, requêtes SQL) sont écrits dans PROFILING_DIR, qui ne garde
+que les PROFILING_MAX_FILES plus récents.
+
+Sans profilage, le coût par requête est une lecture d'en-tête et une
+comparaison de version (aucune E/S). Un seul profil à la fois par processus :
+cProfile ralentit la requête profilée d'un facteur 2 environ.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import DatabaseError
+
+from .instrumentation import current
+from .invalidation import bus
+from .models import PROFILING_STAMP, ProfilingSwitch
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Profile'
+TOKEN_SALT = 'monitoring.profiling'
+
+# Nom de fichier d'un profil (sans extension) : aucun chemin possible
+PROFILE_NAME_PATTERN = re.compile(r'^[\w-]+$')
+
+# Un seul profileur actif par processus
+_profiling_lock = threading.Lock()
+
+# (version de PROFILING_STAMP, ProfilingSwitch ou None) du worker
+_switch_cache = (None, None)
+
+
+def is_enabled():
+    return getattr(settings, 'PROFILING_ENABLED', True)
+
+
+def profiles_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', Path(settings.BASE_DIR) / 'profiles'))
+
+
+# -- Déclencheurs -------------------------------------------------------------
+
+def issue_token(user):
+    """Jeton de l'en-tête X-Profile pour `user` (administrateur)."""
+    return signing.dumps({'u': user.pk}, salt=TOKEN_SALT, compress=True)
+
+
+def token_max_age():
+    return getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)
+
+
+def _token_user_id(token):
+    """
+    Administrateur désigné par le jeton, ou None.
+
+    La signature seule ne suffit pas : le compte doit être encore actif et
+    staff (un jeton délivré reste valide PROFILING_TOKEN_MAX_AGE secondes).
+    """
+    try:
+        user_id = signing.loads(token, salt=TOKEN_SALT, max_age=token_max_age())['u']
+    except (signing.BadSignature, KeyError, TypeError):
+        logger.warning("Jeton de profilage invalide ou expiré")
+        return None
+
+    from accounts.caching import get_user
+    user = get_user(user_id)
+    if user is None or not user.is_active or not user.is_staff:
+        logger.warning("Jeton de profilage refusé : le compte %s n'est plus administrateur", user_id)
+        return None
+    return user_id
+
+
+def current_switch():
+    """
+    Réglage d'échantillonnage du worker, relu seulement quand sa version change.
+
+    Version 0 (jamais modifié) : aucun réglage, aucune requête SQL.
+    """
+    global _switch_cache
+    version = bus.version(PROFILING_STAMP)
+    cached_version, switch = _switch_cache
+    if cached_version != version:
+        switch = None
+        if version:
+            try:
+                switch = ProfilingSwitch.objects.filter(pk=ProfilingSwitch.SINGLETON_ID).first()
+            except DatabaseError as e:
+                logger.error("Lecture du réglage de profilage impossible: %s", e)
+        _switch_cache = (version, switch)
+    return switch
+
+
+def _sampled(request):
+    switch = current_switch()
+    if switch is None or not switch.is_active():
+        return False
+    if switch.view_name:
+        match = getattr(request, 'resolver_match', None)
+        if match is None or match.view_name != switch.view_name:
+            return False
+    return random.random() < switch.sample_rate
+
+
+# -- Stockage des profils -----------------------------------------------------
+
+def save_profile(profiler, meta):
+    """Écrit le profil et ses métadonnées ; retourne le nom du profil."""
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(dt_timezone.utc)
+    view_slug = re.sub(r'[^\w]+', '_', meta['view'] or 'unresolved')[:60]
+    name = f"{now:%Y%m%dT%H%M%S%f}-{view_slug}-{os.getpid()}-{secrets.token_hex(3)}"
+    meta = {'name': name, 'created_at': now.isoformat(), **meta}
+
+    profiler.dump_stats(directory / f'{name}.prof')
+    # Métadonnées écrites en dernier : un profil listé est complet
+    (directory / f'{name}.json').write_text(json.dumps(meta, ensure_ascii=False))
+    _prune(directory)
+    return name
+
+
+def _prune(directory):
+    max_files = getattr(settings, 'PROFILING_MAX_FILES', 200)
+    # Noms préfixés par l'horodatage : ordre alphabétique = ordre chronologique
+    for meta_path in sorted(directory.glob('*.json'), reverse=True)[max_files:]:
+        for path in (meta_path, meta_path.with_suffix('.prof')):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit=50):
+    """Métadonnées des profils les plus récents."""
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for meta_path in sorted(directory.glob('*.json'), reverse=True)[:limit]:
+        try:
+            profiles.append(json.loads(meta_path.read_text()))
+        except (OSError, ValueError):
+            # Supprimé entre-temps par un autre worker
+            continue
+    return profiles
+
+
+def profile_path(name):
+    """Chemin du fichier .prof de `name`, ou None s'il n'existe pas."""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = profiles_dir() / f'{name}.prof'
+    return path if path.is_file() else None
+
+
+def render_text(path, limit=60):
+    """Résumé texte du profil (fonctions triées par temps cumulé)."""
+    stream = io.StringIO()
+    stats = pstats.Stats(str(path), stream=stream)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return stream.getvalue()
+
+
+# -- Middleware ---------------------------------------------------------------
+
+class ProfilingMiddleware:
+    """
+    Exécute la vue sous cProfile si la requête est désignée (en-tête signé
+    ou échantillonnage). À placer en fin de MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = is_enabled()
+
+    def __call__(self, request):
+        response = None
+        try:
+            response = self.get_response(request)
+            return response
+        finally:
+            # Y compris sur exception : le verrou du profileur doit être libéré
+            profiling = request.__dict__.pop('_profiling', None)
+            if profiling is not None:
+                self.finish(request, response, *profiling)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.enabled:
+            return None
+        token = request.headers.get(HEADER)
+        user_id = None
+        if token:
+            user_id = _token_user_id(token)
+            trigger = 'header' if user_id is not None else None
+        else:
+            trigger = 'sampling' if _sampled(request) else None
+        if trigger is None or not _profiling_lock.acquire(blocking=False):
+            return None
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Autre outil de profilage actif (sys.monitoring)
+            _profiling_lock.release()
+            logger.warning("Profilage impossible: %s", e)
+            return None
+        request._profiling = (profiler, trigger, user_id, time.perf_counter())
+        return None
+
+    def finish(self, request, response, profiler, trigger, user_id, start):
+        try:
+            profiler.disable()
+        finally:
+            _profiling_lock.release()
+
+        duration_ms = (time.perf_counter() - start) * 1000
+        match = getattr(request, 'resolver_match', None)
+        metrics = current()
+        meta = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code if response is not None else None,
+            'duration_ms': round(duration_ms, 2),
+            'queries': metrics.query_count if metrics else None,
+            'trigger': trigger,
+            'user_id': user_id,
+        }
+        try:
+            name = save_profile(profiler, meta)
+        except OSError as e:
+            logger.error("Écriture du profil impossible: %s", e)
+            return
+        logger.info("Profil %s enregistré (%s, %.0f ms, %s)", name, meta['view'], duration_ms, trigger)
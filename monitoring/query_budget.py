@@ -0,0 +1,134 @@
+"""
+Budgets de requêtes SQL par vue.
+
+Une vue API déclare le nombre maximal de requêtes SQL d'un appel complet
+(authentification comprise) :
+
+    class VideoListAPIView(APIView):
+        query_budget = 3                      # toutes les méthodes
+        query_budget = {'get': 3, 'post': 5}  # ou par méthode
+
+Le budget est vérifié :
+- à chaque requête par InstrumentationMiddleware selon QUERY_BUDGET_MODE
+  ('warn' : log `monitoring.query_budget`, 'raise' : exception, 'off') ;
+- par `check_query_budgets`, qui exécute toutes les routes API sur deux jeux
+  de données de tailles différentes et signale les budgets dépassés, les
+  nombres de requêtes qui augmentent avec les données (N+1) et les routes qui
+  ne répondent pas le code attendu (une erreur 4xx/5xx s'arrête souvent avant
+  les requêtes mesurées).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import resolve, reverse
+
+logger = logging.getLogger('monitoring.query_budget')
+
+# Tailles des deux jeux de données comparés par check_query_budgets
+SMALL_DATASET = {
+    'users': 10, 'tokens_per_user': 2, 'sessions_per_user': 1,
+    'categories': 3, 'videos_per_category': 4,
+}
+LARGE_DATASET = {
+    'users': 40, 'tokens_per_user': 6, 'sessions_per_user': 3,
+    'categories': 9, 'videos_per_category': 12,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    """Une vue a exécuté plus de requêtes SQL que son budget."""
+
+
+def get_query_budget(view_class, method):
+    """Budget de `view_class` pour la méthode HTTP donnée (None si non déclaré)."""
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method.lower())
+    return budget
+
+
+def query_budget_mode():
+    return getattr(settings, 'QUERY_BUDGET_MODE', 'warn' if settings.DEBUG else 'off')
+
+
+def enforce_query_budget(view_name, method, budget, query_count, mode):
+    """Signale un dépassement selon `mode` ('warn', 'raise' ou 'off')."""
+    if budget is None or query_count <= budget or mode == 'off':
+        return
+
+    message = f"{view_name} ({method}) : {query_count} requêtes SQL pour un budget de {budget}"
+    if mode == 'raise':
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def scenario_view_class(scenario):
+    """Classe de la vue appelée par un scénario du benchmark."""
+    return getattr(resolve(reverse(scenario.url_name, kwargs=scenario.kwargs)).func, 'view_class', None)
+
+
+def measure_query_counts(dataset_params):
+    """
+    Nombre de requêtes SQL de chaque scénario du benchmark sur un jeu de données.
+
+    Le jeu de données est créé puis annulé dans une transaction. Chaque
+    scénario est exécuté une première fois (caches chauds) puis mesuré.
+    """
+    from accounts import stats
+    from eduplatform import caching
+    from .benchmark import build_scenarios, run_scenario, seed_dataset
+
+    counts = {}
+    with transaction.atomic():
+        dataset = seed_dataset(**dataset_params)
+        for scenario in build_scenarios(dataset):
+            result = run_scenario(scenario, dataset, iterations=1, warmup=1)
+            counts[scenario.name] = (scenario, result['queries_max'], result['status'])
+        stats.invalidate()
+        # Les identifiants sont réutilisés après l'annulation (SQLite) : les
+        # entrées du jeu de données suivant ne doivent pas les retrouver
+        caching.clear_all()
+        transaction.set_rollback(True)
+    return counts
+
+
+def check_query_budgets(small=None, large=None):
+    """
+    Compare les requêtes SQL de chaque route API sur deux tailles de données.
+
+    Retourne (rapport, erreurs) : rapport = {scénario: {small, large, budget}},
+    erreurs = liste de messages (code HTTP inattendu, croissance avec les
+    données ou budget dépassé).
+    """
+    small_counts = measure_query_counts(small or SMALL_DATASET)
+    large_counts = measure_query_counts(large or LARGE_DATASET)
+
+    report = {}
+    errors = []
+    for name, (scenario, small_count, small_status) in small_counts.items():
+        _, large_count, large_status = large_counts[name]
+        budget = get_query_budget(scenario_view_class(scenario), scenario.method)
+        report[name] = {'small': small_count, 'large': large_count, 'budget': budget}
+
+        unexpected = sorted(
+            code for code in set(small_status) | set(large_status) if not scenario.status_ok(code)
+        )
+        if unexpected:
+            expected = scenario.expected_status or '2xx'
+            errors.append(
+                f"{name} : réponse {', '.join(map(str, unexpected))} au lieu de {expected} "
+                "(requêtes SQL non représentatives)"
+            )
+
+        if large_count > small_count:
+            errors.append(
+                f"{name} : {small_count} -> {large_count} requêtes SQL quand les données "
+                "augmentent (N+1 probable)"
+            )
+        if budget is not None and max(small_count, large_count) > budget:
+            errors.append(
+                f"{name} : {max(small_count, large_count)} requêtes SQL pour un budget de {budget}"
+            )
+    return report, errors
@@ -0,0 +1,240 @@
+"""
+Tests de l'application monitoring.
+
+    python manage.py test monitoring
+"""
+
+import tempfile
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from eduplatform import caching
+from eduplatform.testing import PASSWORD, CacheIsolationMixin, DeferredWritesMixin, auth_headers
+from videos.analytics import view_aggregator
+from videos.progress import progress_buffer
+from . import invalidation, profiling
+from .benchmark import BENCHMARK_CACHES, Scenario
+from .query_budget import (
+    QueryBudgetExceeded, check_query_budgets, enforce_query_budget, get_query_budget,
+)
+
+# Jeux de données réduits : même comparaison que la commande, en quelques secondes
+SMALL_DATASET = {
+    'users': 2, 'tokens_per_user': 1, 'sessions_per_user': 1,
+    'categories': 2, 'videos_per_category': 2,
+}
+LARGE_DATASET = {
+    'users': 6, 'tokens_per_user': 3, 'sessions_per_user': 2,
+    'categories': 4, 'videos_per_category': 5,
+}
+
+
+class QueryBudgetTests(TestCase):
+
+    def test_budget_per_method(self):
+        class View:
+            query_budget = {'get': 3, 'post': 5}
+
+        self.assertEqual(get_query_budget(View, 'GET'), 3)
+        self.assertEqual(get_query_budget(View, 'post'), 5)
+        self.assertIsNone(get_query_budget(View, 'delete'))
+        self.assertIsNone(get_query_budget(object, 'get'))
+
+    def test_enforce_modes(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            enforce_query_budget('vue', 'GET', 3, 4, 'raise')
+        with self.assertLogs('monitoring.query_budget', 'WARNING'):
+            enforce_query_budget('vue', 'GET', 3, 4, 'warn')
+        # Budget respecté, non déclaré ou contrôle désactivé
+        enforce_query_budget('vue', 'GET', 3, 3, 'raise')
+        enforce_query_budget('vue', 'GET', None, 100, 'raise')
+        enforce_query_budget('vue', 'GET', 3, 4, 'off')
+
+    def test_expected_status(self):
+        self.assertTrue(Scenario('admin_api:dashboard').status_ok(204))
+        self.assertFalse(Scenario('admin_api:dashboard').status_ok(404))
+        self.assertTrue(Scenario('admin_api:dashboard', expected_status=404).status_ok(404))
+        self.assertFalse(Scenario('admin_api:dashboard', expected_status=404).status_ok(200))
+
+
+@override_settings(
+    THROTTLE_ENABLED=False,
+    CACHES=BENCHMARK_CACHES,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class CheckQueryBudgetsTests(TestCase):
+    """Exécution de toutes les routes API, comme `manage.py check_query_budgets`."""
+
+    def setUp(self):
+        caching.clear_all()
+        # Pas de thread de vidage concurrent des requêtes mesurées
+        self.buffers = [(buffer, buffer.flush_interval) for buffer in (progress_buffer, view_aggregator)]
+        for buffer, _ in self.buffers:
+            buffer.flush_interval = 0
+
+    def tearDown(self):
+        for buffer, interval in self.buffers:
+            buffer.flush()
+            buffer.flush_interval = interval
+        caching.clear_all()
+
+    def test_all_routes_respect_their_budget(self):
+        report, errors = check_query_budgets(SMALL_DATASET, LARGE_DATASET)
+
+        self.assertEqual(errors, [])
+        self.assertIn('GET videos_api:dashboard', report)
+        self.assertIn('POST admin_api:video_bulk', report)
+
+    def test_failed_requests_are_reported(self):
+        def scenarios(dataset):
+            # Corps invalide : 400 avant les requêtes normalement mesurées
+            return [Scenario('admin_api:category_reorder', 'post', data=[1])]
+
+        with mock.patch('monitoring.benchmark.build_scenarios', scenarios):
+            report, errors = check_query_budgets(SMALL_DATASET, SMALL_DATASET)
+
+        self.assertEqual(list(report), ['POST admin_api:category_reorder'])
+        self.assertEqual(len(errors), 1)
+        self.assertIn('réponse 400 au lieu de 2xx', errors[0])
+
+
+class ProfilingTokenTests(DeferredWritesMixin, CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user('admin', password=PASSWORD, is_staff=True)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(PROFILING_DIR=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_token_of_an_active_admin(self):
+        self.assertEqual(profiling._token_user_id(profiling.issue_token(self.admin)), self.admin.pk)
+
+    def test_invalid_or_expired_token(self):
+        token = profiling.issue_token(self.admin)
+        with self.assertLogs('monitoring.profiling', 'WARNING'):
+            self.assertIsNone(profiling._token_user_id(token + 'x'))
+        with override_settings(PROFILING_TOKEN_MAX_AGE=-1), self.assertLogs('monitoring.profiling', 'WARNING'):
+            self.assertIsNone(profiling._token_user_id(token))
+
+    def test_token_is_refused_once_the_account_loses_staff(self):
+        token = profiling.issue_token(self.admin)
+        self.assertEqual(profiling._token_user_id(token), self.admin.pk)
+
+        # Compte mis en cache : invalidé après le commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.is_staff = False
+            self.admin.save()
+
+        with self.assertLogs('monitoring.profiling', 'WARNING'):
+            self.assertIsNone(profiling._token_user_id(token))
+
+    def test_header_profiles_the_request(self):
+        headers = auth_headers(self.admin)
+        token = profiling.issue_token(self.admin)
+
+        response = self.client.get('/api/dashboard/', HTTP_X_PROFILE=token, **headers)
+
+        self.assertEqual(response.status_code, 200)
+        profiles = profiling.list_profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual((profiles[0]['trigger'], profiles[0]['user_id']), ('header', self.admin.pk))
+
+    def test_header_of_a_non_admin_is_ignored(self):
+        user = User.objects.create_user('student', password=PASSWORD)
+
+        with self.assertLogs('monitoring.profiling', 'WARNING'):
+            self.client.get('/api/dashboard/', HTTP_X_PROFILE=profiling.issue_token(user), **auth_headers(user))
+
+        self.assertEqual(profiling.list_profiles(), [])
+
+
+@override_settings(INVALIDATION_ENABLED=False)
+class InvalidationBusTests(TestCase):
+    """Deux bus sur le même stockage : deux workers. Versions relues à la main (pas de thread)."""
+
+    def setUp(self):
+        cache.clear()
+
+    def workers(self, store):
+        writer, reader = invalidation.InvalidationBus(store), invalidation.InvalidationBus(store)
+        self.calls = []
+        reader.watch('catalogue', lambda: self.calls.append('catalogue'))
+        reader.refresh()
+        return writer, reader
+
+    def check_bump_reaches_the_other_worker(self, store):
+        writer, reader = self.workers(store)
+        self.assertEqual(reader.version('catalogue'), 0)
+
+        writer.bump('catalogue')
+
+        # Rien avant la relecture des versions
+        reader.apply_pending()
+        self.assertEqual(self.calls, [])
+        self.assertEqual(reader.refresh(), {'catalogue'})
+        self.assertEqual(reader.version('catalogue'), 1)
+        reader.apply_pending()
+        self.assertEqual(self.calls, ['catalogue'])
+        # Une seule exécution par changement
+        self.assertEqual(reader.refresh(), set())
+        reader.apply_pending()
+        self.assertEqual(self.calls, ['catalogue'])
+
+    def test_database_store(self):
+        self.check_bump_reaches_the_other_worker(invalidation.DatabaseStampStore())
+
+    def test_cache_store(self):
+        self.check_bump_reaches_the_other_worker(invalidation.CacheStampStore())
+
+    def test_callbacks_of_the_writer_run_without_refresh(self):
+        writer, _ = self.workers(invalidation.CacheStampStore())
+        writer.watch('catalogue', lambda: self.calls.append('writer'))
+
+        writer.bump('catalogue')
+        writer.apply_pending()
+
+        self.assertEqual(self.calls, ['writer'])
+
+    def test_failing_callback_does_not_stop_the_others(self):
+        writer, reader = self.workers(invalidation.CacheStampStore())
+        reader.watch('catalogue', lambda: 1 / 0)
+        reader.watch('catalogue', lambda: self.calls.append('after'))
+
+        writer.bump('catalogue')
+        reader.refresh()
+        with self.assertLogs('monitoring.invalidation', 'ERROR'):
+            reader.apply_pending()
+
+        self.assertEqual(self.calls, ['catalogue', 'after'])
+
+    def test_bump_on_commit(self):
+        writer, reader = self.workers(invalidation.CacheStampStore())
+
+        with mock.patch.object(invalidation, 'bus', writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidation.bump_on_commit('catalogue')
+                self.assertEqual(reader.refresh(), set())
+
+        self.assertEqual(reader.refresh(), {'catalogue'})
+
+    @override_settings(INVALIDATION_ENABLED=True, INVALIDATION_POLL_INTERVAL=0.01)
+    def test_background_thread_reads_new_versions(self):
+        writer, reader = self.workers(invalidation.CacheStampStore())
+        self.addCleanup(reader.stop)
+        self.assertEqual(reader.version('catalogue'), 0)
+
+        writer.bump('catalogue')
+
+        deadline = time.monotonic() + 5
+        while reader.version('catalogue') == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(reader.version('catalogue'), 1)
+        reader.apply_pending()
+        self.assertEqual(self.calls, ['catalogue'])
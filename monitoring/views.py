@@ -0,0 +1,28 @@
+"""
+Vues du monitoring.
+
+Endpoint:
+- GET /metrics : métriques au format texte Prometheus (accès local uniquement)
+"""
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from . import metrics
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Expose les métriques agrégées de tous les workers.
+
+    Réservé aux adresses de METRICS_ALLOWED_IPS (collecteur Prometheus local) :
+    les noms de vues et volumes de trafic ne sont pas publics.
+    """
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ['127.0.0.1', '::1'])
+    if request.META.get('REMOTE_ADDR') not in allowed_ips:
+        return HttpResponseForbidden()
+
+    content, content_type = metrics.render()
+    return HttpResponse(content, content_type=content_type)
@@ -0,0 +1,35 @@
+"""
+Warmers génériques du projet (voir monitoring.warmup).
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver, reverse
+
+
+def warm_url_resolver():
+    """Construit les tables de résolution et d'inversion des URL."""
+    resolver = get_resolver()
+    resolver.resolve('/api/dashboard/')
+    reverse('videos_api:dashboard')
+
+
+def warm_templates():
+    """Compile tous les templates du projet (cache du chargeur de templates)."""
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            directory = Path(directory)
+            if not directory.is_dir() or not str(directory).startswith(str(settings.BASE_DIR)):
+                # Templates des applications tierces : compilés à la demande
+                continue
+            for path in directory.rglob('*.html'):
+                engine.get_template(str(path.relative_to(directory)))
+
+
+def warm_db_connections():
+    """Ouvre la connexion de chaque base configurée."""
+    for connection in connections.all():
+        connection.ensure_connection()
@@ -0,0 +1,90 @@
+"""
+Préchauffage des workers au démarrage.
+
+Les applications enregistrent des fonctions de préchauffage (« warmers »)
+dans leur `AppConfig.ready()` :
+
+    from monitoring import warmup
+    warmup.register('jwt_backend', warm_jwt_backend)
+    warmup.register('admin_stats', warm_admin_stats, phase=warmup.WORKER)
+
+Deux phases :
+- PRELOAD : exécutée une fois au chargement de l'application (processus
+  maître gunicorn avec `preload_app`) ; le résultat (résolveur d'URL,
+  templates compilés, métadonnées des modèles...) est partagé par les workers
+  après le fork. Aucune connexion à la base ne doit y rester ouverte.
+- WORKER : exécutée dans chaque worker après le fork (connexion à la base,
+  remplissage des caches).
+
+Chaque warmer est chronométré ; une erreur est journalisée sans bloquer le
+démarrage. Le rapport est écrit dans le logger `monitoring.warmup`.
+"""
+
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('monitoring.warmup')
+
+PRELOAD = 'preload'
+WORKER = 'worker'
+
+_warmers = []
+
+
+def register(name, func, phase=PRELOAD):
+    """Enregistre un warmer (appelé sans argument)."""
+    if phase not in (PRELOAD, WORKER):
+        raise ValueError(f"Phase de préchauffage inconnue : {phase}")
+    if any(existing == name for existing, _, _ in _warmers):
+        return
+    _warmers.append((name, func, phase))
+
+
+def registered(phase=None):
+    """Noms des warmers enregistrés (d'une phase, ou de toutes)."""
+    return [name for name, _, p in _warmers if phase is None or p == phase]
+
+
+def is_enabled():
+    return getattr(settings, 'WARMUP_ENABLED', True)
+
+
+def run(phase):
+    """
+    Exécute les warmers d'une phase et retourne le rapport
+    {'phase', 'pid', 'total_ms', 'warmers': {nom: {'ms', 'ok'}}}.
+    """
+    report = {'phase': phase, 'pid': os.getpid(), 'warmers': {}}
+    if not is_enabled():
+        report['total_ms'] = 0
+        report['disabled'] = True
+        return report
+
+    start = time.perf_counter()
+    for name, func, warmer_phase in _warmers:
+        if warmer_phase != phase:
+            continue
+        warmer_start = time.perf_counter()
+        ok = True
+        try:
+            func()
+        except Exception as e:
+            ok = False
+            logger.error("Échec du préchauffage %s: %s", name, e)
+        report['warmers'][name] = {
+            'ms': round((time.perf_counter() - warmer_start) * 1000, 2),
+            'ok': ok,
+        }
+
+    if phase == PRELOAD:
+        # Les connexions ne doivent pas être partagées avec les workers forkés
+        connections.close_all()
+
+    report['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info(json.dumps({'event': 'warmup', **report}))
+    return report
@@ -3,7 +3,22 @@ Configuration de l'admin pour l'application videos.
 """
 
 from django.contrib import admin
-from .models import Video, Category
+from accounts import stats as admin_stats
+from monitoring.invalidation import bump_on_commit
+from .models import CATALOGUE_STAMP, Video, Category, CategoryEntitlement, WatchProgress
+
+
+class CategoryEntitlementInline(admin.TabularInline):
+    """
+    Utilisateurs et groupes ayant accès à la catégorie.
+    
+    Aucune ligne : catégorie ouverte à tous.
+    """
+    model = CategoryEntitlement
+    fields = ('user', 'group', 'created_at')
+    readonly_fields = ('created_at',)
+    autocomplete_fields = ('user', 'group')
+    extra = 0
 
 
 @admin.register(Category)
@@ -11,6 +26,7 @@ class CategoryAdmin(admin.ModelAdmin):
     """
     Administration des catégories de vidéos.
     """
+    inlines = [CategoryEntitlementInline]
     list_display = ('name', 'order', 'video_count', 'created_at')
     list_editable = ('order',)
     search_fields = ('name', 'description')
@@ -53,10 +69,33 @@ class VideoAdmin(admin.ModelAdmin):
     
     def publish_videos(self, request, queryset):
         count = queryset.update(is_published=True)
+        admin_stats.invalidate('published_videos')
+        bump_on_commit(CATALOGUE_STAMP)
         self.message_user(request, f"{count} vidéo(s) publiée(s).")
     publish_videos.short_description = "Publier les vidéos sélectionnées"
     
     def unpublish_videos(self, request, queryset):
         count = queryset.update(is_published=False)
+        admin_stats.invalidate('published_videos')
+        bump_on_commit(CATALOGUE_STAMP)
         self.message_user(request, f"{count} vidéo(s) dépubliée(s).")
     unpublish_videos.short_description = "Dépublier les vidéos sélectionnées"
+
+
+@admin.register(WatchProgress)
+class WatchProgressAdmin(admin.ModelAdmin):
+    """
+    Consultation de la progression de visionnage (lecture seule).
+    """
+    list_display = ('user', 'video', 'position', 'duration', 'completed', 'updated_at')
+    list_filter = ('completed',)
+    search_fields = ('user__username', 'video__title')
+    list_select_related = ('user', 'video')
+    raw_id_fields = ('user', 'video')
+    ordering = ('-updated_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,199 @@
+"""
+Statistiques de vues des vidéos, pré-agrégées par période.
+
+Chaque consultation d'une vidéo (API ou template) appelle `record_view` : la
+vue est simplement comptée en mémoire, par (vidéo, catégorie, heure). Le
+tampon est vidé périodiquement (ANALYTICS_FLUSH_INTERVAL) et chaque compteur
+est ajouté aux lignes de cumul horaires, journalières et hebdomadaires
+(VideoViewRollup, CategoryViewRollup).
+
+Aucun événement brut n'est stocké : le dashboard admin lit directement les
+lignes de cumul, dont le nombre ne dépend pas du trafic.
+"""
+
+import atexit
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .buffers import WriteBehindBuffer
+from .models import Video, Category, VideoViewRollup, CategoryViewRollup
+
+
+# Durée d'une période (en heure locale)
+PERIOD_STEPS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+
+def period_start(moment, period):
+    """Début (heure locale) de la période contenant `moment`."""
+    local = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if period == 'hour':
+        return local
+    local = local.replace(hour=0)
+    if period == 'day':
+        return local
+    if period == 'week':
+        return local - timedelta(days=local.weekday())
+    raise ValueError(f"Période inconnue : {period}")
+
+
+class ViewAggregator(WriteBehindBuffer):
+    """Compte les vues en mémoire par (vidéo, catégorie, heure)."""
+
+    thread_name = 'analytics-flush'
+
+    def record(self, video_id, category_id=None):
+        """Compte une vue (aucune requête SQL)."""
+        hour = period_start(timezone.now(), 'hour')
+        self.add((video_id, category_id, hour), 1)
+
+    def merge(self, current, value):
+        return current + value
+
+    def write(self, pending):
+        video_counts = defaultdict(int)
+        category_counts = defaultdict(int)
+        for (video_id, category_id, hour), count in pending.items():
+            for period in ('hour', 'day', 'week'):
+                start = hour if period == 'hour' else period_start(hour, period)
+                video_counts[(video_id, period, start)] += count
+                if category_id:
+                    category_counts[(category_id, period, start)] += count
+
+        # Ignorer les vidéos et catégories supprimées entre-temps
+        video_ids = set(Video.objects.filter(
+            id__in={key[0] for key in video_counts}
+        ).values_list('id', flat=True))
+        category_ids = set(Category.objects.filter(
+            id__in={key[0] for key in category_counts}
+        ).values_list('id', flat=True))
+
+        written = increment_rollups(
+            VideoViewRollup, 'video_id',
+            {key: n for key, n in video_counts.items() if key[0] in video_ids}
+        )
+        written += increment_rollups(
+            CategoryViewRollup, 'category_id',
+            {key: n for key, n in category_counts.items() if key[0] in category_ids}
+        )
+        return written
+
+
+def increment_rollups(model, owner_field, counts):
+    """
+    Ajoute des compteurs {(owner_id, period, period_start): n} aux lignes de cumul.
+
+    Les lignes existantes sont incrémentées par un seul `bulk_update` utilisant
+    F('views') + n (pas de perte de mise à jour entre workers) ; les lignes
+    manquantes sont créées par `bulk_create`.
+    """
+    if not counts:
+        return 0
+
+    with transaction.atomic():
+        existing = _existing_rollups(model, owner_field, counts)
+        to_update, to_create = [], []
+        for key, count in counts.items():
+            pk = existing.get(key)
+            if pk is not None:
+                to_update.append(model(pk=pk, views=F('views') + count))
+            else:
+                owner_id, period, start = key
+                to_create.append(model(**{owner_field: owner_id}, period=period,
+                                       period_start=start, views=count))
+
+        if to_update:
+            model.objects.bulk_update(to_update, ['views'], batch_size=500)
+
+        if to_create:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(to_create, batch_size=500)
+            except IntegrityError:
+                # Un autre worker a créé certaines lignes : incrémenter une par une
+                for obj in to_create:
+                    lookup = {owner_field: getattr(obj, owner_field),
+                              'period': obj.period, 'period_start': obj.period_start}
+                    if not model.objects.filter(**lookup).update(views=F('views') + obj.views):
+                        model.objects.create(**lookup, views=obj.views)
+
+    return len(counts)
+
+
+def _existing_rollups(model, owner_field, counts):
+    """Clés de cumul déjà présentes en base : {(owner_id, period, period_start): pk}."""
+    by_period = defaultdict(set)
+    for owner_id, period, start in counts:
+        by_period[(period, start)].add(owner_id)
+
+    query = Q()
+    for (period, start), owner_ids in by_period.items():
+        query |= Q(period=period, period_start=start, **{f'{owner_field}__in': owner_ids})
+
+    return {
+        (row[owner_field], row['period'], row['period_start']): row['pk']
+        for row in model.objects.filter(query).values('pk', owner_field, 'period', 'period_start')
+    }
+
+
+# Instance unique par worker
+view_aggregator = ViewAggregator(
+    flush_interval=getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 60.0),
+    max_pending=getattr(settings, 'ANALYTICS_FLUSH_MAX_PENDING', 5000),
+)
+atexit.register(view_aggregator.stop)
+
+
+def record_view(video):
+    """Compte une vue de la vidéo."""
+    view_aggregator.record(video.id, video.category_id)
+
+
+def top_videos(period='week', limit=10, moment=None):
+    """Vidéos les plus vues sur la période courante (une requête)."""
+    start = period_start(moment or timezone.now(), period)
+    rollups = (
+        VideoViewRollup.objects
+        .filter(period=period, period_start=start)
+        .select_related('video')
+        .order_by('-views')[:limit]
+    )
+    return [
+        {'id': r.video_id, 'title': r.video.title, 'views': r.views}
+        for r in rollups
+    ]
+
+
+def category_trends(period='day', count=30, moment=None):
+    """
+    Vues par catégorie sur les `count` dernières périodes (une requête).
+
+    Retourne une liste de {id, name, points: [{period_start, views}]}.
+    """
+    step = PERIOD_STEPS[period]
+    end = period_start(moment or timezone.now(), period)
+    start = end - step * (count - 1)
+
+    rollups = (
+        CategoryViewRollup.objects
+        .filter(period=period, period_start__gte=start, period_start__lte=end)
+        .select_related('category')
+        .order_by('category__order', 'category__name', 'period_start')
+    )
+    trends = {}
+    for r in rollups:
+        trend = trends.setdefault(r.category_id, {
+            'id': r.category_id,
+            'name': r.category.name,
+            'points': [],
+        })
+        trend['points'].append({'period_start': r.period_start, 'views': r.views})
+    return list(trends.values())
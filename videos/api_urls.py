@@ -9,6 +9,8 @@ from .api_views import (
     VideoDetailAPIView,
     CategoryListAPIView,
     CategoryDetailAPIView,
+    VideoProgressAPIView,
+    ProgressListAPIView,
 )
 
 app_name = 'videos_api'
@@ -17,6 +19,8 @@ urlpatterns = [
     path('dashboard/', DashboardAPIView.as_view(), name='dashboard'),
     path('videos/', VideoListAPIView.as_view(), name='video_list'),
     path('videos/<int:video_id>/', VideoDetailAPIView.as_view(), name='video_detail'),
+    path('videos/<int:video_id>/progress/', VideoProgressAPIView.as_view(), name='video_progress'),
+    path('progress/', ProgressListAPIView.as_view(), name='progress'),
     path('categories/', CategoryListAPIView.as_view(), name='category_list'),
     path('categories/<int:category_id>/', CategoryDetailAPIView.as_view(), name='category_detail'),
 ]
@@ -7,14 +7,33 @@ Endpoints:
 - GET /api/categories/ : Liste des catégories
 - GET /api/categories/<id>/ : Catégorie avec ses vidéos
 - GET /api/dashboard/ : Données pour le dashboard (catégories + vidéos)
+- GET/POST /api/videos/<id>/progress/ : Progression de visionnage d'une vidéo
+- GET /api/progress/ : Progression de toutes les vidéos de l'utilisateur
+
+Les catégories réservées à d'autres cohortes sont retirées en mémoire des
+résultats (voir videos.entitlements) : les requêtes du catalogue sont les
+mêmes pour tous les utilisateurs. Le dashboard et la liste des catégories
+sont donc sérialisés une fois et gardés en cache (voir videos.caching),
+à partir de la base principale (un réplica peut être en retard sur la
+modification qui a invalidé le cache).
 """
 
+from itertools import islice
+
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Prefetch
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from accounts.throttling import CatalogueRateThrottle
+from eduplatform.db.routers import read_from_primary
 from .models import Video, Category
+from .caching import catalogue_cache
+from .entitlements import get_category_access
+from .progress import progress_buffer, get_user_progress, MAX_SECONDS
+from .analytics import record_view
 from .serializers import (
     VideoSerializer, 
     VideoListSerializer, 
@@ -35,39 +54,23 @@ class DashboardAPIView(APIView):
     - Statistiques
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogueRateThrottle]
+    query_budget = 5
     
     def get(self, request):
-        # Catégories avec vidéos publiées
-        categories = Category.objects.prefetch_related(
-            'videos'
-        ).filter(
-            videos__is_published=True
-        ).distinct().order_by('order', 'name')
+        access = get_category_access(request.user)
+        catalogue = catalogue_cache.get_or_set('dashboard', compute=build_dashboard_catalogue)
         
-        # Vidéos sans catégorie
-        uncategorized_videos = Video.objects.filter(
-            is_published=True,
-            category__isnull=True
-        ).order_by('order', '-created_at')
-        
-        # Total des vidéos
-        total_videos = Video.objects.filter(is_published=True).count()
-        
-        # Sérialisation
-        categories_data = []
-        for category in categories:
-            cat_videos = category.videos.filter(is_published=True).order_by('order', '-created_at')
-            categories_data.append({
-                'id': category.id,
-                'name': category.name,
-                'description': category.description,
-                'order': category.order,
-                'videos': VideoListSerializer(cat_videos, many=True).data
-            })
+        categories_data = [
+            category for category in catalogue['categories'] if access.allows(category['id'])
+        ]
+        total_videos = len(catalogue['uncategorized_videos']) + sum(
+            len(category['videos']) for category in categories_data
+        )
         
         return Response({
             'categories': categories_data,
-            'uncategorized_videos': VideoListSerializer(uncategorized_videos, many=True).data,
+            'uncategorized_videos': catalogue['uncategorized_videos'],
             'total_videos': total_videos,
             'user': {
                 'first_name': request.user.first_name,
@@ -76,6 +79,41 @@ class DashboardAPIView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+@read_from_primary()
+def build_dashboard_catalogue():
+    """Catégories avec leurs vidéos publiées et vidéos sans catégorie, sérialisées."""
+    # Catégories avec vidéos publiées (vidéos chargées en une requête)
+    categories = Category.objects.prefetch_related(
+        Prefetch(
+            'videos',
+            queryset=Video.objects.filter(is_published=True).order_by('order', '-created_at'),
+            to_attr='published_videos'
+        )
+    ).filter(
+        videos__is_published=True
+    ).distinct().order_by('order', 'name')
+    
+    # Vidéos sans catégorie
+    uncategorized_videos = Video.objects.filter(
+        is_published=True,
+        category__isnull=True
+    ).order_by('order', '-created_at')
+    
+    return {
+        'categories': [
+            {
+                'id': category.id,
+                'name': category.name,
+                'description': category.description,
+                'order': category.order,
+                'videos': VideoListSerializer(category.published_videos, many=True).data
+            }
+            for category in categories
+        ],
+        'uncategorized_videos': VideoListSerializer(uncategorized_videos, many=True).data,
+    }
+
+
 class VideoListAPIView(APIView):
     """
     API liste des vidéos.
@@ -84,9 +122,11 @@ class VideoListAPIView(APIView):
     GET /api/videos/?category=<id>
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogueRateThrottle]
+    query_budget = 3
     
     def get(self, request):
-        videos = Video.objects.filter(is_published=True)
+        videos = Video.objects.filter(is_published=True).select_related('category')
         
         # Filtre par catégorie
         category_id = request.query_params.get('category')
@@ -94,10 +134,11 @@ class VideoListAPIView(APIView):
             videos = videos.filter(category_id=category_id)
         
         videos = videos.order_by('category__order', 'order', '-created_at')
+        videos = get_category_access(request.user).filter(videos)
         
         return Response({
             'videos': VideoListSerializer(videos, many=True).data,
-            'count': videos.count()
+            'count': len(videos)
         }, status=status.HTTP_200_OK)
 
 
@@ -108,20 +149,31 @@ class VideoDetailAPIView(APIView):
     GET /api/videos/<id>/
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogueRateThrottle]
+    query_budget = 4
     
     def get(self, request, video_id):
-        video = get_object_or_404(Video, id=video_id, is_published=True)
+        video = get_object_or_404(Video.objects.select_related('category'), id=video_id, is_published=True)
+        access = get_category_access(request.user)
+        if not access.allows(video.category_id):
+            raise Http404
+        record_view(video)
         
         # Vidéos similaires
         if video.category:
-            related_videos = Video.objects.filter(
-                is_published=True,
-                category=video.category
+            # Via la catégorie : `video.category` est déjà connu, sans requête
+            related_videos = video.category.videos.filter(
+                is_published=True
             ).exclude(id=video.id)[:5]
         else:
+            # Toutes catégories : les 5 premières accessibles, en une requête
             related_videos = Video.objects.filter(
                 is_published=True
-            ).exclude(id=video.id)[:5]
+            ).select_related('category').exclude(id=video.id)
+            related_videos = list(islice(
+                (v for v in related_videos.iterator(chunk_size=50) if access.allows(v.category_id)),
+                5
+            ))
         
         return Response({
             'video': VideoSerializer(video).data,
@@ -136,16 +188,26 @@ class CategoryListAPIView(APIView):
     GET /api/categories/
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogueRateThrottle]
+    query_budget = 3
     
     def get(self, request):
-        categories = Category.objects.all().order_by('order', 'name')
+        categories = catalogue_cache.get_or_set('categories', compute=build_category_list)
+        categories = get_category_access(request.user).filter(categories, key=lambda c: c['id'])
         
         return Response({
-            'categories': CategorySerializer(categories, many=True).data,
-            'count': categories.count()
+            'categories': categories,
+            'count': len(categories)
         }, status=status.HTTP_200_OK)
 
 
+@read_from_primary()
+def build_category_list():
+    """Toutes les catégories avec leur nombre de vidéos publiées, sérialisées."""
+    categories = Category.objects.with_published_video_count().order_by('order', 'name')
+    return CategorySerializer(categories, many=True).data
+
+
 class CategoryDetailAPIView(APIView):
     """
     API détail d'une catégorie avec ses vidéos.
@@ -153,9 +215,13 @@ class CategoryDetailAPIView(APIView):
     GET /api/categories/<id>/
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [CatalogueRateThrottle]
+    query_budget = 4
     
     def get(self, request, category_id):
-        category = get_object_or_404(Category, id=category_id)
+        if not get_category_access(request.user).allows(category_id):
+            raise Http404
+        category = get_object_or_404(Category.objects.with_published_video_count(), id=category_id)
         videos = category.videos.filter(is_published=True).order_by('order', '-created_at')
         
         return Response({
@@ -163,3 +229,85 @@ class CategoryDetailAPIView(APIView):
             'videos': VideoListSerializer(videos, many=True).data,
             'count': videos.count()
         }, status=status.HTTP_200_OK)
+
+
+class VideoProgressAPIView(APIView):
+    """
+    API progression de visionnage d'une vidéo.
+    
+    GET /api/videos/<id>/progress/
+    POST /api/videos/<id>/progress/
+    Body: { "position": 125, "duration": 600, "completed": false }
+    
+    Le heartbeat est regroupé en mémoire et écrit en base par lots :
+    la réponse (202) n'attend pas l'écriture.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = {'get': 3, 'post': 5}
+    
+    def get(self, request, video_id):
+        progress = get_user_progress(request.user.id).get(video_id)
+        return Response({
+            'video_id': video_id,
+            'progress': progress
+        }, status=status.HTTP_200_OK)
+    
+    def post(self, request, video_id):
+        # Mêmes règles que VideoDetailAPIView (vidéo publiée et catégorie
+        # accessible), sans requête : correspondance vidéo -> catégorie en cache
+        published = catalogue_cache.get_or_set('published_videos', compute=build_published_videos)
+        if video_id not in published or not get_category_access(request.user).allows(published[video_id]):
+            raise Http404
+        
+        completed = request.data.get('completed', False)
+        if not isinstance(completed, bool):
+            return Response({
+                'error': 'completed doit être true ou false'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            position = int(request.data.get('position'))
+            duration = request.data.get('duration')
+            duration = int(duration) if duration not in (None, '') else None
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Position invalide'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not 0 <= position <= MAX_SECONDS or (duration is not None and not 0 < duration <= MAX_SECONDS):
+            return Response({
+                'error': 'Position invalide'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        progress_buffer.record(
+            request.user.id,
+            video_id,
+            position,
+            duration=duration,
+            completed=completed
+        )
+        
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
+@read_from_primary()
+def build_published_videos():
+    """Vidéos publiées : {id: category_id} (une requête)."""
+    return dict(Video.objects.filter(is_published=True).values_list('id', 'category_id'))
+
+
+class ProgressListAPIView(APIView):
+    """
+    API progression de toutes les vidéos de l'utilisateur (une requête).
+    
+    GET /api/progress/
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+    
+    def get(self, request):
+        progress = get_user_progress(request.user.id)
+        return Response({
+            'progress': {str(video_id): data for video_id, data in progress.items()},
+            'count': len(progress)
+        }, status=status.HTTP_200_OK)
@@ -5,3 +5,13 @@ class VideosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'videos'
     verbose_name = 'Gestion des Vidéos'
+
+    def ready(self):
+        # Invalidation des accès aux catégories en cache
+        from . import signals  # noqa: F401
+
+        # Préchauffage des workers (voir monitoring.warmup)
+        from monitoring import warmup
+        from . import warmers
+        warmup.register('videos_serializers', warmers.warm_serializers)
+        warmup.register('catalogue_cache', warmers.warm_catalogue_cache, phase=warmup.WORKER)
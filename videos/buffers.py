@@ -0,0 +1,162 @@
+"""
+Tampon générique d'écriture différée (write-behind).
+
+Les entrées sont regroupées en mémoire par clé puis écrites en base par lots :
+- dès que le nombre de clés en attente atteint `max_pending` ;
+- sinon toutes les `flush_interval` secondes (thread d'arrière-plan) ;
+- et à l'arrêt du processus (à enregistrer avec `atexit`).
+
+Chaque worker a son propre tampon. Les sous-classes définissent comment
+fusionner deux valeurs d'une même clé (`merge`) et comment les écrire (`write`).
+
+Erreurs d'écriture : une erreur passagère (DatabaseError) remet les entrées en
+attente pour le vidage suivant. Une violation de contrainte (IntegrityError,
+ex. ligne référencée supprimée entre-temps) ne se corrigerait jamais : le lot
+est réécrit entrée par entrée et les entrées en échec sont abandonnées
+(journalisées et comptées dans `dropped`).
+"""
+
+import logging
+import os
+import threading
+
+from django.db import connections, transaction, DatabaseError, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Base des tampons d'écriture différée."""
+
+    # Nom du thread de vidage (visible dans les outils de diagnostic)
+    thread_name = 'write-behind-flush'
+
+    def __init__(self, flush_interval=5.0, max_pending=5000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._pid = os.getpid()
+        # Compteurs (entrées reçues, lignes écrites, vidages, entrées abandonnées)
+        self.received = 0
+        self.written = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    def merge(self, current, value):
+        """Fusionne une nouvelle valeur avec celle déjà en attente (défaut : la remplace)."""
+        return value
+
+    def write(self, pending):
+        """Écrit les entrées {clé: valeur} en base et retourne le nombre de lignes écrites."""
+        raise NotImplementedError
+
+    def add(self, key, value):
+        """Ajoute une entrée au tampon (aucune requête SQL hors vidage au seuil)."""
+        self._ensure_worker()
+
+        with self._lock:
+            current = self._pending.get(key)
+            self._pending[key] = value if current is None else self.merge(current, value)
+            self.received += 1
+            should_flush = len(self._pending) >= self.max_pending
+
+        if should_flush:
+            self.flush()
+
+    def pending_items(self):
+        """Copie des entrées en attente."""
+        with self._lock:
+            return list(self._pending.items())
+
+    def flush(self):
+        """Écrit les entrées en attente en base. Retourne le nombre de lignes écrites."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            try:
+                # Lot annulé en entier en cas d'erreur (même dans une transaction englobante)
+                with transaction.atomic():
+                    written = self.write(pending)
+            except IntegrityError as e:
+                logger.error("Contrainte violée lors de l'écriture différée (%s): %s",
+                             self.thread_name, e)
+                written = self._write_each(pending)
+            except DatabaseError as e:
+                self._requeue(pending)
+                logger.error("Erreur lors de l'écriture différée (%s): %s", self.thread_name, e)
+                return 0
+
+            self.written += written
+            self.flushes += 1
+            return written
+
+    def _requeue(self, pending):
+        # Remettre les entrées en attente, fusionnées avec les plus récentes
+        with self._lock:
+            for key, value in pending.items():
+                current = self._pending.get(key)
+                self._pending[key] = value if current is None else self.merge(value, current)
+
+    def _write_each(self, pending):
+        """Écrit les entrées une à une ; abandonne celles qui violent une contrainte."""
+        written = 0
+        failed = {}
+        for key, value in pending.items():
+            try:
+                with transaction.atomic():
+                    written += self.write({key: value})
+            except IntegrityError as e:
+                self.dropped += 1
+                logger.error("Entrée abandonnée (%s) %r: %s", self.thread_name, key, e)
+            except DatabaseError:
+                failed[key] = value
+        if failed:
+            self._requeue(failed)
+        return written
+
+    def _ensure_worker(self):
+        """Démarre le thread de vidage (une fois par processus, y compris après fork)."""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Processus enfant : le tampon hérité appartient au parent
+                self._pending = {}
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None and self.flush_interval > 0:
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=self.thread_name, daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            finally:
+                # Le thread a sa propre connexion : ne pas la garder ouverte
+                connections.close_all()
+
+    def stop(self):
+        """Arrête le thread de vidage et écrit les entrées restantes."""
+        self._stop.set()
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'received': self.received,
+                'written': self.written,
+                'flushes': self.flushes,
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,319 @@
+"""
+Import en masse des vidéos (création ou mise à jour).
+
+Utilisé par l'API d'administration POST /api/admin/videos/bulk/.
+
+Les lignes sont traitées par lots :
+- validation de chaque ligne (titre, URL YouTube, ordre, publication) ;
+- résolution des catégories par nom, avec création des catégories manquantes
+  (placées après les catégories existantes) ;
+- recherche des vidéos existantes (par `id` ou par URL YouTube) en une requête ;
+- écriture via `bulk_create` / `bulk_update` dans une transaction par lot.
+
+Sans `order`, une nouvelle vidéo (ou une vidéo changée de catégorie) est
+placée à la fin de sa catégorie, par pas de ORDER_GAP (voir videos.ordering) ;
+une vidéo existante garde sa place.
+
+Les lignes peuvent provenir d'un tableau JSON ou d'un CSV lu en flux :
+seul le lot courant est gardé en mémoire.
+"""
+
+import codecs
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from monitoring.invalidation import bump_on_commit
+from .models import CATALOGUE_STAMP, Video, Category, validate_youtube_url
+from .ordering import ORDER_GAP
+
+# Nombre de lignes écrites par transaction
+BATCH_SIZE = 500
+
+# Champs mis à jour pour une vidéo existante
+UPDATE_FIELDS = ['title', 'description', 'youtube_url', 'category', 'order', 'is_published', 'updated_at']
+
+TRUE_VALUES = {'1', 'true', 'vrai', 'oui', 'yes', 'y', 'o'}
+FALSE_VALUES = {'0', 'false', 'faux', 'non', 'no', 'n', ''}
+
+_url_validator = URLValidator()
+
+
+def iter_csv_rows(stream, encoding='utf-8-sig'):
+    """Itère sur les lignes d'un CSV (dictionnaires) sans charger tout le flux."""
+    return csv.DictReader(codecs.iterdecode(stream, encoding))
+
+
+def _clean_str(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _parse_bool(value, default=True):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Valeur booléenne invalide : {value!r}")
+
+
+def _parse_order(value):
+    """Ordre explicite, ou None s'il est absent (placement automatique)."""
+    if value is None or value == '':
+        return None
+    order = int(value)
+    if order < 0:
+        raise ValueError("L'ordre doit être positif")
+    return order
+
+
+class VideoBulkImporter:
+    """
+    Importe des lignes de vidéos et produit un rapport par ligne.
+
+    Chaque entrée du rapport contient le numéro de ligne (à partir de 1),
+    le statut (`created`, `updated` ou `error`), l'id de la vidéo et les erreurs.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.results = []
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.categories_created = 0
+        # Catégories existantes, indexées par nom (chargées une seule fois)
+        self._categories = {c.name: c for c in Category.objects.all()}
+        # URLs déjà vues dans cet import (détection des doublons)
+        self._seen_urls = set()
+        # Dernier ordre de chaque catégorie (id, None : sans catégorie), chargé à la demande
+        self._last_order = {}
+
+    def run(self, rows):
+        """Traite un itérable de lignes (dictionnaires) et retourne le rapport."""
+        rows = enumerate(rows, start=1)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self._process_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'categories_created': self.categories_created,
+            'results': sorted(self.results, key=lambda r: r['row']),
+        }
+
+    def _validate(self, data):
+        """Valide une ligne et retourne (valeurs nettoyées, erreurs)."""
+        if not isinstance(data, dict):
+            return None, ['Ligne invalide : un objet est attendu']
+
+        errors = []
+        cleaned = {
+            'title': _clean_str(data.get('title')),
+            'youtube_url': _clean_str(data.get('youtube_url')),
+            'description': _clean_str(data.get('description')),
+            'category': _clean_str(data.get('category')),
+        }
+
+        if not cleaned['title']:
+            errors.append('Titre requis')
+        elif len(cleaned['title']) > Video._meta.get_field('title').max_length:
+            errors.append('Titre trop long')
+
+        if not cleaned['youtube_url']:
+            errors.append('URL YouTube requise')
+        else:
+            try:
+                _url_validator(cleaned['youtube_url'])
+                validate_youtube_url(cleaned['youtube_url'])
+            except ValidationError as e:
+                errors.extend(e.messages)
+
+        if len(cleaned['category']) > Category._meta.get_field('name').max_length:
+            errors.append('Nom de catégorie trop long')
+
+        try:
+            cleaned['order'] = _parse_order(data.get('order'))
+        except (TypeError, ValueError):
+            errors.append("Ordre invalide")
+
+        try:
+            cleaned['is_published'] = _parse_bool(data.get('is_published'))
+        except ValueError as e:
+            errors.append(str(e))
+
+        video_id = data.get('id')
+        cleaned['id'] = None
+        if video_id not in (None, ''):
+            try:
+                cleaned['id'] = int(video_id)
+            except (TypeError, ValueError):
+                errors.append('Id invalide')
+
+        if not errors:
+            if cleaned['youtube_url'] in self._seen_urls:
+                errors.append('URL YouTube en double dans le fichier')
+            else:
+                self._seen_urls.add(cleaned['youtube_url'])
+
+        return cleaned, errors
+
+    def _resolve_categories(self, names):
+        """
+        Crée les catégories inconnues et retourne les noms ajoutés à l'index.
+
+        `ignore_conflicts` ignore les noms en conflit : seules les catégories
+        relues après l'insertion sont indexées et comptées.
+        """
+        missing = sorted(name for name in names if name not in self._categories)
+        if not missing:
+            return []
+        # À la suite des catégories existantes, dans l'ordre alphabétique
+        last = max((c.order for c in self._categories.values()), default=0)
+        Category.objects.bulk_create(
+            [Category(name=name, order=last + i * ORDER_GAP) for i, name in enumerate(missing, start=1)],
+            ignore_conflicts=True,
+        )
+        added = []
+        for category in Category.objects.filter(name__in=missing):
+            self._categories[category.name] = category
+            added.append(category.name)
+        return added
+
+    def _load_last_orders(self, category_ids):
+        """Ordre maximal des catégories pas encore chargées (une requête)."""
+        unknown = {category_id for category_id in category_ids if category_id not in self._last_order}
+        if not unknown:
+            return
+        filters = Q(category_id__in=[category_id for category_id in unknown if category_id is not None])
+        if None in unknown:
+            filters |= Q(category__isnull=True)
+        for category_id in unknown:
+            self._last_order[category_id] = 0
+        rows = Video.objects.filter(filters).values('category_id').annotate(last=Max('order'))
+        for row in rows:
+            self._last_order[row['category_id']] = row['last'] or 0
+
+    def _place(self, video, order, moved):
+        """Ordre de la vidéo : explicite, inchangé, ou à la fin de sa catégorie."""
+        last = self._last_order.get(video.category_id)
+        if order is None:
+            if not moved:
+                return video.order
+            order = (last or 0) + ORDER_GAP
+        if last is not None:
+            self._last_order[video.category_id] = max(last, order)
+        return order
+
+    def _process_batch(self, batch):
+        valid = []
+        for row_number, data in batch:
+            cleaned, errors = self._validate(data)
+            if errors:
+                self._record(row_number, 'error', errors=errors)
+            else:
+                valid.append((row_number, cleaned))
+
+        if not valid:
+            return
+
+        ids = {c['id'] for _, c in valid if c['id']}
+        urls = {c['youtube_url'] for _, c in valid if not c['id']}
+
+        added_categories = []
+        try:
+            with transaction.atomic():
+                added_categories = self._resolve_categories(
+                    {c['category'] for _, c in valid if c['category']}
+                )
+                self._load_last_orders({
+                    self._categories[c['category']].id if c['category'] else None
+                    for _, c in valid if c['order'] is None
+                })
+
+                by_id = Video.objects.in_bulk(ids) if ids else {}
+                by_url = {}
+                if urls:
+                    for video in Video.objects.filter(youtube_url__in=urls).order_by('id'):
+                        by_url.setdefault(video.youtube_url, video)
+
+                now = timezone.now()
+                to_create, to_update = [], []
+                for row_number, cleaned in valid:
+                    if cleaned['id']:
+                        video = by_id.get(cleaned['id'])
+                        if video is None:
+                            self._record(row_number, 'error', errors=[f"Vidéo {cleaned['id']} introuvable"])
+                            continue
+                    else:
+                        video = by_url.get(cleaned['youtube_url'])
+
+                    is_new = video is None
+                    if is_new:
+                        video = Video()
+                    previous_category_id = video.category_id
+                    video.title = cleaned['title']
+                    video.youtube_url = cleaned['youtube_url']
+                    video.description = cleaned['description']
+                    video.category = self._categories.get(cleaned['category']) if cleaned['category'] else None
+                    video.order = self._place(
+                        video, cleaned['order'],
+                        moved=is_new or video.category_id != previous_category_id,
+                    )
+                    video.is_published = cleaned['is_published']
+
+                    if is_new:
+                        to_create.append((row_number, video))
+                    else:
+                        # bulk_update ne déclenche pas auto_now
+                        video.updated_at = now
+                        to_update.append((row_number, video))
+
+                if to_create:
+                    Video.objects.bulk_create([video for _, video in to_create])
+                if to_update:
+                    Video.objects.bulk_update([video for _, video in to_update], UPDATE_FIELDS)
+                # bulk_create/bulk_update ne déclenchent pas les signaux du bus d'invalidation
+                bump_on_commit(CATALOGUE_STAMP)
+        except Exception:
+            # Lot annulé : les catégories créées par ce lot n'existent pas
+            for name in added_categories:
+                self._categories.pop(name, None)
+            raise
+        self.categories_created += len(added_categories)
+
+        for row_number, video in to_create:
+            self._record(row_number, 'created', video=video)
+        for row_number, video in to_update:
+            self._record(row_number, 'updated', video=video)
+
+    def _record(self, row_number, status, video=None, errors=None):
+        if status == 'created':
+            self.created += 1
+        elif status == 'updated':
+            self.updated += 1
+        else:
+            self.failed += 1
+        self.results.append({
+            'row': row_number,
+            'status': status,
+            'id': video.id if video is not None else None,
+            'errors': errors or [],
+        })
@@ -0,0 +1,22 @@
+"""
+Espace de noms `videos` du cache à deux niveaux (eduplatform.caching).
+
+- `dashboard` : catalogue sérialisé de GET /api/dashboard/ ;
+- `categories` : catégories sérialisées de GET /api/categories/ ;
+- `published_videos` : {id: category_id} des vidéos publiées (heartbeats de
+  POST /api/videos/<id>/progress/).
+
+Les données en cache sont les mêmes pour tous les utilisateurs : les vues
+retirent ensuite les catégories non accessibles (videos.entitlements).
+Versionné par CATALOGUE_STAMP : toute modification d'une catégorie ou d'une
+vidéo invalide les entrées dans tous les workers (voir videos.signals).
+"""
+
+from eduplatform.caching import TwoTierCache
+from .models import CATALOGUE_STAMP
+
+catalogue_cache = TwoTierCache(
+    'videos',
+    {'dashboard': (), 'categories': (), 'published_videos': ()},
+    stamp=CATALOGUE_STAMP,
+)
@@ -0,0 +1,118 @@
+"""
+Accès aux catégories par cohorte (CategoryEntitlement).
+
+Une catégorie sans droit est ouverte à tous ; une catégorie avec au moins un
+droit est réservée aux utilisateurs et groupes cités. Le staff voit tout.
+
+Les requêtes du catalogue ne font aucune jointure sur les droits : elles
+restent identiques pour tous les utilisateurs et les vues filtrent leur
+résultat en mémoire. Les catégories interdites à un utilisateur sont un
+`frozenset` de leurs ids (taille proportionnelle au nombre de catégories
+réservées, pas à leurs ids), calculé une fois (deux requêtes) puis gardé
+dans le cache Django :
+
+    access = get_category_access(request.user)
+    videos = access.filter(videos)              # objets avec `category_id`
+    if not access.allows(video.category_id): ...
+
+Chaque entrée en cache porte la version ENTITLEMENTS_STAMP du bus
+d'invalidation (monitoring.invalidation), lue en mémoire sans E/S. Toute
+modification d'un droit ou des groupes d'un utilisateur (voir videos.signals)
+incrémente la version dans le stockage partagé : les ensembles existants sont
+ignorés et recalculés, dans tous les workers, au plus
+INVALIDATION_POLL_INTERVAL secondes après le commit. Les opérations qui
+contournent les signaux (`QuerySet.update`, `bulk_create`) doivent appeler
+`invalidate()`.
+"""
+
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from monitoring import metrics
+from monitoring.invalidation import bus, bump_on_commit
+from .models import ENTITLEMENTS_STAMP, CategoryEntitlement
+
+CACHE_PREFIX = 'entitlements'
+
+
+def _user_key(user_id):
+    # `denied` : ensemble d'ids (l'ancien format `user` était un bitmap entier)
+    return f'{CACHE_PREFIX}:denied:{user_id}'
+
+
+def _timeout():
+    return getattr(settings, 'ENTITLEMENTS_CACHE_TIMEOUT', 300)
+
+
+class CategoryAccess:
+    """Catégories interdites à un utilisateur (ensemble d'ids `denied`)."""
+
+    __slots__ = ('denied',)
+
+    def __init__(self, denied=frozenset()):
+        self.denied = denied
+
+    def allows(self, category_id):
+        """Les vidéos sans catégorie sont accessibles à tous."""
+        return category_id not in self.denied
+
+    def filter(self, items, key=attrgetter('category_id')):
+        """Éléments dont la catégorie (`key`) est accessible, dans le même ordre."""
+        if not self.denied:
+            return list(items)
+        return [item for item in items if self.allows(key(item))]
+
+
+FULL_ACCESS = CategoryAccess()
+
+
+def compute_denied(user):
+    """Ids des catégories réservées non accordées à l'utilisateur (deux requêtes)."""
+    restricted = frozenset(
+        CategoryEntitlement.objects.values_list('category_id', flat=True).distinct()
+    )
+    if not restricted:
+        return frozenset()
+    granted = CategoryEntitlement.objects.filter(
+        Q(user_id=user.pk) | Q(group__user=user.pk)
+    ).values_list('category_id', flat=True).distinct()
+    return restricted.difference(granted)
+
+
+def get_category_access(user):
+    """
+    Accès de l'utilisateur aux catégories.
+
+    Un seul accès au cache (ids interdits), mémorisé sur l'objet utilisateur pour
+    le reste de la requête.
+    """
+    if user.is_staff:
+        return FULL_ACCESS
+    access = getattr(user, '_category_access', None)
+    if access is not None:
+        return access
+
+    # Le cache peut être partagé : la version doit avoir été lue au moins une fois
+    bus.ensure_loaded(ENTITLEMENTS_STAMP)
+    version = bus.version(ENTITLEMENTS_STAMP)
+    user_key = _user_key(user.pk)
+    entry = cache.get(user_key)
+    hit = entry is not None and entry[0] == version
+    metrics.record_cache('category_access', hit)
+
+    if hit:
+        denied = entry[1]
+    else:
+        denied = compute_denied(user)
+        cache.set(user_key, (version, denied), _timeout())
+
+    access = user._category_access = CategoryAccess(denied)
+    return access
+
+
+def invalidate():
+    """Périme les accès en cache de tous les utilisateurs (après le commit)."""
+    bump_on_commit(ENTITLEMENTS_STAMP)
@@ -0,0 +1,83 @@
+"""
+Test de charge du tampon de progression de visionnage (heartbeats).
+
+Simule des spectateurs simultanés qui envoient chacun un heartbeat par tick,
+le tampon étant vidé tous les `--flush-every` ticks (équivalent du timer
+PROGRESS_FLUSH_INTERVAL). Les utilisateurs et vidéos de test sont créés dans
+une transaction annulée à la fin.
+
+Affiche le débit du tampon, le nombre de lignes écrites et le nombre de
+requêtes SQL comparés au nombre de heartbeats reçus.
+
+Usage:
+    python manage.py bench_progress --viewers 2000 --ticks 30 --flush-every 5
+"""
+
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from videos.models import Video, WatchProgress
+from videos.progress import ProgressBuffer
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit du tampon d'écriture différée des heartbeats de progression."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--viewers', type=int, default=2000)
+        parser.add_argument('--videos', type=int, default=50)
+        parser.add_argument('--ticks', type=int, default=30)
+        parser.add_argument('--flush-every', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options)
+            # Ne rien laisser en base
+            transaction.set_rollback(True)
+
+    def _run(self, options):
+        prefix = f'bench-progress-{int(time.time())}'
+        users = User.objects.bulk_create(
+            [User(username=f'{prefix}-{i}', password='!') for i in range(options['viewers'])]
+        )
+        videos = Video.objects.bulk_create([
+            Video(title=f'{prefix}-{i}', youtube_url=f'https://youtu.be/bench{i}')
+            for i in range(options['videos'])
+        ])
+
+        rng = random.Random(42)
+        viewers = [(user.id, rng.choice(videos).id) for user in users]
+
+        # Pas de thread ni de seuil : les vidages suivent les ticks
+        buffer = ProgressBuffer(flush_interval=0, max_pending=len(viewers) + 1)
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            for tick in range(1, options['ticks'] + 1):
+                for user_id, video_id in viewers:
+                    buffer.record(user_id, video_id, tick * 5, duration=3600)
+                if tick % options['flush_every'] == 0:
+                    buffer.flush()
+            buffer.flush()
+        elapsed = time.perf_counter() - start
+
+        stats = buffer.stats()
+        rows = WatchProgress.objects.filter(user_id__in=[u.id for u in users]).count()
+        self.stdout.write(f"Heartbeats     : {stats['received']}")
+        self.stdout.write(f"Durée          : {elapsed:.2f} s")
+        self.stdout.write(f"Débit          : {stats['received'] / elapsed:,.0f} heartbeats/s")
+        self.stdout.write(f"Vidages        : {stats['flushes']}")
+        self.stdout.write(f"Lignes écrites : {stats['written']} ({rows} ligne(s) distinctes)")
+        self.stdout.write(f"Requêtes SQL   : {len(queries)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Heartbeats par requête SQL : {stats['received'] / max(len(queries), 1):,.0f}"
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.27 on 2026-10-19 07:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('videos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WatchProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Position (secondes)')),
+                ('duration', models.PositiveIntegerField(blank=True, null=True, verbose_name='Durée (secondes)')),
+                ('completed', models.BooleanField(default=False, verbose_name='Terminée')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Dernière mise à jour')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watch_progress', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='watch_progress', to='videos.video', verbose_name='Vidéo')),
+            ],
+            options={
+                'verbose_name': 'Progression',
+                'verbose_name_plural': 'Progressions',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='watchprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'video'), name='unique_watch_progress'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.27 on 2026-10-19 07:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_watchprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Heure'), ('day', 'Jour'), ('week', 'Semaine')], max_length=5, verbose_name='Période')),
+                ('period_start', models.DateTimeField(verbose_name='Début de la période')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Vues')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='videos.category', verbose_name='Catégorie')),
+            ],
+            options={
+                'verbose_name': 'Vues par catégorie',
+                'verbose_name_plural': 'Vues par catégorie',
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Heure'), ('day', 'Jour'), ('week', 'Semaine')], max_length=5, verbose_name='Période')),
+                ('period_start', models.DateTimeField(verbose_name='Début de la période')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Vues')),
+                ('video', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_rollups', to='videos.video', verbose_name='Vidéo')),
+            ],
+            options={
+                'verbose_name': 'Vues par vidéo',
+                'verbose_name_plural': 'Vues par vidéo',
+                'indexes': [models.Index(fields=['period', 'period_start', '-views'], name='video_rollup_top_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='videoviewrollup',
+            constraint=models.UniqueConstraint(fields=('video', 'period', 'period_start'), name='unique_video_view_rollup'),
+        ),
+        migrations.AddIndex(
+            model_name='categoryviewrollup',
+            index=models.Index(fields=['period', 'period_start'], name='category_rollup_period_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryviewrollup',
+            constraint=models.UniqueConstraint(fields=('category', 'period', 'period_start'), name='unique_category_view_rollup'),
+        ),
+    ]
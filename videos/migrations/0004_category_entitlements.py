@@ -0,0 +1,43 @@
+# Generated by Django 4.2.27 on 2026-10-19 07:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('videos', '0003_view_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryEntitlement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entitlements', to='videos.category', verbose_name='Catégorie')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_entitlements', to='auth.group', verbose_name='Groupe')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_entitlements', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': "Droit d'accès",
+                'verbose_name_plural': "Droits d'accès",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categoryentitlement',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('group__isnull', True), ('user__isnull', False)), models.Q(('group__isnull', False), ('user__isnull', True)), _connector='OR'), name='entitlement_user_xor_group'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryentitlement',
+            constraint=models.UniqueConstraint(condition=models.Q(('user__isnull', False)), fields=('category', 'user'), name='unique_user_entitlement'),
+        ),
+        migrations.AddConstraint(
+            model_name='categoryentitlement',
+            constraint=models.UniqueConstraint(condition=models.Q(('group__isnull', False)), fields=('category', 'group'), name='unique_group_entitlement'),
+        ),
+    ]
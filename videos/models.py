@@ -5,11 +5,19 @@ Les vidéos sont hébergées sur YouTube en mode non répertorié.
 La base de données stocke uniquement les métadonnées.
 """
 
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
 import re
 
+# Version (monitoring.invalidation) du catalogue : catégories et vidéos
+CATALOGUE_STAMP = 'catalogue'
+
+# Version (monitoring.invalidation) des droits d'accès aux catégories
+ENTITLEMENTS_STAMP = 'entitlements'
+
 
 def validate_youtube_url(value):
     """
@@ -35,6 +43,16 @@ def validate_youtube_url(value):
     )
 
 
+class CategoryQuerySet(models.QuerySet):
+    """Requêtes sur les catégories."""
+
+    def with_published_video_count(self):
+        """Annote `published_video_count` (évite une requête COUNT par catégorie)."""
+        return self.annotate(
+            published_video_count=models.Count('videos', filter=models.Q(videos__is_published=True))
+        )
+
+
 class Category(models.Model):
     """
     Catégorie pour organiser les vidéos.
@@ -58,6 +76,8 @@ class Category(models.Model):
         verbose_name='Date de création'
     )
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Catégorie'
         verbose_name_plural = 'Catégories'
@@ -178,3 +198,204 @@ class Video(models.Model):
         if video_id:
             return f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
         return None
+
+
+
+class CategoryEntitlement(models.Model):
+    """
+    Droit d'accès à une catégorie pour un utilisateur ou un groupe (cohorte).
+
+    Une catégorie sans aucun droit reste ouverte à tous ; dès qu'un droit
+    existe, elle est réservée aux utilisateurs et groupes cités (et au staff).
+    Le contrôle est fait en mémoire, voir videos.entitlements.
+    """
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='entitlements',
+        verbose_name='Catégorie'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='category_entitlements',
+        verbose_name='Utilisateur'
+    )
+    group = models.ForeignKey(
+        'auth.Group',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='category_entitlements',
+        verbose_name='Groupe'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Date de création'
+    )
+
+    class Meta:
+        verbose_name = 'Droit d\'accès'
+        verbose_name_plural = 'Droits d\'accès'
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(user__isnull=False, group__isnull=True)
+                    | models.Q(user__isnull=True, group__isnull=False)
+                ),
+                name='entitlement_user_xor_group'
+            ),
+            models.UniqueConstraint(
+                fields=['category', 'user'],
+                condition=models.Q(user__isnull=False),
+                name='unique_user_entitlement'
+            ),
+            models.UniqueConstraint(
+                fields=['category', 'group'],
+                condition=models.Q(group__isnull=False),
+                name='unique_group_entitlement'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.user or self.group}"
+
+class WatchProgress(models.Model):
+    """
+    Progression de visionnage d'une vidéo par un utilisateur.
+
+    Les mises à jour envoyées par le lecteur (heartbeats) ne sont pas écrites
+    une par une : elles sont regroupées en mémoire puis écrites par lots
+    (voir videos.progress).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='watch_progress',
+        verbose_name='Utilisateur'
+    )
+    video = models.ForeignKey(
+        Video,
+        on_delete=models.CASCADE,
+        related_name='watch_progress',
+        verbose_name='Vidéo'
+    )
+    position = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Position (secondes)'
+    )
+    duration = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Durée (secondes)'
+    )
+    completed = models.BooleanField(
+        default=False,
+        verbose_name='Terminée'
+    )
+    updated_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Dernière mise à jour'
+    )
+
+    class Meta:
+        verbose_name = 'Progression'
+        verbose_name_plural = 'Progressions'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'video'], name='unique_watch_progress'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.video} ({self.position}s)"
+
+
+ROLLUP_PERIOD_CHOICES = [
+    ('hour', 'Heure'),
+    ('day', 'Jour'),
+    ('week', 'Semaine'),
+]
+
+
+class VideoViewRollup(models.Model):
+    """
+    Nombre de vues d'une vidéo agrégé par période (heure, jour, semaine).
+
+    Alimenté par videos.analytics : les vues sont comptées en mémoire puis
+    ajoutées aux lignes existantes par lots. Aucun événement brut n'est stocké.
+    """
+    video = models.ForeignKey(
+        Video,
+        on_delete=models.CASCADE,
+        related_name='view_rollups',
+        verbose_name='Vidéo'
+    )
+    period = models.CharField(
+        max_length=5,
+        choices=ROLLUP_PERIOD_CHOICES,
+        verbose_name='Période'
+    )
+    period_start = models.DateTimeField(
+        verbose_name='Début de la période'
+    )
+    views = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Vues'
+    )
+
+    class Meta:
+        verbose_name = 'Vues par vidéo'
+        verbose_name_plural = 'Vues par vidéo'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['video', 'period', 'period_start'],
+                name='unique_video_view_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'period_start', '-views'], name='video_rollup_top_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.video} - {self.period} {self.period_start:%d/%m/%Y %H:%M} ({self.views})"
+
+
+class CategoryViewRollup(models.Model):
+    """
+    Nombre de vues des vidéos d'une catégorie agrégé par période.
+    """
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='view_rollups',
+        verbose_name='Catégorie'
+    )
+    period = models.CharField(
+        max_length=5,
+        choices=ROLLUP_PERIOD_CHOICES,
+        verbose_name='Période'
+    )
+    period_start = models.DateTimeField(
+        verbose_name='Début de la période'
+    )
+    views = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Vues'
+    )
+
+    class Meta:
+        verbose_name = 'Vues par catégorie'
+        verbose_name_plural = 'Vues par catégorie'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'period', 'period_start'],
+                name='unique_category_view_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'period_start'], name='category_rollup_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.category} - {self.period} {self.period_start:%d/%m/%Y %H:%M} ({self.views})"
@@ -0,0 +1,94 @@
+"""
+Gestion de l'ordre d'affichage des vidéos et des catégories.
+
+Les valeurs du champ `order` sont espacées (ORDER_GAP) : déplacer un élément
+entre deux voisins consiste à lui donner une valeur intermédiaire, ce qui
+ne modifie qu'une seule ligne. Les voisins ne sont renumérotés que lorsqu'il
+n'y a plus d'espace entre eux.
+
+Le tri reste celui des modèles : `order` puis `-created_at` pour les vidéos
+d'une catégorie, `order` puis `name` pour les catégories.
+"""
+
+from monitoring.invalidation import bump_on_commit
+from .models import CATALOGUE_STAMP, Video, Category
+
+# Écart entre deux valeurs consécutives de `order` après renumérotation
+ORDER_GAP = 1024
+
+
+def video_siblings(category_id):
+    """Vidéos d'une catégorie (ou sans catégorie) dans l'ordre d'affichage."""
+    return list(
+        Video.objects.filter(category_id=category_id)
+        .only('id', 'order', 'category_id', 'created_at')
+        .order_by('order', '-created_at')
+    )
+
+
+def category_siblings():
+    """Catégories dans l'ordre d'affichage."""
+    return list(Category.objects.only('id', 'order', 'name').order_by('order', 'name'))
+
+
+def apply_sequence(model, objects):
+    """
+    Renumérote les objets dans l'ordre donné, avec un écart ORDER_GAP.
+
+    Une seule requête `bulk_update` ; seuls les objets dont l'ordre change
+    sont écrits. Retourne le nombre de lignes modifiées.
+    """
+    changed = []
+    for position, obj in enumerate(objects, start=1):
+        order = position * ORDER_GAP
+        if obj.order != order:
+            obj.order = order
+            changed.append(obj)
+    if changed:
+        model.objects.bulk_update(changed, ['order'])
+        bump_on_commit(CATALOGUE_STAMP)
+    return len(changed)
+
+
+def move_after(model, obj, siblings, after=None):
+    """
+    Place `obj` juste après `after` parmi `siblings` (en tête si `after` est None).
+
+    `siblings` est la liste ordonnée des éléments du même groupe, `obj` compris.
+    Retourne le nombre de lignes modifiées (1 dans le cas courant).
+    """
+    others = [s for s in siblings if s.pk != obj.pk]
+
+    if after is None:
+        index = 0
+    else:
+        index = next(i for i, s in enumerate(others) if s.pk == after.pk) + 1
+
+    previous = others[index - 1] if index > 0 else None
+    following = others[index] if index < len(others) else None
+
+    order = _order_between(previous, following)
+    if order is None:
+        # Plus d'espace entre les voisins : renumérotation complète
+        others.insert(index, obj)
+        return apply_sequence(model, others)
+
+    if obj.order == order:
+        return 0
+    obj.order = order
+    model.objects.filter(pk=obj.pk).update(order=order)
+    bump_on_commit(CATALOGUE_STAMP)
+    return 1
+
+
+def _order_between(previous, following):
+    """Valeur strictement comprise entre deux voisins, ou None s'il n'y en a pas."""
+    if previous is None and following is None:
+        return ORDER_GAP
+    if previous is None:
+        return following.order // 2 if following.order > 0 else None
+    if following is None:
+        return previous.order + ORDER_GAP
+    if following.order - previous.order >= 2:
+        return (previous.order + following.order) // 2
+    return None
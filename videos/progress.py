@@ -0,0 +1,151 @@
+"""
+Tampon d'écriture différée (write-behind) pour la progression de visionnage.
+
+Le lecteur envoie un heartbeat toutes les quelques secondes. Chaque heartbeat
+met simplement à jour une entrée en mémoire, indexée par (utilisateur, vidéo) :
+plusieurs heartbeats pour la même vidéo n'en font qu'une écriture.
+
+Le tampon (voir videos.buffers) est vidé en base par lots, avec un upsert
+`bulk_create(update_conflicts=True)` :
+- dès que le nombre d'entrées en attente atteint PROGRESS_FLUSH_MAX_PENDING ;
+- sinon toutes les PROGRESS_FLUSH_INTERVAL secondes (thread d'arrière-plan) ;
+- et à l'arrêt du processus.
+
+Le tampon est propre à chaque worker. Les lectures fusionnent les entrées en
+attente du worker courant avec la base.
+"""
+
+import atexit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from .buffers import WriteBehindBuffer
+from .models import Video, WatchProgress
+
+# Part de la durée à partir de laquelle une vidéo est considérée terminée
+COMPLETION_RATIO = 0.9
+
+# Position ou durée maximale acceptée (secondes)
+MAX_SECONDS = 24 * 3600
+
+
+class ProgressEntry:
+    """Dernier état connu de la progression pour un couple (utilisateur, vidéo)."""
+
+    __slots__ = ('position', 'duration', 'completed', 'updated_at')
+
+    def __init__(self, position, duration, completed, updated_at):
+        self.position = position
+        self.duration = duration
+        self.completed = completed
+        self.updated_at = updated_at
+
+    def as_dict(self):
+        return {
+            'position': self.position,
+            'duration': self.duration,
+            'completed': self.completed,
+            'updated_at': self.updated_at,
+        }
+
+
+class ProgressBuffer(WriteBehindBuffer):
+    """Regroupe les heartbeats par (utilisateur, vidéo) et les écrit par lots."""
+
+    thread_name = 'progress-flush'
+
+    def record(self, user_id, video_id, position, duration=None, completed=False):
+        """Enregistre un heartbeat (aucune requête SQL)."""
+        if duration and position >= duration * COMPLETION_RATIO:
+            completed = True
+        self.add((user_id, video_id), ProgressEntry(position, duration, completed, timezone.now()))
+
+    def merge(self, current, value):
+        return ProgressEntry(
+            value.position,
+            value.duration or current.duration,
+            current.completed or value.completed,
+            value.updated_at,
+        )
+
+    def pending_for_user(self, user_id):
+        """Entrées en attente d'un utilisateur : {video_id: ProgressEntry}."""
+        return {
+            video_id: entry
+            for (uid, video_id), entry in self.pending_items()
+            if uid == user_id
+        }
+
+    def write(self, pending):
+        # Ignorer les vidéos et utilisateurs supprimés entre-temps (deux requêtes)
+        video_ids = {video_id for _, video_id in pending}
+        user_ids = {user_id for user_id, _ in pending}
+        existing = set(Video.objects.filter(id__in=video_ids).values_list('id', flat=True))
+        existing_users = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+
+        rows = [
+            WatchProgress(
+                user_id=user_id,
+                video_id=video_id,
+                position=entry.position,
+                duration=entry.duration,
+                completed=entry.completed,
+                updated_at=entry.updated_at,
+            )
+            for (user_id, video_id), entry in pending.items()
+            if video_id in existing and user_id in existing_users
+        ]
+
+        # Une vidéo terminée le reste : `completed` n'est écrit que s'il est vrai
+        completed = [row for row in rows if row.completed]
+        in_progress = [row for row in rows if not row.completed]
+        for objs, update_fields in (
+            (completed, ['position', 'duration', 'completed', 'updated_at']),
+            (in_progress, ['position', 'duration', 'updated_at']),
+        ):
+            if objs:
+                WatchProgress.objects.bulk_create(
+                    objs,
+                    batch_size=500,
+                    update_conflicts=True,
+                    unique_fields=['user', 'video'],
+                    update_fields=update_fields,
+                )
+        return len(rows)
+
+
+# Instance unique par worker
+progress_buffer = ProgressBuffer(
+    flush_interval=getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 5.0),
+    max_pending=getattr(settings, 'PROGRESS_FLUSH_MAX_PENDING', 5000),
+)
+atexit.register(progress_buffer.stop)
+
+
+def get_user_progress(user_id):
+    """
+    Progression de toutes les vidéos d'un utilisateur, en une requête.
+
+    Retourne {video_id: dict}, les entrées en attente dans ce worker
+    l'emportant sur la base.
+    """
+    progress = {
+        row['video_id']: {
+            'position': row['position'],
+            'duration': row['duration'],
+            'completed': row['completed'],
+            'updated_at': row['updated_at'],
+        }
+        for row in WatchProgress.objects.filter(user_id=user_id).values(
+            'video_id', 'position', 'duration', 'completed', 'updated_at'
+        )
+    }
+    for video_id, entry in progress_buffer.pending_for_user(user_id).items():
+        stored = progress.get(video_id)
+        data = entry.as_dict()
+        if stored and stored['completed']:
+            data['completed'] = True
+        progress[video_id] = data
+    return progress
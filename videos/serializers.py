@@ -3,10 +3,12 @@ Serializers pour l'API des vidéos.
 """
 
 from rest_framework import serializers
+
+from monitoring.instrumentation import TimedSerializerMixin
 from .models import Video, Category
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les catégories."""
     
     video_count = serializers.SerializerMethodField()
@@ -17,10 +19,14 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_video_count(self, obj):
-        return obj.videos.filter(is_published=True).count()
+        # Valeur annotée par Category.objects.with_published_video_count()
+        count = getattr(obj, 'published_video_count', None)
+        if count is None:
+            count = obj.videos.filter(is_published=True).count()
+        return count
 
 
-class VideoSerializer(serializers.ModelSerializer):
+class VideoSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les vidéos."""
     
     category_name = serializers.CharField(source='category.name', read_only=True, allow_null=True)
@@ -44,7 +50,7 @@ class VideoSerializer(serializers.ModelSerializer):
         return obj.get_thumbnail_url()
 
 
-class VideoListSerializer(serializers.ModelSerializer):
+class VideoListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer simplifié pour la liste des vidéos."""
     
     category_name = serializers.CharField(source='category.name', read_only=True, allow_null=True)
@@ -63,7 +69,7 @@ class VideoListSerializer(serializers.ModelSerializer):
         return obj.get_thumbnail_url()
 
 
-class CategoryWithVideosSerializer(serializers.ModelSerializer):
+class CategoryWithVideosSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer pour les catégories avec leurs vidéos."""
     
     videos = VideoListSerializer(many=True, read_only=True)
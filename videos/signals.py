@@ -0,0 +1,28 @@
+"""
+Signaux invalidant les caches du catalogue.
+
+- Accès aux catégories (videos.entitlements) : un droit créé, modifié ou
+  supprimé, ou un changement des groupes d'un utilisateur, incrémente la
+  version ENTITLEMENTS_STAMP une fois la transaction validée.
+- Catégories et vidéos : version CATALOGUE_STAMP.
+
+Les versions sont celles du bus d'invalidation entre workers
+(monitoring.invalidation).
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed
+from django.dispatch import receiver
+
+from monitoring import invalidation
+from . import entitlements
+from .models import CATALOGUE_STAMP, ENTITLEMENTS_STAMP, Category, CategoryEntitlement, Video
+
+invalidation.bump_on_change(CATALOGUE_STAMP, Category, Video)
+invalidation.bump_on_change(ENTITLEMENTS_STAMP, CategoryEntitlement)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        entitlements.invalidate()
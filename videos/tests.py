@@ -0,0 +1,331 @@
+"""
+Tests de l'application videos.
+
+    python manage.py test videos
+"""
+
+import pickle
+
+from django.contrib.auth.models import Group, User
+from django.test import TestCase
+
+from monitoring.invalidation import bus
+
+from eduplatform.testing import CacheIsolationMixin, DeferredWritesMixin, auth_headers, youtube_url
+from .bulk_import import VideoBulkImporter
+from .entitlements import compute_denied, get_category_access, invalidate
+from .models import ENTITLEMENTS_STAMP, Category, CategoryEntitlement, Video, WatchProgress
+from .ordering import ORDER_GAP, apply_sequence, category_siblings, move_after, video_siblings
+from .progress import progress_buffer, get_user_progress
+
+
+class ProgressBufferTests(DeferredWritesMixin, CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('viewer', password='viewer-password-123')
+        self.video = Video.objects.create(title='Vidéo', youtube_url=youtube_url(1), is_published=True)
+
+    def test_heartbeats_are_merged_and_written_on_flush(self):
+        progress_buffer.record(self.user.id, self.video.id, 10, duration=600)
+        progress_buffer.record(self.user.id, self.video.id, 20, duration=600)
+        self.assertFalse(WatchProgress.objects.exists())
+
+        with self.assertNumQueries(5):
+            # Vidéos et utilisateurs existants, puis upsert dans un savepoint
+            self.assertEqual(progress_buffer.flush(), 1)
+
+        progress = WatchProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(progress.position, 20)
+        self.assertEqual(progress.duration, 600)
+        self.assertFalse(progress.completed)
+
+    def test_completed_video_stays_completed(self):
+        progress_buffer.record(self.user.id, self.video.id, 590, duration=600)
+        progress_buffer.flush()
+        progress_buffer.record(self.user.id, self.video.id, 30, duration=600)
+        progress_buffer.flush()
+
+        progress = WatchProgress.objects.get(user=self.user, video=self.video)
+        self.assertEqual(progress.position, 30)
+        self.assertTrue(progress.completed)
+
+    def test_entries_of_deleted_videos_are_dropped(self):
+        progress_buffer.record(self.user.id, self.video.id, 10)
+        self.video.delete()
+
+        self.assertEqual(progress_buffer.flush(), 0)
+        self.assertEqual(progress_buffer.stats()['pending'], 0)
+
+    def test_pending_entries_are_merged_into_reads(self):
+        WatchProgress.objects.create(user=self.user, video=self.video, position=5, completed=True)
+        progress_buffer.record(self.user.id, self.video.id, 40)
+
+        progress = get_user_progress(self.user.id)[self.video.id]
+        self.assertEqual(progress['position'], 40)
+        self.assertTrue(progress['completed'])
+
+    def test_api_heartbeat_is_buffered(self):
+        headers = auth_headers(self.user)
+        url = f'/api/videos/{self.video.id}/progress/'
+
+        response = self.client.post(url, {'position': 120, 'duration': 600},
+                                    content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(WatchProgress.objects.exists())
+        self.assertEqual(self.client.get(url, **headers).json()['progress']['position'], 120)
+
+        progress_buffer.flush()
+        self.assertEqual(WatchProgress.objects.get(user=self.user, video=self.video).position, 120)
+
+    def test_api_heartbeat_rejects_unpublished_video(self):
+        self.video.is_published = False
+        self.video.save()
+
+        response = self.client.post(f'/api/videos/{self.video.id}/progress/', {'position': 1},
+                                    content_type='application/json', **auth_headers(self.user))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(progress_buffer.stats()['pending'], 0)
+
+
+class OrderingTests(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name='Cours')
+        self.videos = [
+            Video.objects.create(title=f'Vidéo {i}', youtube_url=youtube_url(i),
+                                 category=self.category, order=(i + 1) * ORDER_GAP)
+            for i in range(3)
+        ]
+
+    def ordered_ids(self):
+        return [video.id for video in video_siblings(self.category.id)]
+
+    def test_move_after_updates_a_single_row(self):
+        first, second, third = self.videos
+        siblings = video_siblings(self.category.id)
+        with self.assertNumQueries(1):
+            updated = move_after(Video, siblings[2], siblings, after=siblings[0])
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(self.ordered_ids(), [first.id, third.id, second.id])
+
+    def test_move_to_head(self):
+        first, second, third = self.videos
+        siblings = video_siblings(self.category.id)
+        move_after(Video, siblings[1], siblings)
+
+        self.assertEqual(self.ordered_ids(), [second.id, first.id, third.id])
+
+    def test_neighbours_are_renumbered_when_there_is_no_gap(self):
+        first, second, third = self.videos
+        Video.objects.filter(pk=second.pk).update(order=first.order + 1)
+        siblings = video_siblings(self.category.id)
+
+        updated = move_after(Video, siblings[2], siblings, after=siblings[0])
+
+        self.assertEqual(self.ordered_ids(), [first.id, third.id, second.id])
+        self.assertGreater(updated, 1)
+        orders = [video.order for video in video_siblings(self.category.id)]
+        self.assertEqual(orders, [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP])
+
+    def test_apply_sequence_writes_only_changed_rows(self):
+        first, second, third = self.videos
+        siblings = {video.id: video for video in video_siblings(self.category.id)}
+
+        with self.assertNumQueries(1):
+            updated = apply_sequence(Video, [siblings[first.id], siblings[third.id], siblings[second.id]])
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.ordered_ids(), [first.id, third.id, second.id])
+
+    def test_categories_are_ordered_by_order_then_name(self):
+        Category.objects.create(name='B', order=0)
+        Category.objects.create(name='A', order=0)
+
+        self.assertEqual([c.name for c in category_siblings()], ['A', 'B', 'Cours'])
+
+
+class VideoBulkImporterTests(TestCase):
+
+    def test_creates_videos_and_categories(self):
+        report = VideoBulkImporter().run([
+            {'title': 'Intro', 'youtube_url': youtube_url(1), 'category': 'Bases'},
+            {'title': 'Suite', 'youtube_url': youtube_url(2), 'category': 'Bases', 'is_published': 'non'},
+        ])
+
+        self.assertEqual((report['created'], report['updated'], report['failed']), (2, 0, 0))
+        self.assertEqual(report['categories_created'], 1)
+        category = Category.objects.get(name='Bases')
+        self.assertEqual(category.videos.count(), 2)
+        self.assertFalse(Video.objects.get(title='Suite').is_published)
+
+    def test_updates_existing_video_by_url(self):
+        video = Video.objects.create(title='Ancien titre', youtube_url=youtube_url(1))
+
+        report = VideoBulkImporter().run([{'title': 'Nouveau titre', 'youtube_url': youtube_url(1)}])
+
+        self.assertEqual((report['created'], report['updated']), (0, 1))
+        self.assertEqual(report['results'][0]['id'], video.id)
+        video.refresh_from_db()
+        self.assertEqual(video.title, 'Nouveau titre')
+
+    def test_invalid_rows_are_reported(self):
+        report = VideoBulkImporter().run([
+            {'title': '', 'youtube_url': youtube_url(1)},
+            {'title': 'URL invalide', 'youtube_url': 'https://example.com/video'},
+            'pas un objet',
+            {'title': 'Valide', 'youtube_url': youtube_url(2)},
+        ])
+
+        self.assertEqual((report['created'], report['failed']), (1, 3))
+        self.assertEqual([r['status'] for r in report['results']], ['error', 'error', 'error', 'created'])
+        self.assertEqual(Video.objects.count(), 1)
+
+    def test_duplicate_urls_in_one_import(self):
+        report = VideoBulkImporter().run([
+            {'title': 'Premier', 'youtube_url': youtube_url(1)},
+            {'title': 'Doublon', 'youtube_url': youtube_url(1)},
+        ])
+
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertEqual(Video.objects.get().title, 'Premier')
+
+    def test_videos_without_order_are_appended_to_their_category(self):
+        category = Category.objects.create(name='Bases')
+        Video.objects.create(title='Existante', youtube_url=youtube_url(1), category=category, order=5 * ORDER_GAP)
+
+        VideoBulkImporter().run([
+            {'title': 'A', 'youtube_url': youtube_url(2), 'category': 'Bases'},
+            {'title': 'B', 'youtube_url': youtube_url(3), 'category': 'Bases', 'order': 7},
+            {'title': 'C', 'youtube_url': youtube_url(4), 'category': 'Bases'},
+            {'title': 'D', 'youtube_url': youtube_url(5)},
+        ])
+
+        orders = dict(Video.objects.values_list('title', 'order'))
+        self.assertEqual(orders['A'], 6 * ORDER_GAP)
+        self.assertEqual(orders['B'], 7)
+        self.assertEqual(orders['C'], 7 * ORDER_GAP)
+        self.assertEqual(orders['D'], ORDER_GAP)
+
+    def test_updated_video_keeps_its_place_without_order(self):
+        video = Video.objects.create(title='Ancien titre', youtube_url=youtube_url(1), order=3 * ORDER_GAP)
+
+        VideoBulkImporter().run([{'title': 'Nouveau titre', 'youtube_url': youtube_url(1)}])
+
+        video.refresh_from_db()
+        self.assertEqual(video.order, 3 * ORDER_GAP)
+
+    def test_created_categories_follow_existing_ones(self):
+        Category.objects.create(name='Existante', order=3 * ORDER_GAP)
+
+        VideoBulkImporter().run([
+            {'title': 'A', 'youtube_url': youtube_url(1), 'category': 'Zoologie'},
+            {'title': 'B', 'youtube_url': youtube_url(2), 'category': 'Algèbre'},
+        ])
+
+        orders = dict(Category.objects.values_list('name', 'order'))
+        self.assertEqual(orders['Algèbre'], 4 * ORDER_GAP)
+        self.assertEqual(orders['Zoologie'], 5 * ORDER_GAP)
+
+
+class CategoryEntitlementTests(DeferredWritesMixin, CacheIsolationMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.open = Category.objects.create(name='Ouverte', order=ORDER_GAP)
+        self.restricted = Category.objects.create(name='Réservée', order=2 * ORDER_GAP)
+        self.open_video = Video.objects.create(title='Ouverte', youtube_url=youtube_url(1),
+                                               category=self.open, is_published=True)
+        self.restricted_video = Video.objects.create(title='Réservée', youtube_url=youtube_url(2),
+                                                     category=self.restricted, is_published=True)
+        self.cohort = Group.objects.create(name='Cohorte')
+        CategoryEntitlement.objects.create(category=self.restricted, group=self.cohort)
+        self.user = User.objects.create_user('student', password='student-password-123')
+
+    def read_versions(self):
+        # Versions relues : celles gardées en mémoire datent des tests précédents (annulés)
+        bus.watch(ENTITLEMENTS_STAMP)
+        bus.refresh()
+
+    def fresh(self, user):
+        # Nouvelle instance : l'accès est mémorisé sur l'objet utilisateur
+        return User.objects.get(pk=user.pk)
+
+    def test_restricted_category_is_denied(self):
+        access = get_category_access(self.user)
+
+        self.assertTrue(access.allows(self.open.id))
+        self.assertTrue(access.allows(None))
+        self.assertFalse(access.allows(self.restricted.id))
+        self.assertEqual(access.filter([self.open_video, self.restricted_video]), [self.open_video])
+
+    def test_user_and_group_grants(self):
+        CategoryEntitlement.objects.create(category=self.restricted, user=self.user)
+        self.assertEqual(compute_denied(self.user), frozenset())
+
+        member = User.objects.create_user('member', password='member-password-123')
+        member.groups.add(self.cohort)
+        self.assertEqual(compute_denied(member), frozenset())
+
+    def test_staff_sees_everything(self):
+        staff = User.objects.create_user('teacher', password='teacher-password-123', is_staff=True)
+        with self.assertNumQueries(0):
+            self.assertTrue(get_category_access(staff).allows(self.restricted.id))
+
+    def test_cached_value_does_not_grow_with_category_ids(self):
+        far = Category.objects.create(id=5_000_000, name='Id élevé')
+        CategoryEntitlement.objects.create(category=far, group=self.cohort)
+
+        denied = compute_denied(self.user)
+
+        self.assertEqual(denied, {self.restricted.id, far.id})
+        self.assertLess(len(pickle.dumps(denied)), 100)
+
+    def test_detail_views_return_404(self):
+        headers = auth_headers(self.user)
+
+        self.assertEqual(self.client.get(f'/api/videos/{self.restricted_video.id}/', **headers).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/categories/{self.restricted.id}/', **headers).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/videos/{self.open_video.id}/', **headers).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/categories/{self.open.id}/', **headers).status_code, 200)
+
+    def test_dashboard_and_category_list_are_filtered(self):
+        headers = auth_headers(self.user)
+
+        dashboard = self.client.get('/api/dashboard/', **headers).json()
+        self.assertEqual([c['id'] for c in dashboard['categories']], [self.open.id])
+        self.assertEqual(dashboard['total_videos'], 1)
+
+        categories = self.client.get('/api/categories/', **headers).json()
+        self.assertEqual([c['id'] for c in categories['categories']], [self.open.id])
+
+        staff = User.objects.create_user('teacher', password='teacher-password-123', is_staff=True)
+        categories = self.client.get('/api/categories/', **auth_headers(staff)).json()
+        self.assertEqual(categories['count'], 2)
+
+    def test_access_is_recomputed_after_invalidate(self):
+        self.read_versions()
+        self.assertFalse(get_category_access(self.user).allows(self.restricted.id))
+        # Cache à jour : aucune requête
+        user = self.fresh(self.user)
+        with self.assertNumQueries(0):
+            self.assertFalse(get_category_access(user).allows(self.restricted.id))
+
+        # bulk_create contourne les signaux : invalidate() explicite
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryEntitlement.objects.bulk_create([CategoryEntitlement(category=self.restricted, user=self.user)])
+            invalidate()
+        bus.refresh()
+
+        self.assertTrue(get_category_access(self.fresh(self.user)).allows(self.restricted.id))
+
+    def test_group_membership_change_invalidates(self):
+        self.read_versions()
+        self.assertFalse(get_category_access(self.user).allows(self.restricted.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.cohort)
+        bus.refresh()
+
+        self.assertTrue(get_category_access(self.fresh(self.user)).allows(self.restricted.id))
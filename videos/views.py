@@ -1,12 +1,16 @@
 """
 Vues pour l'application videos.
 
-Toutes les vues sont protégées par @login_required.
+Toutes les vues sont protégées par @login_required. Les catégories réservées
+à d'autres cohortes sont retirées en mémoire (voir videos.entitlements).
 """
 
+from django.http import Http404
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from .models import Video, Category
+from .entitlements import get_category_access
+from .analytics import record_view
 
 
 @login_required
@@ -16,12 +20,15 @@ def dashboard(request):
     
     Affiche toutes les vidéos organisées par catégorie.
     """
+    access = get_category_access(request.user)
+    
     # Récupérer les catégories avec leurs vidéos publiées
     categories = Category.objects.prefetch_related(
         'videos'
     ).filter(
         videos__is_published=True
     ).distinct()
+    categories = access.filter(categories, key=lambda c: c.id)
     
     # Vidéos sans catégorie
     uncategorized_videos = Video.objects.filter(
@@ -29,8 +36,15 @@ def dashboard(request):
         category__isnull=True
     )
     
-    # Toutes les vidéos publiées pour statistiques
-    total_videos = Video.objects.filter(is_published=True).count()
+    # Toutes les vidéos publiées accessibles pour statistiques
+    published_videos = Video.objects.filter(is_published=True)
+    if access.denied:
+        total_videos = sum(
+            1 for category_id in published_videos.values_list('category_id', flat=True)
+            if access.allows(category_id)
+        )
+    else:
+        total_videos = published_videos.count()
     
     context = {
         'categories': categories,
@@ -48,15 +62,19 @@ def video_list(request):
     """
     # Filtrer par catégorie si spécifié
     category_id = request.GET.get('category')
+    access = get_category_access(request.user)
     
     videos = Video.objects.filter(is_published=True)
     current_category = None
     
     if category_id:
         current_category = get_object_or_404(Category, id=category_id)
+        if not access.allows(current_category.id):
+            raise Http404
         videos = videos.filter(category=current_category)
     
-    categories = Category.objects.all()
+    videos = access.filter(videos)
+    categories = access.filter(Category.objects.all(), key=lambda c: c.id)
     
     context = {
         'videos': videos,
@@ -75,6 +93,9 @@ def video_detail(request, video_id):
     Affiche la vidéo en iframe YouTube avec sa description.
     """
     video = get_object_or_404(Video, id=video_id, is_published=True)
+    if not get_category_access(request.user).allows(video.category_id):
+        raise Http404
+    record_view(video)
     
     # Vidéos suggérées (même catégorie ou récentes)
     if video.category:
@@ -83,9 +104,9 @@ def video_detail(request, video_id):
             category=video.category
         ).exclude(id=video.id)[:5]
     else:
-        related_videos = Video.objects.filter(
+        related_videos = get_category_access(request.user).filter(Video.objects.filter(
             is_published=True
-        ).exclude(id=video.id)[:5]
+        ).exclude(id=video.id)[:20])[:5]
     
     context = {
         'video': video,
@@ -100,6 +121,8 @@ def category_detail(request, category_id):
     """
     Affiche toutes les vidéos d'une catégorie.
     """
+    if not get_category_access(request.user).allows(category_id):
+        raise Http404
     category = get_object_or_404(Category, id=category_id)
     videos = category.videos.filter(is_published=True)
     
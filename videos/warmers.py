@@ -0,0 +1,23 @@
+"""
+Warmers de l'application videos (voir monitoring.warmup).
+"""
+
+from .serializers import (
+    CategorySerializer, CategoryWithVideosSerializer, VideoListSerializer, VideoSerializer,
+)
+
+
+def warm_serializers():
+    """Construit une fois les champs des serializers (introspection des modèles)."""
+    for serializer_class in (
+        CategorySerializer, CategoryWithVideosSerializer, VideoListSerializer, VideoSerializer,
+    ):
+        serializer_class().fields
+
+
+def warm_catalogue_cache():
+    """Charge le dashboard et la liste des catégories dans le cache du worker (L1)."""
+    from .api_views import build_category_list, build_dashboard_catalogue
+    from .caching import catalogue_cache
+    catalogue_cache.get_or_set('dashboard', compute=build_dashboard_catalogue)
+    catalogue_cache.get_or_set('categories', compute=build_category_list)